@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro DTC Knowledge Base
+Code-indexed diagnostic knowledge for the offline mock engine.
+
+04-assets/data/dtc_knowledge_base.json maps exact codes (P0301, U0100,
+SPN3364, CH21, ...) and code families (P03, U0, SPN, hvac:E, ...) to entries
+holding hypotheses, actions, parts, TSB refs, uplift requirements and cost.
+The file is read on first use and flattened into one dict from key to entry,
+so resolving a code is a handful of dict probes over its prefixes (bounded by
+the longest key), independent of how many codes the file holds. Equipment
+types without a resolvable code fall back to a per-equipment entry.
+
+Usage:
+  dtc_knowledge.py <code> [...] [--equipment TYPE]   show how codes resolve
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+# Plain os.path strings keep pathlib off the fast_cli.py mock path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KB_PATH = os.path.join(ROOT, "04-assets", "data", "dtc_knowledge_base.json")
+
+_SPACES = re.compile(r"\s+")
+_J1939_LABEL = re.compile(r"\b(SPN|FMI)[\s:]+")
+_FIELD = re.compile(r"\{(code|make|model|equipment)\}")
+
+# Used for every lookup when the data file is missing
+GENERIC_ENTRY = {
+    "cause": "Fault reported as {code}; further testing needed to isolate the failed component.",
+    "confirm": "a manufacturer code lookup and circuit test",
+    "hypotheses": [
+        {"hypothesis": "Component or circuit named by {code}", "evidence": "Code definition identifies the affected circuit", "likelihood": "medium"},
+    ],
+    "actions": [
+        {"step": "Look up the manufacturer definition of {code} and test the named circuit", "why": "Confirms the failed part before replacement"},
+    ],
+    "parts": ["Digital multimeter"],
+    "tsb_refs": [],
+    "uplift": ["Manufacturer definition and freeze-frame data for {code}"],
+    "cost": [100, 600],
+    "hours": 2.0,
+}
+
+def normalize_code(code: str) -> str:
+    """Canonical form: upper case, single spaces, 'SPN 3364 FMI 17' → 'SPN3364 FMI17'."""
+    code = str(code).strip().upper()
+    if " " not in code and ":" not in code and "\t" not in code:
+        return code
+    return _J1939_LABEL.sub(r"\1", _SPACES.sub(" ", code))
+
+class _Template(str):
+    """A string with template fields, rewritten for str.format_map()."""
+
+def _prepare(value):
+    """Return value with templated strings turned into _Template format strings.
+
+    Only the four known fields are substituted; every other brace is escaped
+    so it is left as written.
+    """
+    if isinstance(value, str):
+        pieces = _FIELD.split(value)
+        if len(pieces) == 1:
+            return value
+        # split() alternates literal text and field names
+        return _Template("".join("{" + piece + "}" if index % 2 else piece.replace("{", "{{").replace("}", "}}")
+                                 for index, piece in enumerate(pieces)))
+    if isinstance(value, list):
+        return [_prepare(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _prepare(item) for key, item in value.items()}
+    return value
+
+def _fill(value, fields: dict):
+    """Return a fresh copy of a prepared value with its templates filled from fields."""
+    if isinstance(value, _Template):
+        return value.format_map(fields)
+    if isinstance(value, list):
+        return [_fill(item, fields) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, fields) for key, item in value.items()}
+    return value
+
+def template_values(code: str, equipment: dict) -> dict:
+    """Return the code/make/model/equipment template values for one finding."""
+    kind = equipment.get("type") or "equipment"
+    return {"code": code or "the reported symptom", "make": equipment.get("make") or "Manufacturer",
+            "model": equipment.get("model") or kind, "equipment": kind}
+
+class KnowledgeBase:
+    """In-memory index over the knowledge base file."""
+
+    def __init__(self, raw: dict):
+        self.version = raw.get("version", "builtin")
+        entries = raw.get("entries", {})
+        self.entries = entries
+        self.aliases = {k.lower(): v for k, v in raw.get("aliases", {}).items()}
+        self.safety = raw.get("safety", {})
+        self.equipment = {k: entries[v] for k, v in raw.get("equipment", {}).items()}
+        # One flat dict: exact codes and families share the prefix walk
+        self.index = {}
+        for section in ("families", "codes"):
+            for key, entry_id in raw.get(section, {}).items():
+                scope, _, prefix = key.rpartition(":")
+                self.index[(scope.lower(), normalize_code(prefix))] = entries[entry_id]
+        self.max_key = max((len(prefix) for _, prefix in self.index), default=0)
+        # Filled on first expand(): a one-shot CLI run touches only a few entries
+        self._prepared = {}
+
+    def equipment_type(self, equipment_type) -> str:
+        kind = str(equipment_type or "other").strip().lower()
+        kind = self.aliases.get(kind, kind)
+        return kind if kind in self.equipment else "other"
+
+    def lookup(self, code: str, equipment_type: str = "other"):
+        """Return the entry for a normalized code (exact match, then longest family prefix) or None."""
+        index = self.index
+        for end in range(min(len(code), self.max_key), 0, -1):
+            prefix = code[:end]
+            entry = index.get((equipment_type, prefix)) or index.get(("", prefix))
+            if entry is not None:
+                return entry
+        return None
+
+    def findings(self, codes: list, equipment_type) -> list:
+        """Return [(code, entry)] for the distinct entries codes resolve to.
+
+        Falls back to the equipment type's entry, with code "", when no code
+        resolves.
+        """
+        kind = self.equipment_type(equipment_type)
+        found = []
+        seen = set()
+        for code in codes or []:
+            code = normalize_code(code)
+            entry = self.lookup(code, kind)
+            if entry is not None and id(entry) not in seen:
+                seen.add(id(entry))
+                found.append((code, entry))
+        if not found:
+            found.append(("", self.equipment.get(kind) or self.equipment.get("other") or GENERIC_ENTRY))
+        return found
+
+    def expand(self, entry: dict, code: str, equipment: dict) -> dict:
+        """Return a fresh copy of entry with {code}/{make}/{model}/{equipment} filled in."""
+        prepared = self._prepared.get(id(entry))
+        if prepared is None:
+            prepared = self._prepared[id(entry)] = _prepare(entry)
+        return _fill(prepared, template_values(code, equipment))
+
+    def safety_notes(self, equipment_type) -> list:
+        return list(self.safety.get(self.equipment_type(equipment_type), self.safety.get("other", [])))
+
+_knowledge_base = None
+
+def load_knowledge_base(path: str = KB_PATH) -> KnowledgeBase:
+    """Return the process-wide knowledge base, reading the data file on first use."""
+    global _knowledge_base
+    if _knowledge_base is None:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                _knowledge_base = KnowledgeBase(json.load(f))
+        else:
+            _knowledge_base = KnowledgeBase({
+                "entries": {"generic": GENERIC_ENTRY},
+                "families": {},
+                "equipment": {"other": "generic"},
+            })
+    return _knowledge_base
+
+def main():
+    """Print how each code resolves for one equipment type."""
+    args = sys.argv[1:]
+    equipment_type = "vehicle"
+    if "--equipment" in args:
+        at = args.index("--equipment")
+        equipment_type = args[at + 1]
+        del args[at:at + 2]
+    if not args:
+        print("Usage: dtc_knowledge.py <code> [...] [--equipment TYPE]", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    kb = load_knowledge_base()
+    loaded = time.perf_counter() - started
+    names = {id(entry): name for name, entry in kb.entries.items()}
+    print(f"📚 Knowledge base {kb.version}: {len(kb.index)} keys, {len(kb.entries)} entries, loaded in {loaded * 1000:.1f}ms")
+    kind = kb.equipment_type(equipment_type)
+    for code in args:
+        entry = kb.lookup(normalize_code(code), kind)
+        label = names.get(id(entry)) if entry is not None else "no match (equipment fallback)"
+        print(f"  {normalize_code(code)} [{kind}] → {label}")
+
+if __name__ == "__main__":
+    main()
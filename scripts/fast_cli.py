@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Fast CLI
+Startup-optimized entry point for one-shot mock and render calls in pipelines.
+
+mock_vertex.py and render_from_json.py are usually run once per report, so
+interpreter startup and imports outweigh the work itself. This entry point
+parses argv by hand and imports only what the chosen subcommand needs: the
+renderers come from report_markdown.py, so no argparse, pathlib, render
+cache, profiler, schema validator, page model or PDF engines are loaded.
+Input is read through json_backend.py (orjson when installed, memory-mapped
+for large files) and JSON is written compact unless --pretty is given.
+Reports and Markdown are identical to the full CLIs' apart from JSON
+whitespace.
+tests/startup_budget.py holds the per-invocation overhead to a budget.
+
+Usage:
+  fast_cli.py mock [submission.json|-] [--pretty] [--deterministic | --fixed-time ISO]
+                                   one submission → JSON report on stdout
+  fast_cli.py render [report.json|-] [-o report.md] [--renderer compiled|markdown]
+                                   one report → Markdown on stdout (or -o)
+  fast_cli.py mock sub.json --deterministic | fast_cli.py render - > report.md
+"""
+
+import sys
+
+USAGE = ("Usage: fast_cli.py mock [submission.json|-] [--pretty] [--deterministic | --fixed-time ISO]\n"
+         "       fast_cli.py render [report.json|-] [-o report.md] [--renderer compiled|markdown]")
+
+def _flag(args: list, name: str) -> bool:
+    if name in args:
+        args.remove(name)
+        return True
+    return False
+
+def _option(args: list, name: str):
+    if name not in args:
+        return None
+    at = args.index(name)
+    if at + 1 >= len(args):
+        raise ValueError(f"{name} needs a value")
+    value = args[at + 1]
+    del args[at:at + 2]
+    return value
+
+def _read_input(args: list):
+    if len(args) > 1:
+        raise ValueError(f"unexpected arguments: {' '.join(args[1:])}")
+    from json_backend import read_json
+    path = args[0] if args else "-"
+    try:
+        return read_json(path)
+    except FileNotFoundError:
+        raise ValueError(f"Input file not found: {path}") from None
+
+def mock(args: list) -> None:
+    pretty = _flag(args, "--pretty")
+    deterministic = _flag(args, "--deterministic")
+    fixed_time = _option(args, "--fixed-time")
+    submission = _read_input(args)
+
+    from json_backend import dumps
+    from mock_vertex import fixed_clock, generate_mock_response
+    clock = fixed_clock(fixed_time) if fixed_time else fixed_clock() if deterministic else None
+    sys.stdout.buffer.write(dumps(generate_mock_response(submission, clock), pretty) + b"\n")
+
+def render(args: list) -> None:
+    output = _option(args, "-o")
+    renderer = _option(args, "--renderer") or "compiled"
+    if renderer not in ("compiled", "markdown"):
+        raise ValueError(f"--renderer must be compiled or markdown, not {renderer}")
+    report = _read_input(args)
+
+    from report_markdown import get_renderer
+    markdown = get_renderer(renderer)(report).encode("utf-8")
+    if output is None:
+        sys.stdout.buffer.write(markdown)
+        return
+    with open(output, "wb") as f:
+        f.write(markdown)
+
+COMMANDS = {"mock": mock, "render": render}
+
+def main():
+    """Run one subcommand; errors go to stderr with exit status 1."""
+    args = sys.argv[1:]
+    if not args or args[0] not in COMMANDS:
+        print(USAGE, file=sys.stderr)
+        sys.exit(2)
+    try:
+        COMMANDS[args[0]](args[1:])
+    except ValueError as e:  # includes JSON decode errors from either backend
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
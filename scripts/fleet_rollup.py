@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Fleet Rollup
+Incrementally maintained per-equipment aggregates across many submissions.
+
+Shop customers submit many diagnostics for the same equipment. Rather than
+re-reading and re-rendering every report, each report is folded once into an
+on-disk SQLite index (stdlib sqlite3, one file) holding per-unit aggregates:
+recurring codes, repeated hypotheses, monthly cost and confidence buckets and
+a ring buffer of the last HISTORY_SLOTS reports. A unit is one piece of
+equipment within a fleet (the customer email): the normalized
+type/make/model/year, or with --key prefix the submissionId up to its last
+'-' or '_' separator.
+
+Adding a report is a fixed number of primary-key upserts (about twenty for a
+report with two codes and three hypotheses) whatever the size of the archive,
+and submissionIds already indexed are skipped, so re-feeding a corpus is
+safe. The fleet summary is built from the aggregate tables alone; its cost
+grows with the number of units and codes, never with the number of reports.
+
+Usage:
+  fleet_rollup.py add [input ...] [--index PATH] [--key equipment|prefix]
+                      inputs: report JSON files, directories, .jsonl; '-' reads JSONL on stdin
+  fleet_rollup.py summary [--index PATH] [--fleet EMAIL] [--top N] [-o rollup.md]
+  synth_corpus.py --count 100000 --reports | fleet_rollup.py add - && fleet_rollup.py summary
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from report_schema import iter_reports
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_INDEX = ROOT / "docs" / "out" / "rollup.db"
+SCHEMA_VERSION = "1"
+HISTORY_SLOTS = 12
+COMMIT_EVERY = 5000
+CACHE_KIB = 64 * 1024  # SQLite page cache; keeps the hot B-tree pages of a large index in memory
+KEY_MODES = ("equipment", "prefix")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS submissions (id TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fleets (
+    fleet TEXT PRIMARY KEY, units INTEGER NOT NULL, reports INTEGER NOT NULL,
+    ready INTEGER NOT NULL, last_seen TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY, fleet TEXT NOT NULL, unit_key TEXT NOT NULL, label TEXT NOT NULL,
+    reports INTEGER NOT NULL DEFAULT 0, ready INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0, score_n INTEGER NOT NULL DEFAULT 0,
+    first_seen TEXT, last_seen TEXT, last_cause TEXT,
+    UNIQUE (fleet, unit_key)
+);
+CREATE INDEX IF NOT EXISTS units_by_reports ON units (fleet, reports);
+CREATE TABLE IF NOT EXISTS unit_codes (
+    unit INTEGER NOT NULL, code TEXT NOT NULL, count INTEGER NOT NULL, last_seen TEXT,
+    PRIMARY KEY (unit, code)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fleet_codes (
+    fleet TEXT NOT NULL, code TEXT NOT NULL, reports INTEGER NOT NULL, units INTEGER NOT NULL,
+    PRIMARY KEY (fleet, code)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unit_hypotheses (
+    unit INTEGER NOT NULL, hkey TEXT NOT NULL, text TEXT NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (unit, hkey)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unit_months (
+    unit INTEGER NOT NULL, month TEXT NOT NULL, reports INTEGER NOT NULL,
+    score_sum REAL NOT NULL, score_n INTEGER NOT NULL,
+    cost_low_sum REAL NOT NULL, cost_high_sum REAL NOT NULL, cost_n INTEGER NOT NULL,
+    PRIMARY KEY (unit, month)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unit_history (
+    unit INTEGER NOT NULL, slot INTEGER NOT NULL, submission TEXT, generated_at TEXT,
+    score REAL, threshold REAL, verdict TEXT, cost_low REAL, cost_high REAL,
+    PRIMARY KEY (unit, slot)
+) WITHOUT ROWID;
+"""
+
+_PREFIX = re.compile(r"^(.+)[-_][^-_]*$")
+
+def _clean(value) -> str:
+    return " ".join(str(value).split()) if value is not None else ""
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+def unit_key(report: dict, mode: str = "equipment") -> tuple:
+    """Return (key, label) identifying the piece of equipment a report is about."""
+    if mode == "prefix":
+        submission = _clean(report.get("submissionId"))
+        match = _PREFIX.match(submission)
+        prefix = match.group(1) if match else submission
+        return prefix.casefold(), prefix or "(no submission id)"
+    equipment = report.get("equipment") or {}
+    parts = [_clean(equipment.get(field)) for field in ("year", "make", "model")]
+    kind = _clean(equipment.get("type"))
+    key = "|".join([kind, *parts]).casefold()
+    label = " ".join(part for part in parts if part) or "Unknown equipment"
+    return key, f"{label} ({kind})" if kind else label
+
+class RollupIndex:
+    """Per-equipment aggregates in one SQLite file, updated one report at a time."""
+
+    def __init__(self, path, key_mode=None):
+        """Open or create the index; key_mode defaults to the one it was built with."""
+        if key_mode is not None and key_mode not in KEY_MODES:
+            raise ValueError(f"key mode must be one of {', '.join(KEY_MODES)}, not {key_mode}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+        self.db.executescript(SCHEMA)
+        stored = dict(self.db.execute("SELECT key, value FROM meta"))
+        if stored.get("version", SCHEMA_VERSION) != SCHEMA_VERSION:
+            raise ValueError(f"{self.path} has rollup schema {stored['version']}, expected {SCHEMA_VERSION}")
+        if key_mode is not None and stored.get("key_mode", key_mode) != key_mode:
+            raise ValueError(f"{self.path} groups units by {stored['key_mode']}, not {key_mode}")
+        key_mode = key_mode or stored.get("key_mode", "equipment")
+        self.key_mode = key_mode
+        self.db.executemany("INSERT OR IGNORE INTO meta VALUES (?, ?)",
+                            [("version", SCHEMA_VERSION), ("key_mode", key_mode)])
+        self.db.commit()
+        self.added = 0
+        self.skipped = 0
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, report: dict) -> bool:
+        """Fold one report into the aggregates; False if its submissionId was already indexed.
+
+        Everything is read from the report before the first write, so a
+        malformed report raises without marking its submissionId as indexed.
+        """
+        db = self.db
+        submission = _clean(report.get("submissionId"))
+        fleet = _clean((report.get("customer") or {}).get("email")).casefold()
+        key, label = unit_key(report, self.key_mode)
+        seen = _clean((report.get("meta") or {}).get("generated_at_iso"))
+        month = seen[:7] if len(seen) >= 7 else "unknown"
+        confidence = report.get("confidence") or {}
+        score = _number(confidence.get("score_pct"))
+        threshold = _number(confidence.get("threshold_pct"))
+        verdict = _clean((report.get("customer_readiness_check") or {}).get("verdict"))
+        ready = 1 if verdict == "ready_for_customer" else 0
+        cost = report.get("estimated_cost_range_usd") or {}
+        low, high = _number(cost.get("low")), _number(cost.get("high"))
+        has_cost = low is not None and high is not None
+        codes = [code for code in dict.fromkeys(_clean(code).upper() for code in report.get("codes") or []) if code]
+        hypotheses = {}
+        for item in report.get("root_cause_hypotheses") or []:
+            text = _clean(item.get("hypothesis") if isinstance(item, dict) else item)
+            if text:
+                hypotheses.setdefault(text.casefold(), text)
+        cause = _clean(report.get("most_likely_cause")) or None
+
+        if submission:
+            if db.execute("INSERT OR IGNORE INTO submissions VALUES (?)", (submission,)).rowcount == 0:
+                self.skipped += 1
+                return False
+
+        unit_id, reports, new_unit = db.execute(
+            "INSERT INTO units (fleet, unit_key, label, first_seen) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (fleet, unit_key) DO UPDATE SET reports = reports "
+            "RETURNING id, reports, reports = 0",
+            (fleet, key, label, seen)).fetchone()
+        db.execute(
+            "UPDATE units SET reports = reports + 1, ready = ready + ?, score_sum = score_sum + ?, "
+            "score_n = score_n + ?, last_seen = MAX(COALESCE(last_seen, ''), ?), "
+            "last_cause = COALESCE(?, last_cause) WHERE id = ?",
+            (ready, score or 0.0, score is not None, seen, cause, unit_id))
+        db.execute(
+            "INSERT INTO fleets VALUES (?, 1, 1, ?, ?) ON CONFLICT (fleet) DO UPDATE SET "
+            "units = units + ?, reports = reports + 1, ready = ready + excluded.ready, "
+            "last_seen = MAX(last_seen, excluded.last_seen)",
+            (fleet, ready, seen, new_unit))
+
+        for code in codes:
+            count, = db.execute(
+                "INSERT INTO unit_codes VALUES (?, ?, 1, ?) ON CONFLICT (unit, code) DO UPDATE SET "
+                "count = count + 1, last_seen = MAX(COALESCE(last_seen, ''), excluded.last_seen) "
+                "RETURNING count",
+                (unit_id, code, seen)).fetchone()
+            db.execute(
+                "INSERT INTO fleet_codes VALUES (?, ?, 1, 1) ON CONFLICT (fleet, code) DO UPDATE SET "
+                "reports = reports + 1, units = units + ?",
+                (fleet, code, count == 1))
+
+        db.executemany(
+            "INSERT INTO unit_hypotheses VALUES (?, ?, ?, 1) ON CONFLICT (unit, hkey) DO UPDATE SET "
+            "count = count + 1",
+            [(unit_id, hkey, text) for hkey, text in hypotheses.items()])
+
+        db.execute(
+            "INSERT INTO unit_months VALUES (?, ?, 1, ?, ?, ?, ?, ?) ON CONFLICT (unit, month) DO UPDATE SET "
+            "reports = reports + 1, score_sum = score_sum + excluded.score_sum, "
+            "score_n = score_n + excluded.score_n, cost_low_sum = cost_low_sum + excluded.cost_low_sum, "
+            "cost_high_sum = cost_high_sum + excluded.cost_high_sum, cost_n = cost_n + excluded.cost_n",
+            (unit_id, month, score or 0.0, score is not None, low if has_cost else 0.0,
+             high if has_cost else 0.0, has_cost))
+        db.execute(
+            "INSERT OR REPLACE INTO unit_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (unit_id, reports % HISTORY_SLOTS, submission or None, seen or None, score, threshold,
+             verdict or None, low, high))
+
+        self.added += 1
+        if self.added % COMMIT_EVERY == 0:
+            db.commit()
+        return True
+
+    def fleets(self) -> list:
+        """[(fleet, units, reports, ready, last_seen)] ordered by report count."""
+        return self.db.execute("SELECT fleet, units, reports, ready, last_seen FROM fleets "
+                               "ORDER BY reports DESC, fleet").fetchall()
+
+    def _fleet_filter(self, fleet, column: str = "fleet") -> tuple:
+        if fleet is None:
+            return "", ()
+        return f"WHERE {column} = ?", (fleet.casefold(),)
+
+    def recurring_codes(self, fleet=None, limit: int = 10) -> list:
+        """[(code, reports, units)] most frequent first, across one fleet or all of them."""
+        where, params = self._fleet_filter(fleet)
+        return self.db.execute(f"SELECT code, SUM(reports), SUM(units) FROM fleet_codes {where} "
+                               f"GROUP BY code ORDER BY SUM(reports) DESC, code LIMIT ?",
+                               (*params, limit)).fetchall()
+
+    def top_units(self, fleet=None, limit: int = 10) -> list:
+        """Unit rows (as dicts) with the most reports first."""
+        where, params = self._fleet_filter(fleet)
+        self.db.row_factory = sqlite3.Row
+        try:
+            rows = self.db.execute(f"SELECT * FROM units {where} ORDER BY reports DESC, id LIMIT ?",
+                                   (*params, limit)).fetchall()
+        finally:
+            self.db.row_factory = None
+        return [dict(row) for row in rows]
+
+    def unit_detail(self, unit_id: int, limit: int = 5) -> dict:
+        """Recurring codes, repeated hypotheses, monthly trend and recent history (oldest first) of one unit."""
+        db = self.db
+        reports, = db.execute("SELECT reports FROM units WHERE id = ?", (unit_id,)).fetchone()
+        history = db.execute("SELECT slot, generated_at, score, threshold, verdict, cost_low, cost_high "
+                             "FROM unit_history WHERE unit = ?", (unit_id,)).fetchall()
+        history.sort(key=lambda row: (row[0] - reports) % HISTORY_SLOTS)
+        return {
+            "codes": db.execute("SELECT code, count FROM unit_codes WHERE unit = ? AND count > 1 "
+                                "ORDER BY count DESC, code LIMIT ?", (unit_id, limit)).fetchall(),
+            "hypotheses": db.execute("SELECT text, count FROM unit_hypotheses WHERE unit = ? AND count > 1 "
+                                     "ORDER BY count DESC, text LIMIT ?", (unit_id, limit)).fetchall(),
+            "months": db.execute("SELECT month, reports, score_sum, score_n, cost_low_sum, cost_high_sum, "
+                                 "cost_n FROM unit_months WHERE unit = ? ORDER BY month",
+                                 (unit_id,)).fetchall(),
+            "history": [row[1:] for row in history],
+        }
+
+def _cost_trend(months: list) -> str:
+    costs = [((low + high) / 2 / n, month) for month, _, _, _, low, high, n in months if n]
+    if not costs:
+        return "n/a"
+    first, first_month = costs[0]
+    last, last_month = costs[-1]
+    if len(costs) == 1 or not first:
+        return f"${last:,.0f} midpoint ({last_month})"
+    return f"${first:,.0f} ({first_month}) → ${last:,.0f} ({last_month}), {(last - first) / first:+.0%}"
+
+def render_rollup(index: RollupIndex, fleet=None, top: int = 10) -> str:
+    """Render the fleet summary Markdown from the index aggregates alone."""
+    fleets = index.fleets()
+    if fleet is not None:
+        fleets = [row for row in fleets if row[0] == fleet.casefold()]
+    units = sum(row[1] for row in fleets)
+    reports = sum(row[2] for row in fleets)
+    ready = sum(row[3] for row in fleets)
+    last_seen = max((row[4] for row in fleets), default="")
+
+    lines = ["# DiagnosticPro Fleet Rollup", ""]
+    lines.append(f"**Fleet:** {fleet or f'All fleets ({len(fleets):,})'}")
+    lines.append(f"**Reports:** {reports:,} across {units:,} units")
+    if reports:
+        lines.append(f"**Ready for customer:** {ready / reports:.0%}")
+    if last_seen:
+        lines.append(f"**Latest report:** {last_seen}")
+    lines += ["", "---", ""]
+
+    codes = index.recurring_codes(fleet, top)
+    if codes:
+        lines += ["## Recurring Codes", "", "| Code | Reports | Units |", "|------|---------|-------|"]
+        lines += [f"| {code} | {count:,} | {unit_count:,} |" for code, count, unit_count in codes]
+        lines += ["", "---", ""]
+
+    rows = index.top_units(fleet, top)
+    if rows:
+        lines += ["## Units by Submissions", ""]
+    for number, unit in enumerate(rows, 1):
+        detail = index.unit_detail(unit["id"])
+        average = f"{unit['score_sum'] / unit['score_n']:.0f}%" if unit["score_n"] else "n/a"
+        lines.append(f"### {number}. {unit['label']}")
+        lines.append("")
+        if fleet is None and unit["fleet"]:
+            lines.append(f"**Fleet:** {unit['fleet']}")
+        lines.append(f"**Reports:** {unit['reports']:,} ({unit['first_seen'] or 'n/a'} – "
+                     f"{unit['last_seen'] or 'n/a'}), {unit['ready'] / unit['reports']:.0%} ready for customer")
+        lines.append(f"**Average Confidence:** {average}")
+        lines.append(f"**Cost Trend:** {_cost_trend(detail['months'])}")
+        if unit["last_cause"]:
+            lines.append(f"**Latest Root Cause:** {unit['last_cause']}")
+        if detail["codes"]:
+            lines.append("**Recurring Codes:** " + ", ".join(f"{code} ×{count}" for code, count in detail["codes"]))
+        history = [f"{score:.0f}%" for _, score, _, _, _, _ in detail["history"] if score is not None]
+        if history:
+            lines.append(f"**Confidence History (last {len(history)}):** " + " → ".join(history))
+        if detail["hypotheses"]:
+            lines += ["", "**Repeated Hypotheses:**", ""]
+            lines += [f"- {text} — *{count} reports*" for text, count in detail["hypotheses"]]
+        lines.append("")
+    return "\n".join(lines).rstrip() + "\n"
+
+def add_reports(index: RollupIndex, sources: list) -> int:
+    """Index every readable report from sources; return the number of unreadable inputs."""
+    unreadable = 0
+    for label, report in iter_reports(sources):
+        if isinstance(report, Exception) or not isinstance(report, dict):
+            unreadable += 1
+            print(f"⚠️  Skipping {label}: {report if isinstance(report, Exception) else 'not a JSON object'}",
+                  file=sys.stderr)
+            continue
+        try:
+            index.add(report)
+        except (AttributeError, TypeError) as e:
+            unreadable += 1
+            print(f"⚠️  Skipping {label}: malformed report ({e})", file=sys.stderr)
+    index.db.commit()
+    return unreadable
+
+def main():
+    """Add reports to the rollup index or render the fleet summary from it."""
+    parser = argparse.ArgumentParser(description="Incremental per-equipment rollups across submissions.")
+    parser.add_argument("--index", default=str(DEFAULT_INDEX), help=f"rollup index file (default: {DEFAULT_INDEX})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="fold reports into the index")
+    add.add_argument("inputs", nargs="+", help="report JSON files, directories or .jsonl files; - for JSONL on stdin")
+    add.add_argument("--key", choices=KEY_MODES,
+                     help="group by equipment type/make/model/year or by submissionId prefix "
+                          "(default: equipment, or what the index was built with)")
+    summary = commands.add_parser("summary", help="render the fleet summary Markdown")
+    summary.add_argument("--fleet", help="limit to one fleet (customer email)")
+    summary.add_argument("--top", type=int, default=10, help="codes and units to list (default: 10)")
+    summary.add_argument("-o", "--output", help="write Markdown here instead of stdout")
+    args = parser.parse_args()
+
+    if args.command == "summary" and not Path(args.index).exists():
+        print(f"❌ No rollup index at {args.index}; run 'fleet_rollup.py add' first", file=sys.stderr)
+        sys.exit(1)
+    started = time.perf_counter()
+    try:
+        index = RollupIndex(args.index, getattr(args, "key", None))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    with index:
+        if args.command == "add":
+            unreadable = add_reports(index, args.inputs)
+            elapsed = time.perf_counter() - started
+            rate = index.added / elapsed if elapsed > 0 else 0.0
+            print(f"✅ Indexed {index.added:,} reports ({index.skipped:,} already indexed, {unreadable} unreadable) "
+                  f"in {elapsed:.2f}s ({rate:,.0f} reports/sec) → {args.index}")
+            sys.exit(1 if unreadable else 0)
+        markdown = render_rollup(index, args.fleet, args.top)
+    if args.output:
+        Path(args.output).write_text(markdown, encoding="utf-8")
+        print(f"📊 Fleet rollup written to {args.output} in {time.perf_counter() - started:.3f}s")
+    else:
+        sys.stdout.write(markdown)
+
+if __name__ == "__main__":
+    main()
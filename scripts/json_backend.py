@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro JSON Backend
+orjson for large payloads when it is installed, the standard library otherwise.
+
+Importing orjson costs about 20ms (it pulls in uuid, zoneinfo and platform),
+more than it saves on a single report: it parses only slightly faster than
+json here but serializes about six times faster, which breaks even around
+ORJSON_MIN_BYTES of input. So loads() and read_json() switch to orjson for
+inputs that large, and dumps() uses it once it has been imported.
+
+dumps() returns UTF-8 bytes in the same layout from either backend: compact
+("," and ":" separators) by default, 2-space indented with pretty=True,
+non-ASCII written as-is. read_json() memory-maps files of MMAP_MIN_BYTES and
+up instead of reading them into a second buffer; orjson parses the mapping
+in place, the stdlib parser takes one bytes copy of it.
+"""
+
+import json
+import os
+import sys
+
+ORJSON_MIN_BYTES = 2 * 1024 * 1024
+MMAP_MIN_BYTES = 1024 * 1024
+
+_orjson = None  # the module once imported, False when it is not installed
+
+def _fast(size: int):
+    """Return orjson if it is loaded, or worth loading for size bytes; else None."""
+    global _orjson
+    if _orjson is None and size >= ORJSON_MIN_BYTES:
+        try:
+            import orjson
+        except ImportError:
+            _orjson = False
+        else:
+            _orjson = orjson
+    return _orjson or None
+
+def backend() -> str:
+    """Name of the backend dumps() uses right now."""
+    return "orjson" if _orjson else "json"
+
+def loads(data):
+    """Parse JSON from bytes, bytearray, memoryview or str."""
+    fast = _fast(len(data))
+    if fast is not None:
+        return fast.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+def dumps(obj, pretty: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, compact unless pretty."""
+    if _orjson:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def read_json(path: str):
+    """Parse the JSON file at path ('-' reads stdin); large files are memory-mapped."""
+    if path == "-":
+        return loads(sys.stdin.buffer.read())
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_MIN_BYTES:
+            return loads(f.read())
+        import mmap
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            fast = _fast(size)
+            if fast is None:
+                return json.loads(mapped[:])
+            with memoryview(mapped) as view:
+                return fast.loads(view)
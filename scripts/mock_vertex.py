@@ -3,18 +3,119 @@
 DiagnosticPro Offline Mock Vertex AI Engine
 Generates schema-valid JSON responses without any API calls.
 Deterministic output for testing and validation.
+
+Only meta.generated_at_iso depends on anything but the submission; pass a
+fixed clock (fixed_clock(), --fixed-time/--deterministic) to get
+byte-identical reports for identical submissions. MockMemo adds an LRU memo
+in front of the generator for replay runs full of repeated submissions.
+
+Hypotheses, actions, parts, TSB refs and cost ranges come from the DTC
+knowledge base (dtc_knowledge.py), keyed by the submission's codes and
+equipment type.
+
+Usage:
+  mock_vertex.py [input.json]              one submission → pretty JSON report
+  mock_vertex.py --stream [--with-markdown] [--memo N [--memo-ignore-id]] [--profile] < submissions.jsonl
+                                           JSONL submissions → render → compact
+                                           JSONL metrics, one record at a time;
+                                           --memo reuses reports for repeated
+                                           submissions and prints hit stats;
+                                           --profile adds per-stage timings
+  Either mode: --fixed-time ISO or --deterministic (fixed at
+  DETERMINISTIC_TIMESTAMP) pins meta.generated_at_iso; --prompt-budget N
+  trims symptoms/notes to N prompt tokens first (prompt_budget.py) and
+  reports the before/after token counts.
+  mock_vertex.py --serve [options]         Vertex-compatible generateContent
+                                           HTTP server with fault injection
+                                           (see vertex_server.py --help)
 """
 
 import json
+import os
 import sys
-from datetime import datetime
-from pathlib import Path
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import partial
+
+from dtc_knowledge import load_knowledge_base
+
+LIKELIHOOD_RANK = {"high": 0, "medium": 1, "low": 2}
+
+DETERMINISTIC_TIMESTAMP = "2025-01-01T00:00:00Z"
+
+# The submission fields generate_mock_response() reads; the memo key ignores the rest
+SUBMISSION_FIELDS = ("submissionId", "customer", "equipment", "symptoms", "codes", "confidence_threshold_pct")
+
+# Expected JSON type of each submission field generate_mock_response() reads
+SUBMISSION_TYPES = {
+    "submissionId": (str, "a string"),
+    "customer": (dict, "an object"),
+    "equipment": (dict, "an object"),
+    "symptoms": (str, "a string"),
+    "codes": (list, "an array of strings"),
+    "confidence_threshold_pct": ((int, float), "a number"),
+}
+
+def submission_errors(input_data) -> list:
+    """Return why input_data cannot be passed to generate_mock_response(), or [] when it can."""
+    if not isinstance(input_data, dict):
+        return ["submission must be a JSON object"]
+    errors = []
+    for field, (types, expected) in SUBMISSION_TYPES.items():
+        value = input_data.get(field)
+        if field in input_data and (not isinstance(value, types) or isinstance(value, bool)):
+            errors.append(f"{field} must be {expected}")
+        elif field == "codes" and value and not all(isinstance(code, str) for code in value):
+            errors.append(f"{field} must be {expected}")
+        elif isinstance(value, dict):
+            errors.extend(f"{field}.{key} must be a string or number" for key, item in value.items()
+                          if item is not None and not isinstance(item, (str, int, float)))
+    return errors
+
+def fixed_clock(timestamp=DETERMINISTIC_TIMESTAMP):
+    """Return a clock that always reads timestamp (a naive UTC datetime or ISO-8601 string)."""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.removesuffix("Z"))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return lambda: timestamp
+
+def _merge(groups, key=None) -> list:
+    """Concatenate lists, dropping repeats (by item[key] for dicts)."""
+    merged = []
+    seen = set()
+    for group in groups:
+        for item in group:
+            marker = item[key] if key else item
+            if marker not in seen:
+                seen.add(marker)
+                merged.append(item)
+    return merged
+
+def _interleave(groups) -> list:
+    """Round-robin the lists in groups: a1, b1, a2, b2, ..."""
+    longest = max((len(group) for group in groups), default=0)
+    return [[group[i] for group in groups if i < len(group)] for i in range(longest)]
+
+def _as_text(value):
+    """Return a submission value as a string, keeping None.
 
-def generate_mock_response(input_data: dict) -> dict:
-    """Generate a complete, schema-valid diagnostic report."""
+    submission_errors() accepts numbers in customer and equipment fields
+    ("year": 2015); the report schema only allows strings there.
+    """
+    return value if value is None or isinstance(value, str) else str(value)
+
+def generate_mock_response(input_data: dict, clock=None) -> dict:
+    """Generate a complete, schema-valid diagnostic report.
+
+    clock() supplies meta.generated_at_iso as a naive UTC datetime
+    (default: datetime.utcnow).
+    """
 
     submission_id = input_data.get("submissionId", "MOCK-0001")
-    equipment = input_data.get("equipment", {})
+    equipment = {key: _as_text(value) for key, value in input_data.get("equipment", {}).items()}
+    customer = {key: _as_text(value) for key, value in input_data.get("customer", {}).items()}
     symptoms = input_data.get("symptoms", "No symptoms provided")
     codes = input_data.get("codes", [])
 
@@ -23,73 +124,33 @@ def generate_mock_response(input_data: dict) -> dict:
     has_detailed_symptoms = len(symptoms) > 100
     confidence_score = 88 if (has_codes and has_detailed_symptoms) else 72
 
-    # Build root cause hypotheses
-    hypotheses = [
-        {
-            "hypothesis": "Ignition coil failure on cylinder 1",
-            "evidence": "P0301 code indicates consistent misfire pattern; common failure mode for high-mileage engines",
-            "likelihood": "high"
-        },
-        {
-            "hypothesis": "Fuel injector clog or electrical fault",
-            "evidence": "Could explain single-cylinder misfire if injector stuck closed or driver circuit failed",
-            "likelihood": "medium"
-        },
-        {
-            "hypothesis": "Compression loss due to valve or ring failure",
-            "evidence": "Would show consistent misfire but typically accompanied by reduced power and smoke",
-            "likelihood": "low"
-        }
-    ]
+    # Resolve codes (or the equipment type) against the DTC knowledge base
+    kb = load_knowledge_base()
+    findings = [kb.expand(entry, code, equipment) for code, entry in kb.findings(codes, equipment.get("type"))]
+    primary = findings[0]
 
-    # Build recommended actions
-    actions = [
-        {
-            "step": "Swap ignition coil from cylinder 1 to another cylinder",
-            "why": "If misfire follows the coil, confirms coil failure; cheapest diagnostic step"
-        },
-        {
-            "step": "Check fuel injector resistance and spray pattern",
-            "why": "Rules out fuel delivery issue before replacing ignition components"
-        },
-        {
-            "step": "Perform compression test on cylinder 1",
-            "why": "Establishes baseline compression to rule out mechanical failure"
-        },
-        {
-            "step": "Scan for pending codes and freeze-frame data",
-            "why": "Captures engine conditions when misfire occurred for better diagnosis"
-        }
-    ]
+    # Root cause hypotheses: every finding's hypotheses, most likely first
+    hypotheses = _merge([finding["hypotheses"] for finding in findings], key="hypothesis")
+    hypotheses.sort(key=lambda hyp: LIKELIHOOD_RANK.get(hyp.get("likelihood"), len(LIKELIHOOD_RANK)))
+
+    # Recommended actions, interleaved so every code gets its first step early
+    actions = _merge(_interleave([finding["actions"] for finding in findings]), key="step")
 
     # Tools and parts
-    tools_parts = [
-        "OBD-II scanner with live data capability",
-        "Ignition coil (OEM or equivalent)",
-        "Spark plug socket and torque wrench",
-        "Compression tester kit",
-        "Fuel pressure gauge",
-        "Multimeter for resistance testing"
-    ]
+    tools_parts = _merge([finding["parts"] for finding in findings])
 
     # Safety notes
-    safety_notes = [
-        "Disconnect battery negative terminal before working on ignition system",
-        "Allow engine to cool before removing ignition components",
-        "Wear eye protection when releasing fuel system pressure",
-        "Use proper jack stands if raising vehicle; never rely on jack alone"
-    ]
+    safety_notes = kb.safety_notes(equipment.get("type"))
 
-    # Estimate costs
-    cost_range = {"low": 120, "high": 450}
-    time_hours = 2.5
+    # Estimate costs: the widest range and longest job across findings
+    cost_range = {
+        "low": min(finding["cost"][0] for finding in findings),
+        "high": max(finding["cost"][1] for finding in findings),
+    }
+    time_hours = max(finding["hours"] for finding in findings)
 
     # Warranty/TSB references
-    warranty_refs = [
-        "Ford TSB 08-7-6: Ignition coil failures on 5.4L engines (2004-2008)",
-        "Check warranty coverage if under 60,000 miles (powertrain)",
-        "Motorcraft DG508 coil is OEM replacement part"
-    ]
+    warranty_refs = _merge([finding["tsb_refs"] for finding in findings])
 
     # Disclaimers
     disclaimers = [
@@ -99,27 +160,35 @@ def generate_mock_response(input_data: dict) -> dict:
         "Second opinion recommended for repairs exceeding $500"
     ]
 
-    # Confidence uplift requirements (if below threshold)
+    # Confidence uplift requirements (if below the submission's threshold)
+    threshold = input_data.get("confidence_threshold_pct", 85)
     uplift_reqs = []
-    if confidence_score < 85:
-        uplift_reqs = [
-            "Freeze-frame data for P0301 showing engine RPM, load, and coolant temp",
-            "Ignition coil swap test results (does misfire follow the coil?)",
-            "Fuel trim data for all cylinders to rule out fuel delivery issues",
-            "Compression test results for cylinder 1 compared to other cylinders",
-            "Exact VIN and mileage for TSB applicability check"
+    if confidence_score < threshold:
+        uplift_reqs = _merge([finding["uplift"] for finding in findings])[:4] + [
+            "Exact VIN/serial number and mileage/hours for TSB applicability check"
         ]
 
     # Customer readiness check
     readiness_verdict = "ready_for_customer" if confidence_score >= 75 else "needs_revision"
-    readiness_reason = f"Confidence at {confidence_score}%, actionable steps provided, safety covered, cost estimates present" if readiness_verdict == "ready_for_customer" else "Insufficient diagnostic data; need freeze-frame and coil swap results"
+    if readiness_verdict == "ready_for_customer":
+        readiness_reason = f"Confidence at {confidence_score}%, actionable steps provided, safety covered, cost estimates present"
+    else:
+        # Name what this finding is missing, not a fixed misfire checklist
+        readiness_reason = f"Insufficient diagnostic data; confirm with {primary['confirm']}"
+        if primary["uplift"]:
+            readiness_reason += f"; still needed: {primary['uplift'][0]}"
+
+    # Multi-code findings are cut below the schema maxima so the report stays
+    # within the 4-page guard
+    hypotheses = hypotheses[:4]
+    actions = actions[:6]
 
     # Build complete response
     response = {
         "submissionId": submission_id,
         "customer": {
-            "email": input_data.get("customer", {}).get("email", "customer@example.com"),
-            "name": input_data.get("customer", {}).get("name", None)
+            "email": customer.get("email", "customer@example.com"),
+            "name": customer.get("name", None)
         },
         "equipment": {
             "type": equipment.get("type", "vehicle"),
@@ -130,7 +199,7 @@ def generate_mock_response(input_data: dict) -> dict:
         "symptoms": symptoms,
         "codes": codes if codes else [],
         "root_cause_hypotheses": hypotheses[:5],  # Max 5
-        "most_likely_cause": "Ignition coil failure on cylinder 1, likely due to heat stress and high mileage. P0301 code confirms consistent misfire pattern.",
+        "most_likely_cause": primary["cause"],
         "recommended_actions": actions[:8],  # Max 8
         "tools_parts": tools_parts[:12],  # Max 12
         "safety_notes": safety_notes[:6],  # Max 6
@@ -140,8 +209,10 @@ def generate_mock_response(input_data: dict) -> dict:
         "disclaimers": disclaimers[:10],  # Max 10
         "confidence": {
             "score_pct": confidence_score,
-            "threshold_pct": input_data.get("confidence_threshold_pct", 85),
-            "assessment": f"Moderate confidence based on code pattern; coil swap test would increase to 95%+ certainty."
+            "threshold_pct": threshold,
+            "assessment": f"{'High' if confidence_score >= 85 else 'Moderate'} confidence based on "
+                          f"{'code pattern' if has_codes else 'reported symptoms'}; "
+                          f"{primary['confirm']} would increase to 95%+ certainty."
         },
         "confidence_uplift_requirements": uplift_reqs[:8],  # Max 8
         "customer_readiness_check": {
@@ -151,27 +222,244 @@ def generate_mock_response(input_data: dict) -> dict:
         "meta": {
             "model": "mock-vertex-offline",
             "version": "1.0.0",
-            "generated_at_iso": datetime.utcnow().isoformat() + "Z"
+            "generated_at_iso": (clock or datetime.utcnow)().isoformat() + "Z"
         }
     }
 
     return response
 
+def submission_key(input_data: dict, ignore_submission_id: bool = False) -> bytes:
+    """Canonical bytes of the fields that determine a submission's report."""
+    from render_cache import canonical_json  # deferred: one-shot generation never keys submissions
+    fields = {name: input_data[name] for name in SUBMISSION_FIELDS if name in input_data}
+    if ignore_submission_id:
+        fields.pop("submissionId", None)
+    return canonical_json(fields)
+
+class MockMemo:
+    """LRU memo over generate_mock_response() keyed on the normalized submission.
+
+    Keys are the canonical JSON of SUBMISSION_FIELDS, so key order and
+    fields the generator never reads don't cause misses. With
+    ignore_submission_id, submissions differing only in submissionId share
+    one entry and the hit is returned with the caller's submissionId.
+    Cached reports are shared between hits; treat them as read-only.
+    Without a fixed clock a hit carries the timestamp of its first
+    generation.
+    """
+
+    def __init__(self, maxsize: int = 1024, clock=None, ignore_submission_id: bool = False):
+        self.maxsize = maxsize
+        self.clock = clock
+        self.ignore_submission_id = ignore_submission_id
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def generate(self, input_data: dict) -> dict:
+        """Return the report for input_data, generating it only on a miss."""
+        key = submission_key(input_data, self.ignore_submission_id)
+        report = self.entries.get(key)
+        if report is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            report = generate_mock_response(input_data, self.clock)
+            self.entries[key] = report
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        if self.ignore_submission_id:
+            submission_id = input_data.get("submissionId", "MOCK-0001")
+            if report["submissionId"] != submission_id:
+                return {**report, "submissionId": submission_id}
+        return report
+
+    def stats(self) -> dict:
+        """Hit/miss counters and hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def iter_submissions(stream):
+    """Yield (line_number, record_or_error) for each non-blank JSONL line."""
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield lineno, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield lineno, ValueError(f"invalid JSON ({e})")
+
+def stream_pipeline(stream, include_markdown: bool = False, generate=generate_mock_response,
+                    profile: bool = False, prompt_budget: int = None):
+    """Generate → render → measure one submission at a time.
+
+    Yields one compact result dict per input line. Only the current record,
+    its report and its Markdown are alive at any point, so memory stays flat
+    regardless of how many submissions are replayed (a MockMemo passed as
+    generate=memo.generate adds at most its maxsize reports). With profile,
+    each result carries per-stage wall/CPU times under "stages", including
+    every render_markdown() section. With prompt_budget (tokens), symptoms
+    and notes are trimmed by prompt_budget.trim_submission() before
+    generation and the result carries "promptTokens" before/after.
+    """
+    from page_model import estimate_pages
+    from prompt_budget import trim_submission
+    from render_from_json import render_markdown
+    from report_schema import validate_report
+    from stage_profiler import StageProfiler
+
+    records = iter_submissions(stream)
+    while True:
+        profiler = StageProfiler() if profile else None
+        started = time.perf_counter(), time.process_time()
+        item = next(records, None)
+        if item is None:
+            break
+        lineno, record = item
+        if isinstance(record, Exception):
+            yield {"line": lineno, "error": str(record)}
+            continue
+        prompt_tokens = None
+        try:
+            if profiler is not None:
+                # The line was read and parsed before the profiler saw it
+                profiler.add("json_load", time.perf_counter() - started[0], time.process_time() - started[1])
+                if prompt_budget is not None:
+                    with profiler.stage("prompt_budget"):
+                        record, prompt_tokens = trim_submission(record, prompt_budget)
+                with profiler.stage("generate"):
+                    report = generate(record)
+                with profiler.stage("render"):
+                    markdown = render_markdown(report, profiler)
+            else:
+                if prompt_budget is not None:
+                    record, prompt_tokens = trim_submission(record, prompt_budget)
+                report = generate(record)
+                markdown = render_markdown(report)
+        except Exception as e:
+            yield {"line": lineno, "submissionId": record.get("submissionId") if isinstance(record, dict) else None,
+                   "error": f"{type(e).__name__}: {e}"}
+            continue
+
+        char_count = len(markdown)
+        result = {
+            "line": lineno,
+            "submissionId": report["submissionId"],
+            "charCount": char_count,
+            "estimatedPages": round(estimate_pages(markdown), 3),
+            "confidenceScore": report["confidence"]["score_pct"],
+            "customerReadiness": report["customer_readiness_check"]["verdict"],
+        }
+        if prompt_tokens is not None:
+            result["promptTokens"] = {"before": prompt_tokens["before"]["total"],
+                                      "after": prompt_tokens["after"]["total"]}
+        if profiler is not None:
+            with profiler.stage("validate"):
+                result["schemaErrors"] = validate_report(report)
+            result["stages"] = profiler.as_dict()
+        else:
+            result["schemaErrors"] = validate_report(report)
+        if include_markdown:
+            result["markdown"] = markdown
+        yield result
+
+def parse_args(argv=None) -> "argparse.Namespace":
+    """Parse CLI arguments for one-shot and --stream generation."""
+    import argparse  # deferred: generate_mock_response() callers never parse argv
+    parser = argparse.ArgumentParser(
+        description="Generate schema-valid DiagnosticPro reports offline, without Vertex AI calls.",
+        epilog="mock_vertex.py --serve [options] runs the Vertex-compatible HTTP server instead "
+               "(see vertex_server.py --help)",
+    )
+    parser.add_argument("input", nargs="?", help="submission JSON file (default: stdin)")
+    clock = parser.add_mutually_exclusive_group()
+    clock.add_argument("--deterministic", action="store_true",
+                       help="pin meta.generated_at_iso to DETERMINISTIC_TIMESTAMP")
+    clock.add_argument("--fixed-time", metavar="ISO", help="pin meta.generated_at_iso to this time")
+    parser.add_argument("--prompt-budget", type=int, metavar="N",
+                        help="trim symptoms/notes to N prompt tokens first (prompt_budget.py)")
+    parser.add_argument("--stream", action="store_true",
+                        help="read JSONL submissions from stdin, write one compact JSONL result per line")
+    parser.add_argument("--with-markdown", action="store_true",
+                        help="with --stream, include the rendered Markdown in each result")
+    parser.add_argument("--memo", type=int, metavar="N",
+                        help="with --stream, reuse reports for repeated submissions (LRU of N entries)")
+    parser.add_argument("--memo-ignore-id", action="store_true",
+                        help="with --memo, match submissions regardless of submissionId")
+    parser.add_argument("--profile", action="store_true",
+                        help="with --stream, add per-stage timings to each result")
+    args = parser.parse_args(argv)
+
+    if args.stream and args.input:
+        parser.error("--stream reads submissions from stdin and takes no input file")
+    if not args.stream:
+        stream_only = [flag for flag, used in (("--with-markdown", args.with_markdown),
+                                                 ("--memo", args.memo is not None),
+                                                 ("--profile", args.profile)) if used]
+        if stream_only:
+            parser.error(f"{', '.join(stream_only)}: only valid with --stream")
+    if args.memo_ignore_id and args.memo is None:
+        parser.error("--memo-ignore-id needs --memo N")
+    return args
+
 def main():
     """Read input JSON from stdin or file, generate mock response, output to stdout."""
-    if len(sys.argv) > 1:
-        input_path = Path(sys.argv[1])
-        if not input_path.exists():
-            print(f"Error: Input file not found: {input_path}", file=sys.stderr)
+    if "--serve" in sys.argv[1:]:
+        from vertex_server import main as serve
+        argv = sys.argv[1:]
+        argv.remove("--serve")
+        sys.exit(serve(argv))
+
+    args = parse_args()
+    clock = fixed_clock(args.fixed_time) if args.fixed_time else fixed_clock() if args.deterministic else None
+
+    if args.stream:
+        # JSONL in, compact JSONL out: one result line per submission line
+        memo = None
+        generate = partial(generate_mock_response, clock=clock)
+        if args.memo is not None:
+            memo = MockMemo(args.memo, clock, args.memo_ignore_id)
+            generate = memo.generate
+        failures = 0
+        for result in stream_pipeline(sys.stdin, include_markdown=args.with_markdown, generate=generate,
+                                      profile=args.profile, prompt_budget=args.prompt_budget):
+            if "error" in result:
+                failures += 1
+            sys.stdout.write(json.dumps(result, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if memo is not None:
+            stats = memo.stats()
+            print(f"🧠 Memo: {stats['hits']} hit/{stats['misses']} miss ({stats['hitRate']:.1%}), "
+                  f"{stats['evictions']} evicted", file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+    if args.input:
+        if not os.path.exists(args.input):
+            print(f"Error: Input file not found: {args.input}", file=sys.stderr)
             sys.exit(1)
-        with open(input_path, 'r') as f:
+        with open(args.input, 'r') as f:
             input_data = json.load(f)
     else:
         # Read from stdin
         input_data = json.load(sys.stdin)
 
+    if args.prompt_budget is not None:
+        from prompt_budget import trim_submission
+        input_data, metrics = trim_submission(input_data, args.prompt_budget)
+        print(f"📊 Prompt tokens: {metrics['before']['total']} → {metrics['after']['total']}", file=sys.stderr)
+
     # Generate mock response
-    response = generate_mock_response(input_data)
+    response = generate_mock_response(input_data, clock)
 
     # Output as JSON (pretty-printed for readability)
     print(json.dumps(response, indent=2, ensure_ascii=False))
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Page Model
+Layout-aware page estimate for rendered report Markdown, no PDF engine needed.
+
+Replaces the chars/3000 heuristic. The Markdown is walked block by block the
+way pandoc lays it out: soft-wrapped lines merge into paragraphs, headings and
+rules take fixed vertical space, list items wrap at their indent, and pipe
+table rows wrap per column. Line widths come from IBM Plex Mono's advance
+width (read from the backend fonts directory) on US Letter with the 0.75in
+margins passed to pandoc.
+
+The vertical constants can be fitted to real PDFs with pdf_pages.py
+--calibrate; when the fit is saved as CALIBRATION_PATH
+(scripts/page_model.calibration.json), default_model() and estimate_pages()
+use it instead of DEFAULTS.
+
+Usage:
+  page_model.py <report.md> [...]   print the estimated pages for each file
+"""
+
+import json
+import math
+import re
+import struct
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+FONT_PATH = ROOT / "02-src" / "backend" / "services" / "backend" / "fonts" / "IBMPlexMono-Regular.ttf"
+# pdf_pages.py --calibrate --write target that default_model() picks up
+CALIBRATION_PATH = ROOT / "scripts" / "page_model.calibration.json"
+
+PAGE_CAP = 6
+
+# Layout constants in points (1in = 72pt); fitted values can be passed to PageModel
+DEFAULTS = {
+    "page_width": 612.0,
+    "page_height": 792.0,
+    "margin": 54.0,           # geometry:margin=0.75in
+    "font_size": 10.0,
+    "leading": 1.2,           # baselineskip / font size
+    "paragraph_gap": 6.0,     # pandoc template \parskip
+    "heading_sizes": (14.4, 12.0, 10.95),
+    "heading_before": 12.0,
+    "heading_after": 6.0,
+    "rule_height": 14.0,
+    "table_row_padding": 3.0,
+    "table_gap": 8.0,
+    "list_indent_chars": 3,
+    "wrap_slack": 0.0,        # extra lines per wrapped paragraph, fitted by calibration
+}
+
+_ORDERED_ITEM = re.compile(r"\d+\.\s")
+_WORD = re.compile(r"\S+")
+
+# Longer texts are scanned word by word instead of split() into a list
+SPLIT_MAX_CHARS = 65536
+
+# Scalar counts from PageModel.layout_counts(); "headings" is per level
+LAYOUT_COUNTS = ("lines", "wrapped", "paragraphs", "rules", "tables", "table_rows")
+
+def _plain(text: str) -> str:
+    """Drop emphasis/code markers, which take no horizontal space once typeset."""
+    return text.replace("*", "").replace("`", "") if "*" in text or "`" in text else text
+
+def _list_body(line: str):
+    """Return the item text if line (already stripped) starts a list item, else None."""
+    first = line[0]
+    if first in "-*+" and line[1:2] == " ":
+        return line[2:]
+    if first.isdigit():
+        match = _ORDERED_ITEM.match(line)
+        if match:
+            return line[match.end():]
+    return None
+
+_font_metrics = None
+
+def read_font_metrics(path: Path = FONT_PATH) -> dict:
+    """Return advance width and line height (em fractions) from a TrueType font.
+
+    Falls back to Plex Mono's published metrics when the font is not on disk.
+    """
+    global _font_metrics
+    if _font_metrics is not None:
+        return _font_metrics
+    metrics = {"advance": 0.6, "line_height": 1.3}
+    try:
+        data = path.read_bytes()
+        tables = {}
+        for index in range(struct.unpack(">H", data[4:6])[0]):
+            tag, _, offset, _ = struct.unpack(">4sIII", data[12 + 16 * index:28 + 16 * index])
+            tables[tag] = offset
+        units = struct.unpack(">H", data[tables[b"head"] + 18:tables[b"head"] + 20])[0]
+        ascender, descender, gap = struct.unpack(">hhh", data[tables[b"hhea"] + 4:tables[b"hhea"] + 10])
+        # Monospaced: every glyph shares the first hmtx advance
+        advance = struct.unpack(">H", data[tables[b"hmtx"]:tables[b"hmtx"] + 2])[0]
+        metrics = {"advance": advance / units, "line_height": (ascender - descender + gap) / units}
+    except (OSError, KeyError, struct.error):
+        pass
+    _font_metrics = metrics
+    return metrics
+
+def wrapped_lines(text: str, width: int) -> int:
+    """Count lines after greedy word wrapping text at width characters."""
+    if len(text) <= width:
+        return 1
+    lines, used = 1, 0
+    if len(text) <= SPLIT_MAX_CHARS:
+        sizes = map(len, text.split())
+    else:
+        sizes = (match.end() - match.start() for match in _WORD.finditer(text))
+    for size in sizes:
+        while size > width:  # words longer than a line are broken
+            if used:
+                lines += 1
+            used = 0
+            size -= width
+            lines += 1
+        if used == 0:
+            used = size
+        elif used + 1 + size <= width:
+            used += 1 + size
+        else:
+            lines += 1
+            used = size
+    return lines
+
+class PageModel:
+    """Estimate rendered pages for report Markdown in O(document length)."""
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown page model parameters: {', '.join(sorted(unknown))}")
+        self.params = {**DEFAULTS, **overrides}
+        p = self.params
+        metrics = read_font_metrics()
+        self.text_width = p["page_width"] - 2 * p["margin"]
+        self.text_height = p["page_height"] - 2 * p["margin"]
+        self.line = p["font_size"] * p["leading"]
+        self.chars_per_line = max(10, int(self.text_width / (metrics["advance"] * p["font_size"])))
+
+    @classmethod
+    def from_calibration(cls, path):
+        """Build a model from the "params" of a scripts/pdf_pages.py --calibrate JSON file."""
+        params = json.loads(Path(path).read_text(encoding="utf-8"))["params"]
+        if "heading_sizes" in params:
+            params["heading_sizes"] = tuple(params["heading_sizes"])
+        return cls(**params)
+
+    def _count_text(self, counts: dict, text: str, indent: int = 0) -> None:
+        lines = wrapped_lines(_plain(text), self.chars_per_line - indent)
+        counts["lines"] += lines
+        if lines > 1:
+            counts["wrapped"] += 1
+
+    def _count_table(self, counts: dict, rows: list) -> None:
+        cells = [[c.strip() for c in row.strip().strip("|").split("|")] for row in rows]
+        body = [row for row in cells if not all(set(c) <= set("-: ") for c in row)]
+        columns = max(len(row) for row in cells)
+        natural = [max((len(_plain(row[i])) for row in body if i < len(row)), default=1)
+                   for i in range(columns)]
+        total = sum(natural) + 3 * columns
+        if total <= self.chars_per_line:
+            widths = natural
+        else:
+            widths = [max(4, int((self.chars_per_line - 3 * columns) * n / sum(natural))) for n in natural]
+        counts["tables"] += 1
+        for row in body:
+            counts["lines"] += max(wrapped_lines(_plain(cell), widths[i])
+                                   for i, cell in enumerate(row[:columns]))
+            counts["table_rows"] += 1
+
+    def layout_counts(self, markdown: str) -> dict:
+        """Count the layout elements of markdown that height_from_counts() weighs.
+
+        Line counts depend only on the page geometry and font size, so a
+        calibration can count a corpus once and refit the vertical constants
+        (leading, gaps, wrap_slack) without walking the Markdown again.
+        """
+        counts = dict.fromkeys(LAYOUT_COUNTS, 0)
+        counts["headings"] = [0] * len(self.params["heading_sizes"])
+        paragraph = []
+        indent = 0
+        table = []
+
+        # Each pass through the loop first closes the open paragraph/table when
+        # the current line cannot continue it.
+        for raw in markdown.split("\n"):
+            line = raw.strip()
+            item = _list_body(line) if line else None
+            continues = line and item is None and line[0] not in "#|" and line != "---"
+            if paragraph and not continues:
+                self._count_text(counts, " ".join(paragraph), indent)
+                if not indent:
+                    counts["paragraphs"] += 1
+                paragraph = []
+            if table and not line.startswith("|"):
+                self._count_table(counts, table)
+                table = []
+
+            if not line:
+                indent = 0
+            elif line[0] == "#":
+                level = min(len(line) - len(line.lstrip("#")), 3)
+                counts["headings"][level - 1] += 1
+            elif line == "---":
+                counts["rules"] += 1
+            elif line[0] == "|":
+                table.append(line)
+            elif item is not None:
+                indent = self.params["list_indent_chars"]
+                paragraph.append(item)
+            else:
+                paragraph.append(line)
+
+        if paragraph:
+            self._count_text(counts, " ".join(paragraph), indent)
+        if table:
+            self._count_table(counts, table)
+        return counts
+
+    def height_from_counts(self, counts: dict, params: dict = None) -> float:
+        """Return the laid-out height in points for layout_counts() output.
+
+        params overrides the vertical constants for this call only (used by
+        calibration); geometry and font size are fixed by the counts.
+        """
+        p = {**self.params, **params} if params else self.params
+        line = p["font_size"] * p["leading"]
+        headings = sum(count * (p["heading_before"] + size * p["leading"] + p["heading_after"])
+                       for count, size in zip(counts["headings"], p["heading_sizes"]))
+        return ((counts["lines"] + counts["wrapped"] * p["wrap_slack"]) * line + headings
+                + counts["paragraphs"] * p["paragraph_gap"] + counts["rules"] * p["rule_height"]
+                + counts["table_rows"] * p["table_row_padding"] + counts["tables"] * p["table_gap"])
+
+    def estimate_height(self, markdown: str) -> float:
+        """Return the total laid-out height of markdown in points."""
+        return self.height_from_counts(self.layout_counts(markdown))
+
+    def estimate(self, markdown: str) -> float:
+        """Return the estimated page count (fractional) for markdown."""
+        return self.estimate_height(markdown) / self.text_height
+
+_default_model = None
+
+def default_model() -> PageModel:
+    """Return the process-wide model, fitted from CALIBRATION_PATH when that file exists."""
+    global _default_model
+    if _default_model is None:
+        if CALIBRATION_PATH.exists():
+            _default_model = PageModel.from_calibration(CALIBRATION_PATH)
+        else:
+            _default_model = PageModel()
+    return _default_model
+
+def estimate_pages(markdown: str) -> float:
+    """Estimate pages for markdown with the default model."""
+    return default_model().estimate(markdown)
+
+def main():
+    """Print the page estimate for each Markdown file given."""
+    if len(sys.argv) < 2:
+        print("Usage: page_model.py <report.md> [...]", file=sys.stderr)
+        sys.exit(1)
+    status = 0
+    for name in sys.argv[1:]:
+        pages = estimate_pages(Path(name).read_text(encoding="utf-8"))
+        flag = "  ⚠️  exceeds 6-page hard cap" if math.ceil(pages) > PAGE_CAP else ""
+        print(f"{name}: ~{pages:.2f} pages{flag}")
+        if flag:
+            status = 1
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro PDF Backend
+Markdown → PDF conversion engines and a persistent worker pool.
+
+Engines:
+  pandoc  pandoc + xelatex (the historical path; needs pandoc and LaTeX)
+  text    pure-Python monospace PDF writer, no LaTeX or third-party packages
+  auto    pandoc when it is on PATH, otherwise PDF generation is skipped
+
+PdfWorkerPool keeps a fixed set of worker threads alive for the whole run and
+feeds them from a bounded queue, so a batch of reports neither spawns an
+unbounded number of pandoc processes nor pays thread setup per document.
+"""
+
+import shutil
+import textwrap
+import time
+from pathlib import Path
+
+PANDOC_ARGS = ["--pdf-engine=xelatex", "-V", "geometry:margin=0.75in"]
+ENGINE_CHOICES = ("auto", "pandoc", "text", "none")
+
+class PdfEngineError(RuntimeError):
+    """Raised when an engine fails to convert a document."""
+
+class PandocEngine:
+    """Convert Markdown files with pandoc (xelatex by default)."""
+
+    name = "pandoc"
+
+    def __init__(self, extra_args=None, executable: str = "pandoc"):
+        self.executable = executable
+        self.extra_args = list(PANDOC_ARGS if extra_args is None else extra_args)
+
+    def available(self) -> bool:
+        return shutil.which(self.executable) is not None
+
+    def convert(self, md_path, pdf_path) -> None:
+        import subprocess  # deferred: single-report CLI runs without pandoc never need it
+        try:
+            subprocess.run(
+                [self.executable, str(md_path), "-o", str(pdf_path), *self.extra_args],
+                check=True, capture_output=True,
+            )
+        except FileNotFoundError as e:
+            raise PdfEngineError(f"{self.executable} not found") from e
+        except subprocess.CalledProcessError as e:
+            stderr = (e.stderr or b"").decode("utf-8", "replace").strip().splitlines()
+            raise PdfEngineError(stderr[-1] if stderr else f"pandoc exited {e.returncode}") from e
+
+class TextPdfEngine:
+    """Dependency-free PDF writer for rendered reports.
+
+    Lays Markdown out as wrapped Courier text on US Letter with the same
+    0.75in margins as the pandoc path. Headings and bold-only lines use
+    Courier-Bold and horizontal rules become drawn lines; everything else is
+    emitted verbatim minus emphasis markers. Both fonts are PDF base-14, so
+    nothing is embedded and output stays small. The /Producer entry marks
+    these PDFs so page-model calibration can tell them from typeset ones.
+    """
+
+    name = "text"
+    PRODUCER = b"DiagnosticPro TextPdfEngine"
+
+    PAGE_WIDTH = 612
+    PAGE_HEIGHT = 792
+    MARGIN = 54  # 0.75in
+    FONT_SIZE = 9
+    LEADING = 11
+
+    # WinAnsiEncoding has no emoji; keep the decision-matrix meaning readable.
+    REPLACEMENTS = {
+        "✅": "[OK]", "⚠️": "[!]", "⚠": "[!]", "🔴": "[!!]", "🚫": "[X]",
+        "→": "->", "×": "x", "≥": ">=", "≤": "<=",
+    }
+
+    def available(self) -> bool:
+        return True
+
+    @property
+    def chars_per_line(self) -> int:
+        return int((self.PAGE_WIDTH - 2 * self.MARGIN) / (self.FONT_SIZE * 0.6))
+
+    @property
+    def lines_per_page(self) -> int:
+        return int((self.PAGE_HEIGHT - 2 * self.MARGIN) / self.LEADING)
+
+    def layout(self, markdown: str) -> list:
+        """Return pages as lists of (kind, text) where kind is 'text', 'bold' or 'rule'."""
+        pages, page = [], []
+        width = self.chars_per_line
+        per_page = self.lines_per_page
+
+        def emit(kind, text=""):
+            nonlocal page
+            if len(page) >= per_page:
+                pages.append(page)
+                page = []
+            page.append((kind, text))
+
+        for raw in markdown.split("\n"):
+            stripped = raw.strip()
+            if stripped == "---":
+                emit("rule")
+                continue
+            kind = "text"
+            text = raw
+            if stripped.startswith("#"):
+                kind = "bold"
+                text = stripped.lstrip("#").strip()
+            elif stripped.startswith("**") and stripped.endswith("**") and stripped.count("**") == 2:
+                kind = "bold"
+            text = text.replace("**", "")
+            if not text.strip():
+                emit(kind, "")
+                continue
+            indent = len(text) - len(text.lstrip(" "))
+            for chunk in textwrap.wrap(text, width=width, subsequent_indent=" " * (indent + 2),
+                                       drop_whitespace=True, break_long_words=True) or [""]:
+                emit(kind, chunk)
+
+        if page or not pages:
+            pages.append(page)
+        return pages
+
+    @classmethod
+    def _encode(cls, text: str) -> bytes:
+        for src, dst in cls.REPLACEMENTS.items():
+            text = text.replace(src, dst)
+        data = text.replace("\ufe0f", "").encode("cp1252", errors="replace")
+        return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def _content_stream(self, page: list) -> bytes:
+        out = [b"BT", b"%d TL" % self.LEADING]
+        top = self.PAGE_HEIGHT - self.MARGIN - self.FONT_SIZE
+        out.append(b"%d %d Td" % (self.MARGIN, top))
+        rules = []
+        current_font = None
+        for index, (kind, text) in enumerate(page):
+            if kind == "rule":
+                y = top - index * self.LEADING + self.FONT_SIZE // 3
+                rules.append(b"%d %d m %d %d l" % (self.MARGIN, y, self.PAGE_WIDTH - self.MARGIN, y))
+                out.append(b"T*" if index else b"")
+                continue
+            font = b"/F2" if kind == "bold" else b"/F1"
+            if font != current_font:
+                out.append(b"%s %d Tf" % (font, self.FONT_SIZE))
+                current_font = font
+            prefix = b"T* " if index else b""
+            out.append(prefix + b"(" + self._encode(text) + b") Tj")
+        out.append(b"ET")
+        if rules:
+            out.append(b"q 0.5 w")
+            out.extend(rules)
+            out.append(b"S Q")
+        return b"\n".join(part for part in out if part)
+
+    def render(self, markdown: str) -> bytes:
+        """Return a complete PDF document for markdown."""
+        pages = self.layout(markdown)
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            None,  # page tree, filled once page object numbers are known
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        kids = []
+        for page in pages:
+            stream = self._content_stream(page)
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+            content_ref = len(objects)
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                % (self.PAGE_WIDTH, self.PAGE_HEIGHT, content_ref)
+            )
+            kids.append(b"%d 0 R" % len(objects))
+        objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+        objects.append(b"<< /Producer (%s) >>" % self.PRODUCER)
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objects) + 1, len(objects), xref)
+        return bytes(out)
+
+    def convert(self, md_path, pdf_path) -> None:
+        markdown = Path(md_path).read_text(encoding="utf-8")
+        Path(pdf_path).write_bytes(self.render(markdown))
+
+def select_engine(name: str = "auto"):
+    """Return the engine for name, or None when PDF output is disabled/unavailable."""
+    if name == "none":
+        return None
+    if name == "text":
+        return TextPdfEngine()
+    engine = PandocEngine()
+    if name == "auto" and not engine.available():
+        return None
+    return engine
+
+def skip_reason(name: str) -> str:
+    """Why select_engine(name) returned None, for the "no PDF" notice."""
+    if name == "none":
+        return "PDF output disabled (--pdf-engine none)"
+    return "Pandoc not available; skipping PDF generation"
+
+def convert_pdf(engine, md_path, pdf_path) -> Path:
+    """Run engine.convert(); any failure surfaces as PdfEngineError."""
+    try:
+        engine.convert(md_path, pdf_path)
+    except PdfEngineError:
+        raise
+    except Exception as e:
+        raise PdfEngineError(f"{engine.name}: {type(e).__name__}: {e}") from e
+    return Path(pdf_path)
+
+class PdfWorkerPool:
+    """Long-lived worker threads converting queued Markdown files to PDF.
+
+    submit() blocks once `queue_size` documents are waiting, which bounds both
+    memory and the number of conversions in flight (`workers`). Each call
+    returns a Future resolving to the PDF path or raising PdfEngineError; once
+    it is done, its `seconds` attribute holds the conversion's (wall, CPU) time.
+    """
+
+    def __init__(self, engine, workers: int = 2, queue_size: int = 0):
+        import queue
+        import threading
+        self.engine = engine
+        self._queue = queue.Queue(maxsize=queue_size or workers * 2)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"pdf-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            future, md_path, pdf_path = item
+            if future.set_running_or_notify_cancel():
+                started, cpu_started = time.perf_counter(), time.thread_time()
+                try:
+                    result = convert_pdf(self.engine, md_path, pdf_path)
+                except PdfEngineError as e:
+                    result = e
+                future.seconds = (time.perf_counter() - started, time.thread_time() - cpu_started)
+                if isinstance(result, PdfEngineError):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            self._queue.task_done()
+
+    def submit(self, md_path, pdf_path) -> "Future":
+        from concurrent.futures import Future  # deferred: pulls in logging
+        future = Future()
+        self._queue.put((future, md_path, pdf_path))
+        return future
+
+    def close(self) -> None:
+        """Finish all queued conversions and stop the workers."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro PDF Page Counter
+Page counts read straight from rendered PDFs, cap checks and page model calibration.
+
+Each PDF is memory-mapped and only the bytes the count needs are touched:
+the startxref offset in the tail, the cross-reference table or stream
+(following /Prev and /XRefStm through incremental updates), the trailer's
+/Root catalog and its /Pages tree root, whose /Count is the page count.
+Compressed object streams and PNG-predicted xref streams (PDF 1.5+, as
+xelatex writes them) are inflated with zlib; nothing else is decoded. Files
+with a damaged xref fall back to counting /Type /Page objects. No PDF library
+or external binary is used, and files are spread over a process pool.
+
+Every PDF is checked against its page cap: --cap (default: the 6-page hard
+cap), or the 4/6-page fixture limits of report_guards.page_limit() with
+--fixture-limits. With --calibrate, PDFs whose source sits next to them
+(report.md, or report JSON rendered with render_markdown) are paired with the
+page model's layout counts, and the vertical constants (leading,
+paragraph_gap, wrap_slack) are grid-fitted so that the rounded-up estimate
+matches the real page count, preferring over- to under-estimates. --write
+saves the fit to page_model.CALIBRATION_PATH, where every page estimate
+(page_model.default_model()) picks it up, or to another path for
+PageModel.from_calibration(). Only PDFs whose /Producer or
+/Creator names pandoc/xelatex are fitted: the page model describes that
+layout, and PDFs from other producers (the 9pt Courier TextPdfEngine among
+them) are skipped with a warning.
+
+Usage:
+  pdf_pages.py                                  # docs/out and tests/regress vs the 6-page cap
+  pdf_pages.py docs/out/synth --fixture-limits --list
+  pdf_pages.py docs/out --calibrate --write     # applied via scripts/page_model.calibration.json
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import re
+import statistics
+import sys
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from page_model import CALIBRATION_PATH, PAGE_CAP, PageModel
+from report_guards import page_limit
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_INPUTS = [str(ROOT / "docs" / "out"), str(ROOT / "tests" / "regress")]
+CALIBRATION_VERSION = 1
+# startxref and %%EOF sit in the last few hundred bytes; leave room for trailing junk
+TAIL_BYTES = 2048
+
+STARTXREF = re.compile(rb"startxref\s+(\d+)")
+XREF_KEYWORD = re.compile(rb"\s*xref\b")
+XREF_SUBSECTION = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*\r?\n")
+XREF_ENTRY = re.compile(rb"\s*(\d{10})\s+(\d{5})\s+([nf])")
+TRAILER = re.compile(rb"\s*trailer\s*")
+OBJ_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b\s*")
+STREAM_KEYWORD = re.compile(rb"\s*stream\r?\n")
+# Literal strings are skipped so a ">>" inside one does not close the dict
+DICT_TOKEN = re.compile(rb"<<|>>|\((?:[^()\\]|\\.)*\)", re.S)
+PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+INFO_STRING = {name: re.compile(rb"/" + name + rb"\s*(?:\(((?:[^()\\]|\\.)*)\)|<([0-9A-Fa-f\s]*)>)", re.S)
+               for name in (b"Producer", b"Creator")}
+# Producers whose layout the page model describes; anything else is not calibrated against
+TYPESET_PRODUCERS = ("xdvipdfmx", "xetex", "pandoc")
+
+# Calibration grid for the vertical layout constants
+FIT_GRID = {
+    "leading": [round(1.0 + 0.02 * step, 2) for step in range(31)],
+    "paragraph_gap": [float(step) for step in range(13)],
+    "wrap_slack": [round(0.1 * step, 1) for step in range(11)],
+}
+
+class PdfStructureError(ValueError):
+    """The xref/page tree could not be followed."""
+
+def _key(name: str) -> re.Pattern:
+    return re.compile(rb"/" + name.encode() + rb"(?![A-Za-z])\s*(\d+)(?:\s+(\d+)\s+R\b)?")
+
+KEY_PATTERNS = {name: _key(name) for name in
+                ("Root", "Pages", "Count", "Prev", "Info", "XRefStm", "Size", "Length", "N", "First", "Predictor", "Columns")}
+
+def dict_at(buf, pos: int) -> tuple[bytes, int]:
+    """Return (dictionary bytes, end offset) for the << ... >> starting at pos."""
+    if buf[pos:pos + 2] != b"<<":
+        raise PdfStructureError(f"expected a dictionary at byte {pos}")
+    depth = 0
+    for match in DICT_TOKEN.finditer(buf, pos):
+        token = match.group()
+        if token == b"<<":
+            depth += 1
+        elif token == b">>":
+            depth -= 1
+            if depth == 0:
+                return bytes(buf[pos:match.end()]), match.end()
+    raise PdfStructureError(f"unterminated dictionary at byte {pos}")
+
+def lookup(dictionary: bytes, name: str):
+    """Return (value, is_reference) for an integer or indirect /name entry, or (None, False)."""
+    match = KEY_PATTERNS[name].search(dictionary)
+    if match is None:
+        return None, False
+    return int(match.group(1)), match.group(2) is not None
+
+def _integers(dictionary: bytes, name: str) -> list:
+    match = re.search(rb"/" + name.encode() + rb"\s*\[([^\]]*)\]", dictionary)
+    return [int(value) for value in match.group(1).split()] if match else []
+
+def _unpredict(data: bytes, columns: int) -> bytes:
+    """Undo PNG row predictors (one byte per pixel, as xref streams use)."""
+    out = bytearray()
+    previous = bytearray(columns)
+    for start in range(0, len(data), columns + 1):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + 1 + columns])
+        for i in range(len(row)):
+            left = row[i - 1] if i else 0
+            up = previous[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + ((left + up) >> 1)) & 0xFF
+            elif kind == 4:
+                upper_left = previous[i - 1] if i else 0
+                estimate = left + up - upper_left
+                guess = min((abs(estimate - left), 0, left), (abs(estimate - up), 1, up),
+                            (abs(estimate - upper_left), 2, upper_left))[2]
+                row[i] = (row[i] + guess) & 0xFF
+        out += row
+        previous = row
+    return bytes(out)
+
+class PdfIndex:
+    """Lazy cross-reference index over a PDF held in a bytes-like buffer."""
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.entries = {}  # object number -> (1, offset) or (2, object stream, index)
+        self.trailer = None
+        self._object_streams = {}
+        tail_start = max(0, len(buf) - TAIL_BYTES)
+        matches = list(STARTXREF.finditer(buf, tail_start))
+        if not matches:
+            raise PdfStructureError("no startxref")
+        offset = int(matches[-1].group(1))
+        seen = set()
+        # Newest section first: entries already indexed win over older ones
+        while offset is not None and offset not in seen:
+            seen.add(offset)
+            trailer = self._read_section(offset)
+            if self.trailer is None:
+                self.trailer = trailer
+            hybrid, _ = lookup(trailer, "XRefStm")
+            if hybrid is not None and hybrid not in seen:
+                seen.add(hybrid)
+                self._read_section(hybrid)
+            offset, _ = lookup(trailer, "Prev")
+
+    def _read_section(self, offset: int) -> bytes:
+        if offset >= len(self.buf):
+            raise PdfStructureError(f"xref offset {offset} past end of file")
+        keyword = XREF_KEYWORD.match(self.buf, offset)
+        if keyword is not None:
+            return self._read_table(keyword.end())
+        return self._read_stream_section(offset)
+
+    def _read_table(self, pos: int) -> bytes:
+        while True:
+            subsection = XREF_SUBSECTION.match(self.buf, pos)
+            if subsection is None:
+                break
+            pos = subsection.end()
+            first, count = int(subsection.group(1)), int(subsection.group(2))
+            for number in range(first, first + count):
+                entry = XREF_ENTRY.match(self.buf, pos)
+                if entry is None:
+                    raise PdfStructureError(f"bad xref entry at byte {pos}")
+                pos = entry.end()
+                if entry.group(3) == b"n":
+                    self.entries.setdefault(number, (1, int(entry.group(1))))
+                else:
+                    self.entries.setdefault(number, (0,))
+        trailer = TRAILER.match(self.buf, pos)
+        if trailer is None:
+            raise PdfStructureError(f"no trailer after xref table at byte {pos}")
+        return dict_at(self.buf, trailer.end())[0]
+
+    def _stream(self, pos: int) -> tuple[bytes, bytes]:
+        """Return (dictionary, decoded data) for the stream object at pos."""
+        header = OBJ_HEADER.match(self.buf, pos)
+        if header is None:
+            raise PdfStructureError(f"no object at byte {pos}")
+        dictionary, end = dict_at(self.buf, header.end())
+        keyword = STREAM_KEYWORD.match(self.buf, end)
+        if keyword is None:
+            raise PdfStructureError(f"object at byte {pos} is not a stream")
+        start = keyword.end()
+        length, indirect = lookup(dictionary, "Length")
+        if length is None or indirect:
+            length = self.buf.find(b"endstream", start) - start
+            if length < 0:
+                raise PdfStructureError(f"unterminated stream at byte {pos}")
+        data = bytes(self.buf[start:start + length])
+        filters = re.findall(rb"/(\w+Decode)\b", dictionary)
+        if filters and filters != [b"FlateDecode"]:
+            raise PdfStructureError(f"unsupported stream filter {b' '.join(filters).decode()}")
+        if filters:
+            data = zlib.decompressobj().decompress(data)
+        predictor, _ = lookup(dictionary, "Predictor")
+        if predictor is not None and predictor >= 10:
+            columns, _ = lookup(dictionary, "Columns")
+            data = _unpredict(data, columns or 1)
+        return dictionary, data
+
+    def _read_stream_section(self, offset: int) -> bytes:
+        dictionary, data = self._stream(offset)
+        if not re.search(rb"/Type\s*/XRef\b", dictionary):
+            raise PdfStructureError(f"startxref {offset} points at neither an xref table nor stream")
+        widths = _integers(dictionary, "W")
+        if len(widths) != 3:
+            raise PdfStructureError("xref stream without /W [a b c]")
+        index = _integers(dictionary, "Index") or [0, lookup(dictionary, "Size")[0] or 0]
+        pos = 0
+        for first, count in zip(index[::2], index[1::2]):
+            for number in range(first, first + count):
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(data[pos:pos + width], "big"))
+                    pos += width
+                if pos > len(data):
+                    raise PdfStructureError("xref stream shorter than its /Index")
+                kind = fields[0] if widths[0] else 1
+                if kind == 1:
+                    self.entries.setdefault(number, (1, fields[1]))
+                elif kind == 2:
+                    self.entries.setdefault(number, (2, fields[1], fields[2]))
+                else:
+                    self.entries.setdefault(number, (0,))
+        return dictionary
+
+    def object(self, number: int) -> bytes:
+        """Return the body of object number: a dictionary, or the raw value text."""
+        entry = self.entries.get(number)
+        if entry is None or entry[0] == 0:
+            raise PdfStructureError(f"object {number} is not in the xref")
+        if entry[0] == 2:
+            return self._compressed_object(entry[1], entry[2])
+        header = OBJ_HEADER.match(self.buf, entry[1])
+        if header is None or int(header.group(1)) != number:
+            raise PdfStructureError(f"xref offset for object {number} is wrong")
+        if self.buf[header.end():header.end() + 2] == b"<<":
+            return dict_at(self.buf, header.end())[0]
+        end = self.buf.find(b"endobj", header.end())
+        return bytes(self.buf[header.end():end]).strip()
+
+    def _compressed_object(self, stream_number: int, index: int) -> bytes:
+        if stream_number not in self._object_streams:
+            entry = self.entries.get(stream_number)
+            if entry is None or entry[0] != 1:
+                raise PdfStructureError(f"object stream {stream_number} is not in the xref")
+            dictionary, data = self._stream(entry[1])
+            count, _ = lookup(dictionary, "N")
+            first, _ = lookup(dictionary, "First")
+            numbers = [int(value) for value in data[:first].split()[:2 * count]]
+            offsets = [first + offset for offset in numbers[1::2]] + [len(data)]
+            self._object_streams[stream_number] = (data, offsets)
+        data, offsets = self._object_streams[stream_number]
+        if index + 1 >= len(offsets):
+            raise PdfStructureError(f"object stream {stream_number} has no index {index}")
+        return data[offsets[index]:offsets[index + 1]].strip()
+
+    def resolve_int(self, dictionary: bytes, name: str):
+        value, indirect = lookup(dictionary, name)
+        if value is not None and indirect:
+            value = int(self.object(value).split()[0])
+        return value
+
+    def page_count(self) -> int:
+        root, _ = lookup(self.trailer, "Root")
+        if root is None:
+            raise PdfStructureError("trailer has no /Root")
+        pages, _ = lookup(self.object(root), "Pages")
+        if pages is None:
+            raise PdfStructureError("catalog has no /Pages")
+        count = self.resolve_int(self.object(pages), "Count")
+        if count is None:
+            raise PdfStructureError("page tree root has no /Count")
+        return count
+
+    def info(self) -> bytes:
+        """The document information dictionary, or b"" when there is none."""
+        info, _ = lookup(self.trailer, "Info")
+        return self.object(info) if info is not None else b""
+
+def _info_string(match) -> str:
+    literal, hexadecimal = match.groups()
+    if hexadecimal is not None:
+        data = bytes.fromhex(re.sub(rb"\s", b"", hexadecimal).decode("ascii"))
+        if data.startswith(b"\xfe\xff"):
+            return data[2:].decode("utf-16-be", "replace")
+        return data.decode("latin-1")
+    return re.sub(rb"\\(.)", rb"\1", literal).decode("latin-1")
+
+def producer(buf) -> str:
+    """/Producer and /Creator of the PDF joined by "; " (empty when neither is set)."""
+    try:
+        info = PdfIndex(buf).info()
+    except (PdfStructureError, zlib.error, ValueError, IndexError):
+        info = buf  # damaged xref: take the first entries found anywhere
+    found = (INFO_STRING[name].search(info) for name in (b"Producer", b"Creator"))
+    return "; ".join(_info_string(match) for match in found if match)
+
+def page_count(buf) -> tuple[int, str]:
+    """Return (pages, method): "xref" via the page tree, "scan" by counting page objects."""
+    if b"%PDF-" not in buf[:1024]:
+        raise PdfStructureError("not a PDF (no %PDF- header)")
+    try:
+        return PdfIndex(buf).page_count(), "xref"
+    except (PdfStructureError, zlib.error, ValueError, IndexError):
+        pages = sum(1 for _ in PAGE_OBJECT.finditer(buf))
+        if not pages:
+            raise
+        return pages, "scan"
+
+# Fitted from DEFAULTS, so a saved calibration never feeds into the next fit
+_model = None
+
+def page_model() -> PageModel:
+    global _model
+    if _model is None:
+        _model = PageModel()
+    return _model
+
+def source_markdown(path: Path):
+    """Markdown the PDF was rendered from: report.md beside it, or its JSON rendered."""
+    md_path = path.with_suffix(".md")
+    if md_path.exists():
+        return md_path.read_text(encoding="utf-8")
+    json_path = path.with_suffix(".json")
+    if json_path.exists():
+        from render_from_json import render_markdown
+        return render_markdown(json.loads(json_path.read_text(encoding="utf-8")))
+    return None
+
+def inspect_pdf(path: str, calibrate: bool) -> dict:
+    result = {"path": path}
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise PdfStructureError("empty file")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                result["pages"], result["method"] = page_count(buf)
+                if calibrate:
+                    result["producer"] = producer(buf)
+    except (OSError, PdfStructureError, zlib.error, ValueError, IndexError) as exc:
+        result["error"] = str(exc) or type(exc).__name__
+        return result
+    if calibrate and not any(name in result["producer"].lower() for name in TYPESET_PRODUCERS):
+        result["calibration_skipped"] = f"producer {result['producer'] or 'unknown'!r} is not pandoc/xelatex"
+    elif calibrate:
+        try:
+            markdown = source_markdown(Path(path))
+        except (OSError, ValueError) as exc:
+            markdown = None
+            result["source_error"] = str(exc)
+        if markdown is not None:
+            result["counts"] = page_model().layout_counts(markdown)
+    return result
+
+def expand_pdfs(inputs: list, defaults: bool) -> list:
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            # Hidden directories hold the render cache's copies of the same PDFs
+            paths.extend(sorted(pdf for pdf in path.rglob("*.pdf")
+                                if not any(part.startswith(".") for part in pdf.relative_to(path).parts)))
+        elif path.exists():
+            paths.append(path)
+        elif not defaults:
+            paths.extend(sorted(Path(p) for p in glob.glob(item, recursive=True)))
+    return paths
+
+def linear_terms(model: PageModel, counts: dict) -> tuple:
+    """Split a document's height into terms of the fitted constants.
+
+    height = fixed + leading * (lines + wrap_slack * wrapped) + paragraph_gap * gaps,
+    with each coefficient taken from PageModel.height_from_counts() itself.
+    """
+    zero = {"leading": 0.0, "paragraph_gap": 0.0, "wrap_slack": 0.0}
+    fixed = model.height_from_counts(counts, zero)
+    lines = model.height_from_counts(counts, {**zero, "leading": 1.0}) - fixed
+    wrapped = model.height_from_counts(counts, {**zero, "leading": 1.0, "wrap_slack": 1.0}) - fixed - lines
+    gaps = model.height_from_counts(counts, {**zero, "paragraph_gap": 1.0}) - fixed
+    return fixed, lines, wrapped, gaps
+
+def score(samples: list, text_height: float, leading: float, gap: float, slack: float) -> tuple:
+    """Return (under, over, squared distance of the estimates from their true page interval)."""
+    under = over = 0
+    error = 0.0
+    for pages, (fixed, lines, wrapped, gaps) in samples:
+        estimate = (fixed + leading * (lines + slack * wrapped) + gap * gaps) / text_height
+        if estimate > pages:
+            over += 1
+            error += (estimate - pages) ** 2
+        elif estimate <= pages - 1:
+            under += 1
+            error += (pages - 1 - estimate) ** 2
+    return under, over, error
+
+def calibrate(results: list) -> dict:
+    """Grid-fit leading, paragraph_gap and wrap_slack to the measured page counts."""
+    model = page_model()
+    samples = [(result["pages"], linear_terms(model, result["counts"]))
+               for result in results if "counts" in result]
+    if not samples:
+        return None
+    current = {name: model.params[name] for name in FIT_GRID}
+    best = None
+    for leading in FIT_GRID["leading"]:
+        for slack in FIT_GRID["wrap_slack"]:
+            for gap in FIT_GRID["paragraph_gap"]:
+                under, over, error = score(samples, model.text_height, leading, gap, slack)
+                # An under-estimate lets an over-cap report through; weigh it double
+                key = (2 * under + over, error)
+                if best is None or key < best[0]:
+                    best = (key, {"leading": leading, "paragraph_gap": gap, "wrap_slack": slack},
+                            {"under": under, "over": over})
+    before = score(samples, model.text_height, current["leading"], current["paragraph_gap"],
+                   current["wrap_slack"])
+    return {
+        "version": CALIBRATION_VERSION,
+        "samples": len(samples),
+        "params": best[1],
+        "fit": {**best[2], "exact": len(samples) - best[2]["under"] - best[2]["over"]},
+        "defaults": {"params": current, "under": before[0], "over": before[1],
+                     "exact": len(samples) - before[0] - before[1]},
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Count PDF pages from the xref/page tree and check page caps.")
+    parser.add_argument("inputs", nargs="*", help="PDF files, directories (searched recursively, hidden ones skipped) or globs "
+                                                  "(default: docs/out tests/regress)")
+    parser.add_argument("--cap", type=int, default=PAGE_CAP, help=f"page cap for every PDF (default: {PAGE_CAP})")
+    parser.add_argument("--fixture-limits", action="store_true",
+                        help="use report_guards.page_limit() per file name (6 for mock_H, else 4)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes (default: CPU count)")
+    parser.add_argument("--list", action="store_true", help="print the page count of every PDF")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="fit the page model's vertical constants to PDFs with a sibling .md/.json")
+    parser.add_argument("--write", metavar="PATH", nargs="?", const=str(CALIBRATION_PATH),
+                        help="with --calibrate, save the fit as JSON (default: scripts/page_model.calibration.json, "
+                             "which the page model loads automatically)")
+    parser.add_argument("--report", metavar="PATH", help="write a JSON summary of every PDF")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    paths = [str(path) for path in expand_pdfs(args.inputs or DEFAULT_INPUTS, not args.inputs)]
+    if not paths:
+        print("ℹ️  No PDFs found")
+        return 0
+
+    calibrating = [args.calibrate] * len(paths)
+    if args.workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(inspect_pdf, paths, calibrating,
+                                    chunksize=max(1, len(paths) // (args.workers * 4))))
+    else:
+        results = list(map(inspect_pdf, paths, calibrating))
+    elapsed = time.perf_counter() - started
+
+    status = 0
+    over_cap = 0
+    for result in results:
+        name = Path(result["path"]).name
+        result["cap"] = page_limit(name) if args.fixture_limits else args.cap
+        if "error" in result:
+            print(f"FAIL pdf_pages: {result['path']} unreadable: {result['error']}", file=sys.stderr)
+            status = 1
+            continue
+        result["over_cap"] = result["pages"] > result["cap"]
+        if result["over_cap"]:
+            print(f"FAIL pdf_pages: {result['path']} => {result['pages']} pages (cap {result['cap']})",
+                  file=sys.stderr)
+            over_cap += 1
+            status = 1
+        if args.list:
+            print(f"{result['path']}: {result['pages']} pages ({result['method']})")
+
+    counted = [result["pages"] for result in results if "pages" in result]
+    methods = Counter(result["method"] for result in results if "method" in result)
+    print(f"📊 {len(results)} PDFs in {elapsed:.2f}s: {over_cap} over cap, {len(results) - len(counted)} unreadable"
+          + (f"; pages min {min(counted)} / median {statistics.median(counted):g} / max {max(counted)}"
+             if counted else "")
+          + (f"; via {', '.join(f'{method} ({count})' for method, count in methods.most_common())}"
+             if methods else ""))
+
+    calibration = None
+    if args.calibrate:
+        fit_started = time.perf_counter()
+        skipped = Counter(result["producer"] or "unknown" for result in results if "calibration_skipped" in result)
+        if skipped:
+            print(f"⚠️  Not calibrating against {sum(skipped.values())} PDFs not typeset by pandoc/xelatex: "
+                  + ", ".join(f"{name} ({count})" for name, count in skipped.most_common()), file=sys.stderr)
+        calibration = calibrate(results)
+        if calibration is None:
+            print("ℹ️  No pandoc/xelatex PDFs with a sibling .md or .json to calibrate against")
+        else:
+            defaults, fit = calibration["defaults"], calibration["fit"]
+            print(f"📊 Page model on {calibration['samples']} PDFs, defaults: {defaults['exact']} exact, "
+                  f"{defaults['under']} under, {defaults['over']} over")
+            print(f"📊 Fitted in {time.perf_counter() - fit_started:.2f}s: {fit['exact']} exact, "
+                  f"{fit['under']} under, {fit['over']} over with "
+                  + ", ".join(f"{name}={value:g}" for name, value in calibration["params"].items()))
+            if args.write:
+                Path(args.write).write_text(json.dumps(calibration, indent=2) + "\n", encoding="utf-8")
+                applied = ("page model default" if Path(args.write).resolve() == CALIBRATION_PATH
+                           else "PageModel.from_calibration()")
+                print(f"✅ Calibration written to {args.write} ({applied})")
+
+    if args.report:
+        summary = {"pdfs": [{key: value for key, value in result.items() if key != "counts"}
+                            for result in results]}
+        if calibration is not None:
+            summary["calibration"] = calibration
+        Path(args.report).write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Pipeline Orchestrator
+Asyncio submission → model → validate → render pipeline with backpressure.
+
+Runs the offline chain (mock_vertex.py, validate_schema.sh, the guards,
+render_from_json.py) as three concurrent stages joined by bounded queues:
+
+  model     generate_mock_response() in-process (optionally with injected
+            latency, errors and truncated JSON from vertex_server.FaultProfile),
+            or the vertex_server.py stand-in over HTTP with --model http
+  validate  report_schema.validate_report() plus the confidence, readiness and
+            length guards from report_guards.py
+  render    the Markdown renderer plus the page_estimator guard (report_guards.py)
+
+Each stage has its own worker count and input queue of --queue-size, so a
+slow stage fills its queue and blocks the one before it, back to the source.
+A model error, unparseable report or any schema/guard failure sends the
+submission back to the model stage after exponential backoff, up to
+--max-attempts; the attempt that passed is recorded as "attempt" in the
+*.metrics.json written with --out-dir, as the backend does. Retries do not
+wait for queue space, so a full model queue can never deadlock the stages
+behind it.
+
+Latency is measured per submission from arrival to rendered output. With
+--rate, submissions arrive on a fixed open-loop schedule and latency counts
+from the scheduled arrival, so time spent blocked by backpressure is included
+rather than hidden. Validate and render are CPU-bound and run on the event
+loop: their worker counts bound how many submissions they hold, not cores.
+A stage's service time includes handing the job to the next stage, so a
+stage held up by backpressure shows long service times with short waits.
+
+Usage:
+  pipeline_orchestrator.py                              # tests/mocks once
+  pipeline_orchestrator.py --count 20000 --rate 500 --latency lognormal:40,0.5 --malformed-rate 0.02
+  mock_vertex.py --serve --latency lognormal:120,0.5 --error-rate 0.05 &
+  pipeline_orchestrator.py --model http --count 5000 --model-workers 200 --out-dir /tmp/pipeline
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from mock_vertex import fixed_clock, generate_mock_response
+from render_from_json import get_renderer, percentile
+from report_guards import check_confidence, check_length, check_readiness, estimate_pages, page_limit
+from report_schema import iter_reports, validate_report
+from vertex_server import FaultProfile, post
+
+ROOT = Path(__file__).resolve().parents[1]
+
+UNSAFE_NAME = re.compile(r"[^\w.-]")
+
+class ModelError(Exception):
+    """A model call that produced no usable report; outcome names the failure."""
+
+    def __init__(self, outcome: str):
+        super().__init__(outcome)
+        self.outcome = outcome
+
+class InProcessModel:
+    """generate_mock_response() on the event loop, with optional injected faults."""
+
+    def __init__(self, clock=None, faults: FaultProfile = None):
+        self.clock = clock
+        self.faults = faults
+
+    async def generate(self, submission: dict) -> str:
+        outcome, delay = self.faults.draw() if self.faults is not None else ("ok", 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if outcome == "error":
+            raise ModelError(f"http_{self.faults.rng.choice(self.faults.error_codes)}")
+        text = json.dumps(generate_mock_response(submission, self.clock), ensure_ascii=False, indent=2)
+        if outcome == "malformed":
+            text = text[:self.faults.rng.randint(1, max(1, len(text) - 1))]
+        return text
+
+class HttpModel:
+    """generateContent calls to the vertex_server.py stand-in, as load_vertex.py sends them."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    async def generate(self, submission: dict) -> str:
+        body = json.dumps({"contents": [{"role": "user", "parts": [{"text": json.dumps(submission)}]}]})
+        try:
+            status, payload = await post(self.host, self.port, body.encode("utf-8"), self.timeout)
+        except asyncio.TimeoutError:
+            raise ModelError("timeout") from None
+        except (ConnectionError, OSError):
+            raise ModelError("connection_error") from None
+        if status != 200:
+            raise ModelError(f"http_{status}")
+        try:
+            return json.loads(payload)["candidates"][0]["content"]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise ModelError("malformed") from None
+
+class Job:
+    """One submission moving through the pipeline."""
+
+    def __init__(self, name: str, submission: dict, arrived: float):
+        self.name = name
+        self.submission = submission
+        self.arrived = arrived
+        self.attempt = 1
+        self.queued = arrived
+        self.text = None
+        self.report = None
+
+class Stage:
+    """A bounded input queue drained by `workers` coroutines running handler(job)."""
+
+    def __init__(self, name: str, handler, workers: int, capacity: int):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.capacity = capacity
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(capacity)
+        self.peak_depth = 0
+        self.waits = []
+        self.service = []
+
+    async def put(self, job: Job) -> None:
+        """Enqueue, waiting while the queue holds `capacity` jobs (backpressure)."""
+        await self.slots.acquire()
+        self._enqueue(job, True)
+
+    def put_retry(self, job: Job) -> None:
+        """Enqueue a retried job without waiting for space."""
+        self._enqueue(job, False)
+
+    def _enqueue(self, job: Job, holds_slot: bool) -> None:
+        job.queued = time.perf_counter()
+        self.queue.put_nowait((job, holds_slot))
+        self.peak_depth = max(self.peak_depth, self.queue.qsize())
+
+    async def work(self, crashed) -> None:
+        while True:
+            job, holds_slot = await self.queue.get()
+            if holds_slot:
+                self.slots.release()
+            started = time.perf_counter()
+            self.waits.append(started - job.queued)
+            try:
+                await self.handler(job)
+            except Exception as e:  # a crashing handler fails its job, not the pipeline
+                crashed(job, f"{self.name}_error", f"{type(e).__name__}: {e}")
+            self.service.append(time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        def ms(values, pct):
+            return round(percentile(values, pct) * 1000, 2)
+
+        busy = sum(self.service)
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "peakDepth": self.peak_depth,
+            "processed": len(self.service),
+            "busySeconds": round(busy, 3),
+            "waitMs": {"p50": ms(self.waits, 50), "p99": ms(self.waits, 99)},
+            "serviceMs": {"p50": ms(self.service, 50), "p99": ms(self.service, 99)},
+        }
+
+class Pipeline:
+    """Wires the model, validate and render stages and tracks every submission's outcome."""
+
+    def __init__(self, model, args):
+        self.model = model
+        self.max_attempts = args.max_attempts
+        self.backoff = args.backoff
+        self.renderer = get_renderer(args.renderer)
+        self.out_dir = Path(args.out_dir) if args.out_dir else None
+        self.stages = [
+            Stage("model", self.generate, args.model_workers, args.queue_size),
+            Stage("validate", self.validate, args.validate_workers, args.queue_size),
+            Stage("render", self.render, args.render_workers, args.queue_size),
+        ]
+        self.outcomes = Counter()
+        self.attempts = Counter()
+        self.latencies = []
+        self.failures = []
+        self.pending = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    async def generate(self, job: Job) -> None:
+        try:
+            job.text = await self.model.generate(job.submission)
+            job.report = json.loads(job.text)
+            if not isinstance(job.report, dict) or not job.report.get("submissionId"):
+                raise ModelError("malformed")
+        except ModelError as e:
+            return self.retry(job, e.outcome, str(e))
+        except ValueError:
+            return self.retry(job, "malformed", "report text is not valid JSON")
+        await self.stages[1].put(job)
+
+    async def validate(self, job: Job) -> None:
+        path = Path(f"{job.name}.json")
+        errors = validate_report(job.report)
+        if errors:
+            return self.retry(job, "schema", "; ".join(errors[:3]))
+        failures = (check_confidence(path, job.report) + check_readiness(path, job.report)
+                    + check_length(path, job.text.encode("utf-8")))
+        if failures:
+            return self.retry(job, failures[0].split(":", 1)[0].split()[-1], failures[0])
+        await self.stages[2].put(job)
+
+    async def render(self, job: Job) -> None:
+        markdown = self.renderer(job.report)
+        pages = estimate_pages(markdown)
+        limit = page_limit(job.name)
+        if pages > limit:
+            return self.retry(job, "page_estimator",
+                              f"FAIL page_estimator: {job.name}.json => {pages} pages (limit {limit})")
+        if self.out_dir is not None:
+            self.write_outputs(job, markdown, pages)
+        self.finish(job, "ok")
+
+    def write_outputs(self, job: Job, markdown: str, pages: int) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        (self.out_dir / f"{job.name}.json").write_text(job.text, encoding="utf-8")
+        (self.out_dir / f"{job.name}.md").write_text(markdown, encoding="utf-8")
+        metrics = {
+            "charCount": len(markdown),
+            "estimatedPages": pages,
+            "confidenceScore": job.report["confidence"]["score_pct"],
+            "customerReadiness": job.report["customer_readiness_check"]["verdict"],
+            "attempt": job.attempt,
+        }
+        (self.out_dir / f"{job.name}.metrics.json").write_text(json.dumps(metrics, indent=2), encoding="utf-8")
+
+    def retry(self, job: Job, outcome: str, detail: str) -> None:
+        """Record a failed attempt and requeue the job for the model after backoff, or give up."""
+        self.outcomes[outcome] += 1
+        if job.attempt >= self.max_attempts:
+            return self.fail(job, outcome, detail)
+        delay = self.backoff * 2 ** (job.attempt - 1)
+        job.attempt += 1
+        job.text = job.report = None
+        asyncio.get_running_loop().call_later(delay, self.stages[0].put_retry, job)
+
+    def crashed(self, job: Job, outcome: str, detail: str) -> None:
+        self.outcomes[outcome] += 1
+        self.fail(job, outcome, detail)
+
+    def fail(self, job: Job, outcome: str, detail: str) -> None:
+        self.failures.append(f"FAIL pipeline_orchestrator: {job.name} after {job.attempt} attempts "
+                             f"({outcome}): {detail}")
+        self.finish(job, None)
+
+    def finish(self, job: Job, outcome) -> None:
+        if outcome is not None:
+            self.outcomes[outcome] += 1
+            self.attempts[job.attempt] += 1
+            self.latencies.append(time.perf_counter() - job.arrived)
+        self.pending -= 1
+        if not self.pending:
+            self.idle.set()
+
+    async def submit(self, job: Job) -> None:
+        self.pending += 1
+        self.idle.clear()
+        await self.stages[0].put(job)
+
+    async def run(self, jobs, rate: float = None) -> float:
+        """Feed (name, submission) pairs through every stage; return the elapsed seconds."""
+        workers = [asyncio.create_task(stage.work(self.crashed))
+                   for stage in self.stages for _ in range(stage.workers)]
+        started = time.perf_counter()
+        try:
+            for index, (name, submission) in enumerate(jobs):
+                arrived = time.perf_counter()
+                if rate:
+                    arrived = started + index / rate
+                    if arrived > time.perf_counter():
+                        await asyncio.sleep(arrived - time.perf_counter())
+                await self.submit(Job(name, submission, arrived))
+            await self.idle.wait()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return time.perf_counter() - started
+
+def load_jobs(inputs: list, count: int = None) -> tuple:
+    """Return ([(name, submission)], unreadable messages); --count cycles inputs with unique ids."""
+    submissions, unreadable = [], []
+    for label, item in iter_reports(inputs):
+        if isinstance(item, dict):
+            submissions.append((label, item))
+        else:
+            unreadable.append(f"FAIL pipeline_orchestrator: {label} unreadable "
+                              f"({item if isinstance(item, Exception) else 'not a JSON object'})")
+    if not submissions or count is None:
+        return [(UNSAFE_NAME.sub("_", str(s.get("submissionId") or Path(label).stem)), s)
+                for label, s in submissions], unreadable
+
+    def cycled():
+        for index in range(count):
+            label, submission = submissions[index % len(submissions)]
+            base = submission.get("submissionId") or Path(label).stem
+            submission_id = f"{base}-{index:06d}"
+            yield UNSAFE_NAME.sub("_", submission_id), {**submission, "submissionId": submission_id}
+    return cycled(), unreadable
+
+def print_summary(pipeline: Pipeline, total: int, elapsed: float, model_name: str) -> None:
+    succeeded = len(pipeline.latencies)
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"✅ {succeeded}/{total} submissions rendered in {elapsed:.2f}s "
+          f"({rate:.1f}/s, model {model_name})")
+    print(f"📊 Attempt outcomes: {dict(sorted(pipeline.outcomes.items()))}")
+    print(f"🔁 Attempts per success: {dict(sorted(pipeline.attempts.items()))}")
+    latencies = pipeline.latencies
+    if latencies:
+        print(f"⏱️  Submission latency: p50 {percentile(latencies, 50) * 1000:.1f}ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.1f}ms, p99 {percentile(latencies, 99) * 1000:.1f}ms, "
+              f"max {max(latencies) * 1000:.1f}ms")
+    print(f"\n{'stage':<10}{'workers':>8}{'queue':>7}{'peak':>6}{'processed':>11}{'busy':>9}"
+          f"{'wait p50/p99 ms':>20}{'service p50/p99 ms':>22}")
+    for stage in pipeline.stages:
+        s = stage.stats()
+        print(f"{stage.name:<10}{s['workers']:>8}{s['capacity']:>7}{s['peakDepth']:>6}{s['processed']:>11}"
+              f"{s['busySeconds']:>8.2f}s{s['waitMs']['p50']:>11.1f}/{s['waitMs']['p99']:<8.1f}"
+              f"{s['serviceMs']['p50']:>13.2f}/{s['serviceMs']['p99']:<8.2f}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run submissions through model → validate → render concurrently.")
+    parser.add_argument("inputs", nargs="*", default=[str(ROOT / "tests" / "mocks")],
+                        help="submission JSON files, directories or .jsonl files; - for JSONL on stdin "
+                             "(default: tests/mocks)")
+    parser.add_argument("--count", type=int, help="cycle the inputs to this many submissions with unique ids")
+    parser.add_argument("--rate", type=float,
+                        help="open-loop arrivals per second (default: as fast as backpressure allows)")
+    parser.add_argument("--model", choices=("in-process", "http"), default="in-process",
+                        help="model stage: generate_mock_response() or the vertex_server.py stand-in")
+    parser.add_argument("--host", default="127.0.0.1", help="stand-in host for --model http")
+    parser.add_argument("--port", type=int, default=8787, help="stand-in port for --model http")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-call HTTP timeout in seconds (default: 10)")
+    parser.add_argument("--latency", default="fixed:0", help="in-process model latency spec, as vertex_server.py")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="in-process fraction failing with an error")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="in-process fraction returning truncated report JSON")
+    parser.add_argument("--seed", type=int, default=None, help="seed for in-process fault injection")
+    parser.add_argument("--fixed-time", default=None, metavar="ISO", help="stamp in-process reports with this time")
+    parser.add_argument("--deterministic", action="store_true", help="same as --fixed-time 2025-01-01T00:00:00Z")
+    parser.add_argument("--model-workers", type=int, default=16, help="concurrent model calls (default: 16)")
+    parser.add_argument("--validate-workers", type=int, default=2, help="validate stage workers (default: 2)")
+    parser.add_argument("--render-workers", type=int, default=2, help="render stage workers (default: 2)")
+    parser.add_argument("--queue-size", type=int, default=64, help="input queue bound per stage (default: 64)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="attempts per submission (default: 3)")
+    parser.add_argument("--backoff", type=float, default=0.05, help="first retry delay in seconds (default: 0.05)")
+    parser.add_argument("--renderer", choices=("compiled", "markdown"), default="compiled",
+                        help="Markdown renderer (default: compiled)")
+    parser.add_argument("--out-dir", help="write <id>.json, <id>.md and <id>.metrics.json here")
+    parser.add_argument("--report", metavar="PATH", help="write a JSON summary of outcomes, latency and stages")
+    args = parser.parse_args()
+    for name in ("model_workers", "validate_workers", "render_workers", "queue_size", "max_attempts"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+
+    if args.model == "http":
+        model = HttpModel(args.host, args.port, args.timeout)
+    else:
+        clock = fixed_clock(args.fixed_time) if args.fixed_time else fixed_clock() if args.deterministic else None
+        faults = None
+        if args.latency != "fixed:0" or args.error_rate or args.malformed_rate:
+            try:
+                faults = FaultProfile(args.latency, args.error_rate, 0.0, args.malformed_rate, seed=args.seed)
+            except ValueError as e:
+                parser.error(str(e))
+        model = InProcessModel(clock, faults)
+
+    jobs, unreadable = load_jobs(args.inputs, args.count)
+    for message in unreadable:
+        print(message, file=sys.stderr)
+    total = args.count if args.count is not None and not isinstance(jobs, list) else len(jobs)
+
+    async def run():
+        pipeline = Pipeline(model, args)
+        return pipeline, await pipeline.run(jobs, args.rate)
+    pipeline, elapsed = asyncio.run(run())
+
+    print_summary(pipeline, total, elapsed, args.model)
+    for failure in pipeline.failures:
+        print(failure, file=sys.stderr)
+    if args.report:
+        latencies = pipeline.latencies
+        summary = {
+            "submissions": total,
+            "succeeded": len(latencies),
+            "failed": len(pipeline.failures) + len(unreadable),
+            "elapsedSeconds": round(elapsed, 3),
+            "outcomes": dict(pipeline.outcomes),
+            "attemptsPerSuccess": {str(k): v for k, v in sorted(pipeline.attempts.items())},
+            "latencyMs": {f"p{p}": round(percentile(latencies, p) * 1000, 2) for p in (50, 95, 99)},
+            "stages": {stage.name: stage.stats() for stage in pipeline.stages},
+            "failures": pipeline.failures,
+        }
+        out = Path(args.report)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    return 1 if pipeline.failures or unreadable else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
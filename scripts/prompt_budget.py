@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Prompt Budget
+Token estimates per prompt field, sentence dedup and trimming of long narratives.
+
+The Vertex prompt (tests/run_vertex_once.js, the backend) embeds customer,
+equipment and codes as JSON plus the free-text symptoms and notes; forum
+essays and pasted logs in those two fields dominate prompt size, model
+latency and cost. trim_submission() runs before generate_mock_response() or
+the real model call:
+
+  1. estimate tokens per field (about 4 characters per token, the same rate
+     vertex_server.py reports in usageMetadata)
+  2. drop repeated sentences (case/space/punctuation-insensitive), including
+     notes sentences that repeat the symptoms
+  3. cut each narrative down to its field budget, keeping the opening
+     sentences and then the most diagnostic ones (codes, readings, parts) in
+     their original order, and shrink notes then symptoms further if the
+     prompt is still over the total budget
+
+and returns the trimmed copy with before/after token metrics.
+
+Usage:
+  prompt_budget.py <submission.json|-> [--total N] [--symptoms N] [--notes N]
+                                        print the trimmed submission, metrics on stderr
+  prompt_budget.py --stream [same budgets] < submissions.jsonl
+                                        JSONL in → JSONL out with a "promptBudget" metrics field
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+
+CHARS_PER_TOKEN = 4
+
+NARRATIVE_FIELDS = ("symptoms", "notes")
+# Fields the prompt embeds as JSON.stringify(value, null, 2)
+JSON_FIELDS = ("customer", "equipment", "codes")
+
+DEFAULT_TOTAL_TOKENS = 1024
+DEFAULT_FIELD_TOKENS = {"symptoms": 256, "notes": 512}
+# Always kept, in order, before any scoring
+LEAD_SENTENCES = 2
+TRIM_MARKER = "[… trimmed from {total} sentences]"
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+NORMALIZE = re.compile(r"[\W_]+")
+DTC_LIKE = re.compile(r"\b(?:[PBCU][0-9][0-9A-F]{3}|SPN\s?\d+|FMI\s?\d+)\b", re.I)
+READING = re.compile(r"\d")
+KEYWORDS = re.compile(
+    r"\b(?:code|cel|mil|misfire|lean|rich|replaced|swapped|tested|leak|pressure|voltage|temp\w*|smell|noise|"
+    r"stall\w*|overheat\w*|warranty|tsb|recall|shop|quote|intermittent)\b", re.I)
+
+def estimate_tokens(text: str) -> int:
+    """Approximate model tokens for text (about CHARS_PER_TOKEN characters each)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+def field_tokens(submission: dict) -> dict:
+    """Estimated prompt tokens per field, plus "total"."""
+    tokens = {}
+    for name in JSON_FIELDS:
+        tokens[name] = estimate_tokens(json.dumps(submission.get(name) or ({} if name != "codes" else []),
+                                                  indent=2, ensure_ascii=False))
+    for name in NARRATIVE_FIELDS:
+        value = submission.get(name)
+        tokens[name] = estimate_tokens(value if isinstance(value, str) else "")
+    tokens["total"] = sum(tokens.values())
+    return tokens
+
+def split_sentences(text: str) -> list:
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence.strip()]
+
+def dedupe_sentences(sentences: list, seen: set) -> tuple[list, int]:
+    """Drop sentences already in seen (by normalized text); return (kept, dropped count)."""
+    kept = []
+    for sentence in sentences:
+        key = NORMALIZE.sub(" ", sentence.lower()).strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(sentence)
+    return kept, len(sentences) - len(kept)
+
+def _score(sentence: str) -> int:
+    return (3 * bool(DTC_LIKE.search(sentence)) + 2 * bool(READING.search(sentence))
+            + len(KEYWORDS.findall(sentence)))
+
+def _cut(text: str, max_chars: int) -> str:
+    """Cut text to at most max_chars at a word boundary, with an ellipsis."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars - 1)
+    return text[:cut if cut > 0 else max_chars - 1].rstrip() + "…"
+
+def fit_sentences(sentences: list, max_tokens: int) -> tuple[str, int]:
+    """Join sentences within max_tokens; return (text, sentences dropped or cut).
+
+    The lead sentences are kept first (a lead sentence longer than what is
+    left is cut at a word boundary), then the highest-scoring remaining
+    ones; kept sentences stay in their original order. A trim marker is
+    appended when anything was dropped, and its length counts against the
+    budget.
+    """
+    text = " ".join(sentences)
+    if estimate_tokens(text) <= max_tokens:
+        return text, 0
+    marker = TRIM_MARKER.format(total=len(sentences))
+    budget = max_tokens * CHARS_PER_TOKEN - len(marker) - 1
+    kept = {}
+    used = 0
+    leads = min(LEAD_SENTENCES, len(sentences))
+    order = list(range(leads)) + sorted(range(leads, len(sentences)), key=lambda i: (-_score(sentences[i]), i))
+    for index in order:
+        cost = len(sentences[index]) + 1
+        if used + cost <= budget:
+            kept[index] = sentences[index]
+            used += cost
+        elif index < leads and budget - used > 1:
+            kept[index] = _cut(sentences[index], budget - used - 1)
+            used = budget
+    trimmed = sum(1 for index, sentence in enumerate(sentences) if kept.get(index) != sentence)
+    body = " ".join(kept[index] for index in sorted(kept))
+    return f"{body} {marker}".lstrip(), trimmed
+
+def trim_submission(submission: dict, total_tokens: int = DEFAULT_TOTAL_TOKENS,
+                    field_tokens_budget: dict = None) -> tuple[dict, dict]:
+    """Return (trimmed copy of submission, metrics) within the prompt budget.
+
+    metrics holds per-field token estimates "before" and "after", the
+    number of sentences removed as duplicates and by trimming, and whether
+    anything changed. The input dict is not modified.
+    """
+    budgets = dict(DEFAULT_FIELD_TOKENS, **(field_tokens_budget or {}))
+    before = field_tokens(submission)
+    result = dict(submission)
+    metrics = {"before": before, "after": before, "dedupedSentences": 0, "trimmedSentences": 0, "trimmed": False}
+    narrative = [name for name in NARRATIVE_FIELDS if isinstance(submission.get(name), str) and submission[name]]
+    if not narrative:
+        return result, metrics
+
+    seen = set()
+    sentences = {}
+    deduped = {}
+    for name in narrative:
+        sentences[name], deduped[name] = dedupe_sentences(split_sentences(submission[name]), seen)
+        metrics["dedupedSentences"] += deduped[name]
+
+    # Tokens left for narrative once the JSON fields are in
+    fixed = before["total"] - sum(before[name] for name in NARRATIVE_FIELDS)
+    remaining = max(0, total_tokens - fixed)
+    limits = {name: budgets.get(name, remaining) for name in narrative}
+    # Over the total even at field budgets: shrink notes first, then symptoms
+    overflow = sum(limits.values()) - remaining
+    for name in ("notes", "symptoms"):
+        if overflow > 0 and name in limits:
+            cut = min(overflow, limits[name] - 1)
+            limits[name] -= cut
+            overflow -= cut
+
+    for name in narrative:
+        if not deduped[name] and before[name] <= limits[name]:
+            continue  # untouched, original spacing kept
+        text, trimmed = fit_sentences(sentences[name], max(1, limits[name]))
+        metrics["trimmedSentences"] += trimmed
+        if text != submission[name]:
+            result[name] = text
+
+    metrics["after"] = field_tokens(result)
+    metrics["trimmed"] = any(result[name] is not submission[name] for name in narrative)
+    return result, metrics
+
+def main():
+    """Trim one submission (or a JSONL stream) to the prompt budget."""
+    parser = argparse.ArgumentParser(description="Estimate and trim submission prompt tokens.")
+    parser.add_argument("input", nargs="?", default="-", help="submission JSON file, or - for stdin")
+    parser.add_argument("--stream", action="store_true", help="JSONL submissions on stdin → JSONL on stdout")
+    parser.add_argument("--total", type=int, default=DEFAULT_TOTAL_TOKENS,
+                        help=f"token budget for all submission fields (default: {DEFAULT_TOTAL_TOKENS})")
+    for name in NARRATIVE_FIELDS:
+        parser.add_argument(f"--{name}", type=int, default=DEFAULT_FIELD_TOKENS[name],
+                            help=f"token budget for {name} (default: {DEFAULT_FIELD_TOKENS[name]})")
+    args = parser.parse_args()
+    budgets = {name: getattr(args, name) for name in NARRATIVE_FIELDS}
+
+    if args.stream:
+        saved = 0
+        count = 0
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            submission, metrics = trim_submission(json.loads(line), args.total, budgets)
+            submission["promptBudget"] = metrics
+            sys.stdout.write(json.dumps(submission, ensure_ascii=False, separators=(",", ":")) + "\n")
+            saved += metrics["before"]["total"] - metrics["after"]["total"]
+            count += 1
+        print(f"📊 {count} submissions, {saved} prompt tokens trimmed", file=sys.stderr)
+        return
+
+    if args.input == "-":
+        submission = json.load(sys.stdin)
+    else:
+        with open(args.input, 'r') as f:
+            submission = json.load(f)
+    trimmed, metrics = trim_submission(submission, args.total, budgets)
+    print(json.dumps(trimmed, indent=2, ensure_ascii=False))
+    before, after = metrics["before"], metrics["after"]
+    print(f"📊 Prompt tokens: {before['total']} → {after['total']} "
+          f"(symptoms {before['symptoms']} → {after['symptoms']}, notes {before['notes']} → {after['notes']}; "
+          f"{metrics['dedupedSentences']} duplicate, {metrics['trimmedSentences']} trimmed sentences)",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Render Cache
+Content-addressed on-disk cache for rendered Markdown and PDF artifacts.
+
+Entries are keyed on the canonical JSON payload plus the renderer/template
+version, so an unchanged report never re-runs render_markdown() or pandoc.
+The cache is bounded by total size; least-recently-used entries (by mtime,
+refreshed on every hit) are evicted first.
+"""
+
+import json
+import os
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def canonical_json(data) -> bytes:
+    """Serialize data so that logically equal payloads produce identical bytes."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+class RenderCache:
+    """Size-bounded LRU cache of render artifacts stored as <root>/<kk>/<key><suffix>."""
+
+    def __init__(self, root, version: str, max_bytes: int = DEFAULT_MAX_BYTES, rebuild: bool = False):
+        self.root = Path(root)
+        self.version = version
+        self.max_bytes = max_bytes
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, data: dict) -> str:
+        """Return the content hash for a report payload under this renderer version."""
+        import hashlib  # the cache-less CLI path never hashes
+        digest = hashlib.sha256()
+        digest.update(self.version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(canonical_json(data))
+        return digest.hexdigest()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def lookup(self, key: str, suffix: str):
+        """Return the cached artifact path (and mark it recently used), or None.
+
+        With rebuild=True every lookup misses so entries are regenerated and
+        overwritten.
+        """
+        path = self._path(key, suffix)
+        if self.rebuild or not path.exists():
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return path
+
+    def store_text(self, key: str, suffix: str, text: str) -> Path:
+        """Atomically store a text artifact."""
+        return self._store(key, suffix, lambda f: f.write(text.encode("utf-8")))
+
+    def store_file(self, key: str, suffix: str, source) -> Path:
+        """Atomically copy an existing file (e.g. a freshly built PDF) into the cache."""
+        import shutil
+
+        def copy(f):
+            with open(source, "rb") as src:
+                shutil.copyfileobj(src, f)
+        return self._store(key, suffix, copy)
+
+    def _store(self, key: str, suffix: str, write) -> Path:
+        path = self._path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        import tempfile
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return path
+
+    def evict(self) -> int:
+        """Delete least-recently-used artifacts until the cache fits max_bytes."""
+        if not self.root.exists():
+            return 0
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> str:
+        """Short hit/miss summary for the renderer's stats line."""
+        return f"cache {self.hits} hit/{self.misses} miss"
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Render Daemon
+Resident report renderer, so callers stop paying Python start-up per report.
+
+One long-running process imports the renderer, compiles the 14-point
+template and loads the page model once, then serves renders over HTTP/1.1
+on a Unix socket (--socket) or localhost TCP port:
+
+  POST /render    body: report JSON, or {"report": {...}, "options": {...}}
+                  options: renderer (compiled|markdown|budgeted), validate,
+                  pdf, pageCap, maxChars, markdown (false drops it from the
+                  response), formats (["html", "txt"], from one report IR)
+                  → {"submissionId", "markdown", "metrics", ["html"], ["txt"], ["pdfBase64"]}
+                    422 with {"errors"} when validate finds schema errors or a
+                    budgeted render cannot fit its page budget
+  GET  /stats     counters, queue depth and render latency percentiles
+  GET  /healthz   ok (503 while draining)
+
+Connections are keep-alive and pipelined: requests on one connection are
+dispatched as they are read and answered in order. Renders run in a pool
+of --workers processes (default: one per CPU) or, with --workers 0, on a
+single render thread; either way the event loop keeps answering /healthz
+and /stats, and at most --max-queue renders are accepted at once (queued or
+running) while the rest get 503.
+PDFs go through a PdfWorkerPool. On SIGTERM/SIGINT the daemon stops
+accepting, finishes and answers every accepted request (up to
+--drain-timeout seconds), then exits.
+
+Usage:
+  render_daemon.py [--socket /tmp/diagnosticpro-render.sock | --port 8788]
+                   [--workers N] [--max-queue 256] [--pdf-engine auto]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import signal
+import stat
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from page_model import PAGE_CAP, estimate_pages
+from pdf_backend import ENGINE_CHOICES, PdfEngineError, PdfWorkerPool, select_engine
+from render_from_json import RENDERER_CHOICES, get_renderer
+from report_budget import BudgetExceededError
+from report_ir import render_formats
+from report_schema import validate_report
+from vertex_server import http_response, read_request
+
+# Requests read ahead on one connection before reading pauses
+PIPELINE_DEPTH = 32
+# Seconds a drained connection keeps discarding client data before closing,
+# so pipelined requests still in flight don't turn into a reset that
+# destroys responses the client has not read yet
+LINGER_SECONDS = 2.0
+
+def render_report(report: dict, options: dict) -> dict:
+    """Render one report; return the response body with an HTTP "status" key.
+
+    Module-level so it can run in a worker process.
+    """
+    started = time.perf_counter()
+    if not isinstance(report, dict):
+        return {"status": 400, "error": f"expected a JSON object, got {type(report).__name__}"}
+    if options.get("validate"):
+        errors = validate_report(report)
+        if errors:
+            return {"status": 422, "submissionId": report.get("submissionId"), "errors": errors}
+    formats = options.get("formats")
+    unknown = set(formats or ()) - {"html", "txt"}
+    if unknown:
+        return {"status": 400, "error": f"unknown formats: {', '.join(sorted(unknown))}"}
+    renderer = get_renderer(options.get("renderer", "compiled"), options.get("pageCap", PAGE_CAP),
+                            options.get("maxChars"))
+    try:
+        markdown = renderer(report)
+    except BudgetExceededError as e:
+        return {"status": 422, "submissionId": report.get("submissionId"), "errors": [str(e)]}
+    pages = estimate_pages(markdown)
+    response = {
+        "status": 200,
+        "submissionId": report.get("submissionId"),
+        "markdown": markdown,
+    }
+    if formats:
+        # One IR, several channels: {"html": ..., "txt": ...}
+        response.update(render_formats(report, formats, options.get("renderer", "compiled"),
+                                       options.get("pageCap", PAGE_CAP), options.get("maxChars")))
+    response["metrics"] = {
+        "charCount": len(markdown),
+        "estimatedPages": round(pages, 3),
+        "confidenceScore": report.get("confidence", {}).get("score_pct"),
+        "customerReadiness": report.get("customer_readiness_check", {}).get("verdict"),
+        "renderMs": round((time.perf_counter() - started) * 1000, 3),
+    }
+    return response
+
+def _warm_worker():
+    """Compile the template and load the page model in a fresh worker process."""
+    get_renderer("compiled")({})
+    estimate_pages("")
+
+class RenderDaemon:
+    """Pipelined HTTP/1.1 render service with bounded concurrency and graceful drain."""
+
+    def __init__(self, workers: int = 0, max_queue: int = 256, renderer: str = "compiled",
+                 pdf_engine=None, pdf_workers: int = 2):
+        self.renderer = renderer
+        self.max_queue = max_queue
+        # Never render on the event loop: a slow render would stall /healthz
+        # and every pipelined response behind it
+        if workers > 0:
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        for _ in range(max(1, workers)):
+            self.executor.submit(_warm_worker)
+        self.pdf_engine = pdf_engine
+        self.pdf_pool = PdfWorkerPool(pdf_engine, workers=pdf_workers) if pdf_engine is not None else None
+        # PdfWorkerPool.submit() blocks when its queue is full; never let it
+        self.pdf_slots = asyncio.Semaphore(max(1, pdf_workers) * 2)
+        self.counts = Counter()
+        self.pending = 0          # accepted requests not yet answered
+        self.in_flight = 0        # renders running or queued for a worker
+        self.peak_in_flight = 0
+        self.latencies = deque(maxlen=10000)
+        self.started = time.monotonic()
+        self.draining = False
+        self.closing = False
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.connections = {}     # writer → handler task
+
+    async def handle_connection(self, reader, writer):
+        """Read pipelined requests, dispatch each at once and answer in order."""
+        self.connections[writer] = asyncio.current_task()
+        responses = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        sender = asyncio.create_task(self._send_responses(writer, responses))
+        try:
+            while not self.draining:
+                request = await read_request(reader)
+                if request is None or self.closing:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close" and not self.draining
+                self._accept()
+                await responses.put((asyncio.create_task(self._dispatch(method, path, body)), keep_alive))
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            await responses.put(None)
+            await sender
+            if self.closing:
+                await self._linger(reader)
+            self.connections.pop(writer, None)
+            writer.close()
+
+    async def _linger(self, reader):
+        async def discard():
+            while await reader.read(65536):
+                pass
+
+        try:
+            await asyncio.wait_for(discard(), LINGER_SECONDS)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+
+    async def _send_responses(self, writer, responses: asyncio.Queue):
+        broken = False
+        while True:
+            item = await responses.get()
+            if item is None:
+                return
+            task, keep_alive = item
+            try:
+                response = await task
+            except Exception as e:
+                self.counts["internal_error"] += 1
+                response = self._error(500, f"{type(e).__name__}: {e}")
+            try:
+                if not broken:
+                    writer.write(http_response(*response, keep_alive and not self.draining))
+                    await writer.drain()
+            except ConnectionError:
+                broken = True
+            finally:
+                self._answered()
+
+    def _accept(self):
+        self.pending += 1
+        self.idle.clear()
+
+    def _answered(self):
+        self.pending -= 1
+        if self.pending == 0:
+            self.idle.set()
+
+    async def _dispatch(self, method: str, path: str, body: bytes):
+        if method == "GET" and path == "/healthz":
+            if self.draining:
+                return 503, b'{"status":"draining"}', "application/json"
+            return 200, b'{"status":"ok"}', "application/json"
+        if method == "GET" and path == "/stats":
+            return 200, json.dumps(self.stats()).encode("utf-8"), "application/json"
+        if path != "/render":
+            return self._error(404, f"Unknown endpoint {path}")
+        if method != "POST":
+            return self._error(405, "/render requires POST")
+        if self.in_flight >= self.max_queue:
+            self.counts["rejected"] += 1
+            return self._error(503, "Render queue full")
+
+        self.counts["requests"] += 1
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            self.counts["bad_request"] += 1
+            return self._error(400, f"Invalid JSON payload: {e}")
+        if isinstance(request, dict) and isinstance(request.get("report"), dict):
+            report, options = request["report"], dict(request.get("options") or {})
+        else:
+            report, options = request, {}
+        options.setdefault("renderer", self.renderer)
+        if options["renderer"] not in RENDERER_CHOICES:
+            self.counts["bad_request"] += 1
+            return self._error(400, f"Unknown renderer: {options['renderer']}")
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wrap_future(self.executor.submit(render_report, report, options))
+        finally:
+            self.in_flight -= 1
+            self.latencies.append(time.perf_counter() - started)
+
+        status = result.pop("status")
+        self.counts[f"status_{status}"] += 1
+        if status == 200 and options.get("pdf"):
+            await self._attach_pdf(result)
+        if options.get("markdown") is False:
+            result.pop("markdown", None)
+        return status, json.dumps(result, ensure_ascii=False).encode("utf-8"), "application/json"
+
+    async def _attach_pdf(self, result: dict):
+        """Convert result["markdown"] to PDF and add it as pdfBase64 (or pdfError)."""
+        if self.pdf_pool is None:
+            result["pdfError"] = "no PDF engine available"
+            return
+        with tempfile.TemporaryDirectory(prefix="render-daemon-") as tmp:
+            md_path = Path(tmp) / "report.md"
+            md_path.write_text(result["markdown"], encoding="utf-8")
+            async with self.pdf_slots:
+                try:
+                    pdf_path = await asyncio.wrap_future(self.pdf_pool.submit(md_path, md_path.with_suffix(".pdf")))
+                except PdfEngineError as e:
+                    self.counts["pdf_failed"] += 1
+                    result["pdfError"] = str(e)
+                    return
+            result["pdfBase64"] = base64.b64encode(pdf_path.read_bytes()).decode("ascii")
+            self.counts["pdf"] += 1
+
+    def _error(self, code: int, message: str):
+        return code, json.dumps({"error": message}).encode("utf-8"), "application/json"
+
+    def stats(self) -> dict:
+        """Return request counters, queue depth and render latency percentiles."""
+        ordered = sorted(self.latencies)
+
+        def pct(p):
+            return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1] * 1000 if ordered else 0.0
+
+        return {
+            "uptimeSeconds": round(time.monotonic() - self.started, 3),
+            "counts": dict(self.counts),
+            "pending": self.pending,
+            "inFlight": self.in_flight,
+            "peakInFlight": self.peak_in_flight,
+            "connections": len(self.connections),
+            "draining": self.draining,
+            "latencyMs": {"p50": round(pct(50), 3), "p95": round(pct(95), 3), "p99": round(pct(99), 3)},
+        }
+
+    async def drain(self, timeout: float):
+        """Stop reading new requests, answer the accepted ones, then close every connection."""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self.idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Drain timed out with {self.pending} requests unanswered", file=sys.stderr)
+        # Every accepted request is answered: half-close so clients see EOF,
+        # and let the handlers read out whatever is still in flight
+        self.closing = True
+        handlers = list(self.connections.values())
+        for writer in list(self.connections):
+            if writer.can_write_eof():
+                writer.write_eof()
+        if handlers:
+            _, handlers = await asyncio.wait(handlers, timeout=LINGER_SECONDS + 1)
+        # Clients that never close get cut off
+        for writer in list(self.connections):
+            writer.close()
+        if handlers:
+            await asyncio.wait(handlers, timeout=1)
+
+    def close(self):
+        self.executor.shutdown()
+        if self.pdf_pool is not None:
+            self.pdf_pool.close()
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve report renders from a resident process.")
+    parser.add_argument("--socket", default=None, metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8788, help="TCP bind port (default: 8788)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="render worker processes; 0 renders on one thread in the daemon "
+                             "(default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=256,
+                        help="renders accepted at once before 503 (default: 256)")
+    parser.add_argument("--renderer", choices=RENDERER_CHOICES, default="compiled",
+                        help="default renderer when a request sets none (default: compiled)")
+    parser.add_argument("--pdf-engine", choices=ENGINE_CHOICES, default="auto",
+                        help="engine for requests with options.pdf (default: auto)")
+    parser.add_argument("--pdf-workers", type=int, default=2, help="concurrent PDF conversions (default: 2)")
+    parser.add_argument("--drain-timeout", type=float, default=30.0,
+                        help="seconds to finish accepted requests on shutdown (default: 30)")
+    return parser.parse_args(argv)
+
+def is_socket(path: str) -> bool:
+    """True when path exists and is a Unix socket (never follows a missing path)."""
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+async def serve(args: argparse.Namespace):
+    if args.socket and os.path.lexists(args.socket) and not is_socket(args.socket):
+        print(f"Error: {args.socket} exists and is not a socket; refusing to remove it", file=sys.stderr)
+        sys.exit(1)
+    daemon = RenderDaemon(args.workers, args.max_queue, args.renderer,
+                          select_engine(args.pdf_engine), args.pdf_workers)
+    if args.socket:
+        if is_socket(args.socket):
+            os.unlink(args.socket)
+        server = await asyncio.start_unix_server(daemon.handle_connection, args.socket, backlog=1024)
+        address = f"unix:{args.socket}"
+    else:
+        server = await asyncio.start_server(daemon.handle_connection, args.host, args.port, backlog=1024)
+        host, port = server.sockets[0].getsockname()[:2]
+        address = f"http://{host}:{port}"
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    print(f"✅ Render daemon listening on {address} (POST /render, GET /stats)", file=sys.stderr, flush=True)
+    try:
+        await stop.wait()
+        print("ℹ️  Draining...", file=sys.stderr, flush=True)
+        server.close()
+        await daemon.drain(args.drain_timeout)
+        await server.wait_closed()
+    finally:
+        daemon.close()
+        if args.socket and is_socket(args.socket):
+            os.unlink(args.socket)
+    counts = daemon.stats()["counts"]
+    print(f"✅ Drained: {counts.get('requests', 0)} renders served", file=sys.stderr)
+
+def main(argv=None) -> int:
+    """Run the daemon until SIGTERM/SIGINT, then drain."""
+    asyncio.run(serve(parse_args(argv)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
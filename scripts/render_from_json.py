@@ -3,421 +3,691 @@
 DiagnosticPro Offline Report Renderer
 Reads JSON diagnostic data and renders to Markdown (and optionally PDF via pandoc).
 Merges with 14-point template while respecting length and truncation rules.
-"""
-
-import json
-import sys
-from pathlib import Path
-from datetime import datetime
-
-def truncate_list(items: list, max_items: int, label: str) -> tuple[list, str]:
-    """Truncate list to max_items and return remainder note."""
-    if len(items) <= max_items:
-        return items, ""
-
-    remaining = len(items) - max_items
-    note = f"*+{remaining} more {label} omitted for brevity*"
-    return items[:max_items], note
-
-def render_markdown(data: dict) -> str:
-    """Render diagnostic JSON to Markdown using 14-point framework."""
-
-    lines = []
-
-    # Header
-    lines.append("# DiagnosticPro Diagnostic Report")
-    lines.append("")
-    generated_at = data.get("meta", {}).get("generated_at_iso", datetime.utcnow().isoformat() + "Z")
-    lines.append(f"**Generated:** {generated_at}")
-    lines.append(f"**Submission ID:** {data.get('submissionId', 'UNKNOWN')}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # Customer & Equipment Snapshot
-    lines.append("## Customer & Equipment Information")
-    lines.append("")
-    customer = data.get("customer", {})
-    lines.append(f"**Customer:** {customer.get('name', 'N/A')} ({customer.get('email', 'N/A')})")
-
-    equipment = data.get("equipment", {})
-    eq_parts = []
-    if equipment.get("year"): eq_parts.append(equipment["year"])
-    if equipment.get("make"): eq_parts.append(equipment["make"])
-    if equipment.get("model"): eq_parts.append(equipment["model"])
-    eq_str = " ".join(eq_parts) if eq_parts else f"{equipment.get('type', 'Unknown')} equipment"
-    lines.append(f"**Equipment:** {eq_str}")
-
-    lines.append("")
-    lines.append(f"**Reported Symptoms:** {data.get('symptoms', 'None provided')}")
-    lines.append("")
-
-    codes = data.get("codes", [])
-    if codes:
-        lines.append(f"**Diagnostic Codes:** {', '.join(codes)}")
-    else:
-        lines.append("**Diagnostic Codes:** None reported")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 1. PRIMARY DIAGNOSIS
-    lines.append("## 1. PRIMARY DIAGNOSIS")
-    lines.append("")
-    lines.append("**Most Likely Root Cause:**")
-    lines.append("")
-    lines.append(data.get("most_likely_cause", "Analysis incomplete"))
-    lines.append("")
-
-    confidence = data.get("confidence", {})
-    score = confidence.get("score_pct", 0)
-    threshold = confidence.get("threshold_pct", 85)
-    assessment = confidence.get("assessment", "No assessment provided")
-
-    lines.append(f"**Confidence:** {score}% (Target: {threshold}%)")
-    lines.append(f"*{assessment}*")
-    lines.append("")
-
-    uplift_reqs = data.get("confidence_uplift_requirements", [])
-    if uplift_reqs and score < threshold:
-        lines.append("### To Raise Confidence:")
-        lines.append("")
-        uplift_display, uplift_note = truncate_list(uplift_reqs, 8, "requirements")
-        for req in uplift_display:
-            lines.append(f"- {req}")
-        if uplift_note:
-            lines.append("")
-            lines.append(uplift_note)
-        lines.append("")
-
-    lines.append("---")
-    lines.append("")
-
-    # 2. DIFFERENTIAL DIAGNOSIS
-    lines.append("## 2. DIFFERENTIAL DIAGNOSIS")
-    lines.append("")
-    lines.append("**Alternative Causes Ranked by Likelihood:**")
-    lines.append("")
-
-    hypotheses = data.get("root_cause_hypotheses", [])
-    hypotheses_display, hyp_note = truncate_list(hypotheses, 5, "hypotheses")
-
-    for idx, hyp in enumerate(hypotheses_display, 1):
-        likelihood = hyp.get("likelihood", "unknown").upper()
-        lines.append(f"**{idx}. {hyp.get('hypothesis', 'Unknown')}** — *{likelihood} likelihood*")
-        lines.append(f"   Evidence: {hyp.get('evidence', 'No evidence provided')}")
-        lines.append("")
-
-    if hyp_note:
-        lines.append(hyp_note)
-        lines.append("")
-
-    lines.append("---")
-    lines.append("")
-
-    # 3. DIAGNOSTIC VERIFICATION
-    lines.append("## 3. DIAGNOSTIC VERIFICATION")
-    lines.append("")
-    lines.append("**Required Tests & Procedures:**")
-    lines.append("")
-
-    actions = data.get("recommended_actions", [])
-    actions_display, actions_note = truncate_list(actions, 8, "actions")
-
-    for idx, action in enumerate(actions_display, 1):
-        lines.append(f"{idx}. **{action.get('step', 'Unknown step')}**")
-        lines.append(f"   *Why:* {action.get('why', 'No reason provided')}")
-        lines.append("")
-
-    if actions_note:
-        lines.append(actions_note)
-        lines.append("")
-
-    lines.append("---")
-    lines.append("")
-
-    # 4. SHOP INTERROGATION
-    lines.append("## 4. SHOP INTERROGATION")
-    lines.append("")
-    lines.append("**Critical Questions to Ask Your Mechanic:**")
-    lines.append("")
-    lines.append("1. What exact diagnostic tests did you perform to isolate this issue?")
-    lines.append("2. Can you show me the freeze-frame data or live sensor readings?")
-    lines.append("3. What are the specific test values that confirm your diagnosis?")
-    lines.append("4. Have you checked TSBs and known failure patterns for this symptom?")
-    lines.append("5. What's your confidence level, and what would increase it to 100%?")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 5. CONVERSATION SCRIPTING
-    cost_low = data.get("estimated_cost_range_usd", {}).get("low", 0)
-    cost_high = data.get("estimated_cost_range_usd", {}).get("high", 0)
-
-    lines.append("## 5. CONVERSATION SCRIPTING")
-    lines.append("")
-    lines.append("**What to Say to Protect Yourself:**")
-    lines.append("")
-    lines.append(f"- \"Before authorizing any repair over ${cost_low}, I need to see the diagnostic data that confirms this issue.\"")
-    lines.append("- \"Can you explain why [alternative hypothesis] isn't the cause?\"")
-    lines.append(f"- \"I'd like a second opinion before proceeding with repairs exceeding ${cost_high}.\"")
-    lines.append("- \"Show me the exact test results that rule out warranty coverage or TSB applicability.\"")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 6. COST BREAKDOWN
-    lines.append("## 6. COST BREAKDOWN")
-    lines.append("")
-    lines.append("**Fair Price Expectations:**")
-    lines.append("")
-    lines.append(f"- **Parts & Labor Range:** ${cost_low} – ${cost_high} USD")
-    time_hours = data.get("estimated_time_hours", 0)
-    lines.append(f"- **Estimated Time:** {time_hours} hours")
-    red_flag_cost = int(cost_high * 1.5)
-    lines.append(f"- **Red Flags:** Any quote exceeding ${red_flag_cost} without additional failures found")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 7. RIPOFF DETECTION
-    lines.append("## 7. RIPOFF DETECTION")
-    lines.append("")
-    lines.append("**Watch Out For:**")
-    lines.append("")
-
-    safety_notes = data.get("safety_notes", [])
-    safety_display, safety_note = truncate_list(safety_notes, 6, "safety notes")
-
-    for note in safety_display:
-        lines.append(f"- {note}")
-
-    if safety_note:
-        lines.append("")
-        lines.append(safety_note)
-
-    lines.append("")
-    lines.append("**Common Scams:**")
-    lines.append("")
-    lines.append("- Replacing parts \"just in case\" without diagnostic confirmation")
-    lines.append("- Charging diagnostic fees without isolating root cause")
-    lines.append("- Recommending unnecessary preventive maintenance during urgent repairs")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 8. AUTHORIZATION GUIDE
-    lines.append("## 8. AUTHORIZATION GUIDE")
-    lines.append("")
-    lines.append("**Decision Matrix:**")
-    lines.append("")
-    lines.append("| Scenario | Your Response |")
-    lines.append("|----------|---------------|")
-    lines.append("| Diagnosis matches this report + cost within range | ✅ **APPROVE** with confidence |")
-    lines.append("| Diagnosis differs but mechanic shows test data | ⚠️ **REQUEST EXPLANATION** before proceeding |")
-    threshold_cost = int(cost_high * 1.3)
-    lines.append(f"| Quote exceeds ${threshold_cost} | 🔴 **SECOND OPINION REQUIRED** |")
-    lines.append("| Shop refuses to show diagnostic data | 🚫 **REJECT & LEAVE** immediately |")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 9. TECHNICAL EDUCATION
-    lines.append("## 9. TECHNICAL EDUCATION")
-    lines.append("")
-    lines.append("**How This System Works & Why It Fails:**")
-    lines.append("")
-    lines.append(data.get("symptoms", "Symptom information not provided"))
-    lines.append("")
-    lines.append("**Failure Mechanisms:**")
-    lines.append("")
-    for hyp in hypotheses_display:
-        lines.append(f"- {hyp.get('hypothesis', 'Unknown')}: {hyp.get('evidence', 'No evidence')}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 10. OEM PARTS STRATEGY
-    lines.append("## 10. OEM PARTS STRATEGY")
-    lines.append("")
-    lines.append("**Recommended Parts & Tools:**")
-    lines.append("")
-
-    tools_parts = data.get("tools_parts", [])
-    tools_display, tools_note = truncate_list(tools_parts, 12, "tools/parts")
-
-    for tool in tools_display:
-        lines.append(f"- {tool}")
-
-    if tools_note:
-        lines.append("")
-        lines.append(tools_note)
-
-    lines.append("")
-    lines.append("### Warranty & Technical Service Bulletins:")
-    lines.append("")
-
-    warranty_refs = data.get("warranty_or_tsb_refs", [])
-    if warranty_refs:
-        warranty_display, warranty_note = truncate_list(warranty_refs, 8, "references")
-        for ref in warranty_display:
-            lines.append(f"- {ref}")
-        if warranty_note:
-            lines.append("")
-            lines.append(warranty_note)
-    else:
-        lines.append("- No active TSBs or warranty coverage identified for this symptom pattern")
-
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 11. NEGOTIATION TACTICS
-    lines.append("## 11. NEGOTIATION TACTICS")
-    lines.append("")
-    lines.append("**Professional Price Discussion:**")
-    lines.append("")
-    lines.append(f"1. **Establish Baseline:** \"Your quote of $X is above the industry average of ${cost_high} for this repair.\"")
-    lines.append("2. **Request Itemization:** \"Can you break down parts cost vs labor separately?\"")
-    lines.append("3. **Leverage Competition:** \"I have quotes from two other shops—can you match or explain the difference?\"")
-    lines.append("4. **Time-Based Discounts:** \"If I authorize this today, can you reduce the rate?\"")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 12. LIKELY CAUSES (RANKED BY CONFIDENCE)
-    lines.append("## 12. LIKELY CAUSES (RANKED BY CONFIDENCE)")
-    lines.append("")
-    for idx, hyp in enumerate(hypotheses_display, 1):
-        likelihood = hyp.get("likelihood", "unknown").upper()
-        lines.append(f"{idx}. **{hyp.get('hypothesis', 'Unknown')}** — {likelihood} ({hyp.get('evidence', 'No evidence')})")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 13. RECOMMENDATIONS
-    lines.append("## 13. RECOMMENDATIONS")
-    lines.append("")
-    lines.append("**Immediate Actions:**")
-    lines.append("")
-    for action in actions_display:
-        lines.append(f"- {action.get('step', 'Unknown step')}")
-    lines.append("")
-    lines.append("**Future Preventive Maintenance:**")
-    lines.append("")
-    lines.append("- Monitor related systems for early warning signs")
-    lines.append("- Document all repairs for pattern analysis")
-    lines.append("- Follow OEM maintenance intervals strictly")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # 14. SOURCE VERIFICATION
-    lines.append("## 14. SOURCE VERIFICATION")
-    lines.append("")
-    lines.append("**Authoritative References:**")
-    lines.append("")
-
-    if warranty_refs:
-        for ref in warranty_display:
-            lines.append(f"- {ref}")
-    else:
-        lines.append("- OEM Service Manual (specific VIN lookup required)")
-        lines.append("- NHTSA Complaints Database")
-        lines.append("- Technical Service Bulletin Archives")
-
-    lines.append("")
-    lines.append("---")
-    lines.append("")
 
-    # DISCLAIMERS
-    lines.append("## DISCLAIMERS")
-    lines.append("")
-    disclaimers = data.get("disclaimers", [])
-    for disclaimer in disclaimers[:10]:  # Max 10
-        lines.append(f"- {disclaimer}")
+Batch mode (--batch) renders directories, globs or JSONL streams of reports
+across a process pool and prints an aggregate throughput summary.
 
-    if len(disclaimers) > 10:
-        lines.append("")
-        lines.append(f"*+{len(disclaimers) - 10} more disclaimers omitted*")
+--renderer budgeted trims sections by priority so every report fits
+--page-cap (and --max-chars) in one render instead of only being flagged.
 
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+--profile writes <name>.metrics.json next to each report with wall/CPU time
+(and with --profile-memory, peak memory) for JSON load, validation,
+rendering, the Markdown write and PDF conversion; with --renderer markdown
+every report section is timed too. --cprofile PATH dumps a cProfile of the
+run (the parent process only when batch workers > 1).
 
-    # Footer
-    readiness = data.get("customer_readiness_check", {})
-    verdict = readiness.get("verdict", "unknown")
-    reason = readiness.get("short_reason", "No reason provided")
-
-    lines.append(f"**Customer Readiness Status:** {verdict}")
-    lines.append(f"*Reason:* {reason}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    submission_id = data.get("submissionId", "UNKNOWN")
-    lines.append(f"*Report generated by DiagnosticPro AI | Submission ID: {submission_id} | {generated_at}*")
+--stream writes each report section by section (report_stream.py), so very
+large reports are never held in memory as one string.
+"""
 
-    return "\n".join(lines)
+import glob
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
 
-def main():
-    """Read JSON input, render to Markdown, optionally convert to PDF."""
-    if len(sys.argv) < 2:
-        print("Usage: render_from_json.py <input.json> [output_base_name]", file=sys.stderr)
-        print("  Output will be: <output_base_name>.md (and .pdf if pandoc available)", file=sys.stderr)
-        sys.exit(1)
+from page_model import PAGE_CAP, estimate_pages
+from pdf_backend import ENGINE_CHOICES, PdfEngineError, PdfWorkerPool, convert_pdf, select_engine, skip_reason
+from render_cache import DEFAULT_MAX_BYTES, RenderCache
+from report_markdown import RENDERER_CHOICES, get_renderer, render_markdown, truncate_list  # noqa: F401
+from report_schema import validate_report
+from stage_profiler import StageProfiler, cprofile, hottest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Bump when rendered output changes for a reason RENDER_SOURCES cannot see
+# (a data file, a pandoc upgrade) so cached artifacts are never stale.
+RENDERER_VERSION = "1.0.0"
+TEMPLATE_VERSION = "14point-1.0"
+# Files whose contents shape cached Markdown/PDF bytes; template_version()
+# hashes them so an edit invalidates the cache without a manual bump
+RENDER_SOURCES = (
+    "templates/14point/report.md", "scripts/report_markdown.py", "scripts/render_from_json.py",
+    "scripts/report_template.py", "scripts/report_budget.py", "scripts/page_model.py", "scripts/pdf_backend.py",
+    "scripts/page_model.calibration.json",
+)
+
+def percentile(values: list, pct: float) -> float:
+    """Return the nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def safe_output_name(name: str) -> str:
+    """Reduce an arbitrary submission ID to a filesystem-safe base name."""
+    cleaned = re.sub(r"[^A-Za-z0-9._-]+", "_", str(name)).strip("._")
+    return cleaned or "report"
+
+def iter_jsonl(stream, label: str):
+    """Yield (output_base, payload) for each non-blank line of a JSONL stream."""
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        fallback = f"{label}-{lineno}"
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield fallback, {"__error__": f"line {lineno}: invalid JSON ({e})"}
+            continue
+        submission_id = payload.get("submissionId") if isinstance(payload, dict) else None
+        yield safe_output_name(submission_id or fallback), payload
+
+def iter_batch_sources(sources: list):
+    """Expand directories, globs, JSONL files and '-' (stdin JSONL) into render jobs.
+
+    Yields (output_base, path_or_payload). JSON files are yielded as paths so the
+    worker process does the read; JSONL records are yielded as parsed payloads.
+    """
+    for source in sources:
+        if source == "-":
+            yield from iter_jsonl(sys.stdin, "stdin")
+            continue
+
+        path = Path(source)
+        if path.is_dir():
+            matches = sorted(path.glob("*.json")) + sorted(path.glob("*.jsonl"))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = sorted(Path(p) for p in glob.glob(source, recursive=True))
+            if not matches:
+                yield safe_output_name(path.stem), {"__error__": f"no inputs match {source}"}
+                continue
+
+        for match in matches:
+            if match.suffix == ".jsonl":
+                with open(match, 'r') as f:
+                    yield from iter_jsonl(f, match.stem)
+            else:
+                yield match.stem, match
+
+def unique_output_names(jobs):
+    """Suffix repeated output base names (-2, -3, ...) so no report overwrites another.
+
+    Two inputs with the same submissionId or file stem would otherwise map to
+    the same .md/.pdf; names are compared case-insensitively, as some
+    filesystems do.
+    """
+    used = set()
+    for output_base, source in jobs:
+        name = output_base
+        n = 1
+        while name.casefold() in used:
+            n += 1
+            name = f"{output_base}-{n}"
+        if name != output_base:
+            print(f"⚠️  {output_base}: output name already used in this batch; writing {name}", file=sys.stderr)
+        used.add(name.casefold())
+        yield name, source
+
+_template_version = None
+
+def template_version() -> str:
+    """TEMPLATE_VERSION plus a digest of the template and renderer sources.
+
+    The sources are hashed once per process; every later call reuses the digest.
+    """
+    global _template_version
+    if _template_version is None:
+        import hashlib  # deferred: only cached runs need it
+        digest = hashlib.sha256()
+        for source in RENDER_SOURCES:
+            path = ROOT / source
+            digest.update(source.encode("utf-8") + b"\0")
+            digest.update(path.read_bytes() if path.exists() else b"")
+        _template_version = f"{TEMPLATE_VERSION}+{digest.hexdigest()[:16]}"
+    return _template_version
+
+def open_cache(options: dict):
+    """Build a RenderCache from CLI options, or None when caching is disabled."""
+    if options.get("no_cache"):
+        return None
+    version = f"{RENDERER_VERSION}:{template_version()}"
+    if options.get("renderer") == "budgeted":
+        version += f":budget-{options.get('page_cap', PAGE_CAP)}p-{options.get('max_chars')}c"
+    return RenderCache(
+        options["cache_dir"],
+        version=version,
+        max_bytes=options.get("cache_max_bytes", DEFAULT_MAX_BYTES),
+        rebuild=options.get("rebuild", False),
+    )
+
+# render_options keys that open_cache() reads
+CACHE_OPTIONS = ("no_cache", "cache_dir", "cache_max_bytes", "rebuild", "renderer", "page_cap", "max_chars")
+_job_caches = {}
+
+def pdf_suffix(pdf_engine: str):
+    """Cache suffix for PDFs from the --pdf-engine choice, or None when PDF output is off.
+
+    PDFs are stored under their report's Markdown key, one suffix per engine,
+    so switching engines never invalidates cached Markdown.
+    """
+    if pdf_engine == "none":
+        return None
+    return ".text.pdf" if pdf_engine == "text" else ".pdf"
+
+def job_cache(options: dict):
+    """Return this process's RenderCache for options, building it on the first job.
+
+    Batch workers receive a fresh copy of render_options with every job, so the
+    cache is memoized on the option values rather than rebuilt per report.
+    """
+    key = tuple(options.get(name) for name in CACHE_OPTIONS)
+    if key not in _job_caches:
+        _job_caches[key] = open_cache(options)
+    return _job_caches[key]
+
+def render_cached(data: dict, cache, renderer=render_markdown) -> tuple[str, str, bool]:
+    """Return (markdown, cache_key, hit), rendering only on a cache miss."""
+    if cache is None:
+        return renderer(data), "", False
+    key = cache.key_for(data)
+    cached = cache.lookup(key, ".md")
+    if cached is not None:
+        return cached.read_text(encoding="utf-8"), key, True
+    markdown = renderer(data)
+    cache.store_text(key, ".md", markdown)
+    return markdown, key, False
+
+def stream_cached(data: dict, output_md: Path, cache, render_options: dict) -> tuple[int, float, str, bool]:
+    """Stream data's Markdown to output_md section by section; return (chars, pages, cache_key, hit).
+
+    The whole document is never held in memory: cache hits are copied and
+    measured a section at a time, misses are streamed and then copied into
+    the cache. "markdown" streams the compiled template (identical bytes).
+    """
+    from report_stream import measure_file, stream_report
+
+    key = cache.key_for(data) if cache is not None else ""
+    cached = cache.lookup(key, ".md") if cache is not None else None
+    if cached is not None:
+        shutil.copyfile(cached, output_md)
+        measured = measure_file(output_md)
+        return measured["chars"], measured["pages"], key, True
+    try:
+        with open(output_md, 'w') as f:
+            result = stream_report(data, f, render_options.get("renderer", "markdown"),
+                                   render_options.get("page_cap", PAGE_CAP), render_options.get("max_chars"),
+                                   measure_pages=True)
+    except Exception:
+        output_md.unlink(missing_ok=True)  # never leave a partial or over-budget report behind
+        raise
+    if cache is not None:
+        cache.store_file(key, ".md", output_md)
+    return result["chars"], result["pages"], key, False
+
+FORMAT_SUFFIXES = {"html": ".html", "txt": ".txt"}
+
+def write_formats(data: dict, output_md: Path, cache, render_options: dict) -> list:
+    """Write the extra --formats next to output_md from one (cached) report IR; return the paths."""
+    from report_ir import html_document, render_formats
+
+    formats = render_options.get("formats") or ()
+    rendered = render_formats(data, formats, render_options.get("renderer", "markdown"),
+                              render_options.get("page_cap", PAGE_CAP), render_options.get("max_chars"), cache)
+    paths = []
+    for fmt, text in rendered.items():
+        path = output_md.with_suffix(FORMAT_SUFFIXES[fmt])
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(html_document(text) if fmt == "html" else text)
+        paths.append(path)
+    return paths
+
+def report_metrics(data: dict, chars: int, pages: float, profiler: StageProfiler, **extra) -> dict:
+    """Per-report metrics record written as <name>.metrics.json by --profile."""
+    return {
+        "charCount": chars,
+        "estimatedPages": round(pages, 3),
+        "confidenceScore": data.get("confidence", {}).get("score_pct"),
+        "customerReadiness": data.get("customer_readiness_check", {}).get("verdict"),
+        **extra,
+        "stages": profiler.as_dict(),
+    }
+
+def write_metrics(path: Path, metrics: dict):
+    with open(path, 'w') as f:
+        json.dump(metrics, f, indent=2)
+        f.write("\n")
+
+def profiled_renderer(renderer, profiler: StageProfiler):
+    """Return renderer with per-section timing when it is render_markdown()."""
+    if profiler is not None and renderer is render_markdown:
+        return partial(render_markdown, profiler=profiler)
+    return renderer
+
+@contextmanager
+def _no_stage(name):
+    yield
+
+def render_job(job: tuple, out_dir: str, render_options: dict) -> dict:
+    """Render one batch job to <out_dir>/<output_base>.md; never raises."""
+    output_base, source = job
+    result = {"name": output_base, "ok": False, "chars": 0, "pages": 0.0, "render_seconds": 0.0,
+              "cache_hit": False, "cache_key": "", "md_path": None, "error": None, "stages": None,
+              "metrics": None}
+    profiler = StageProfiler(render_options.get("profile_memory", False)) if render_options.get("profile") else None
+    stage = profiler.stage if profiler is not None else _no_stage
+    cache = job_cache(render_options)
+    try:
+        with stage("json_load"):
+            if isinstance(source, Path):
+                with open(source, 'r') as f:
+                    data = json.load(f)
+            else:
+                data = source
+        if isinstance(data, dict) and "__error__" in data:
+            raise ValueError(data["__error__"])
+        if not isinstance(data, dict):
+            raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+        if render_options.get("validate"):
+            with stage("validate"):
+                errors = validate_report(data)
+            if errors:
+                raise ValueError(f"schema validation failed ({len(errors)} errors): {'; '.join(errors)}")
+
+        started = time.perf_counter()
+        output_md = Path(out_dir) / f"{output_base}.md"
+        if render_options.get("stream"):
+            with stage("render"):
+                result["chars"], result["pages"], result["cache_key"], result["cache_hit"] = stream_cached(
+                    data, output_md, cache, render_options)
+            result["render_seconds"] = time.perf_counter() - started
+        else:
+            renderer = get_renderer(render_options.get("renderer", "markdown"),
+                                    render_options.get("page_cap", PAGE_CAP), render_options.get("max_chars"))
+            with stage("render"):
+                markdown, result["cache_key"], result["cache_hit"] = render_cached(
+                    data, cache, profiled_renderer(renderer, profiler))
+            result["render_seconds"] = time.perf_counter() - started
+
+            with stage("write_markdown"):
+                with open(output_md, 'w') as f:
+                    f.write(markdown)
+            result["chars"] = len(markdown)
+            with stage("page_estimate"):
+                result["pages"] = estimate_pages(markdown)
+        if render_options.get("formats"):
+            with stage("formats"):
+                write_formats(data, output_md, cache, render_options)
+        result["md_path"] = str(output_md)
+        if profiler is not None:
+            # run_batch() writes these once the report's PDF step is settled
+            result["metrics"] = report_metrics(data, result["chars"], result["pages"], profiler,
+                                               renderer=render_options.get("renderer", "markdown"),
+                                               cacheHit=result["cache_hit"])
+            result["stages"] = result["metrics"]["stages"]
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if profiler is not None:
+            profiler.close()
+    return result
+
+def imap_bounded(executor, fn, jobs, window: int):
+    """Like executor.map, but keeps at most `window` jobs in flight.
+
+    executor.map() drains its input up front, which would pull an entire JSONL
+    stream into memory; this submits lazily and yields results as they finish.
+    """
+    from concurrent.futures import FIRST_COMPLETED, as_completed, wait
+    pending = set()
+    for job in jobs:
+        pending.add(executor.submit(fn, job))
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    for future in as_completed(pending):
+        yield future.result()
+
+def queue_pdf(result: dict, cache, pdf_pool, suffix: str = ".pdf"):
+    """Copy a cached PDF for a rendered batch result, or queue it for conversion.
+
+    Returns None when the PDF was served from cache, otherwise the Future.
+    """
+    md_path = Path(result["md_path"])
+    pdf_path = md_path.with_suffix(".pdf")
+    cached_pdf = cache.lookup(result["cache_key"], suffix) if cache is not None else None
+    if cached_pdf is not None:
+        shutil.copyfile(cached_pdf, pdf_path)
+        return None
+    return pdf_pool.submit(md_path, pdf_path)
+
+def write_batch_metrics(result: dict, pdf: str, seconds=None, stage_totals=None):
+    """Write a batch result's <name>.metrics.json with its PDF outcome.
+
+    seconds is the (wall, CPU) time of the PDF conversion, recorded as the
+    "pdf" stage and added to stage_totals.
+    """
+    metrics = result["metrics"]
+    if metrics is None:
+        return
+    stages = metrics.pop("stages")
+    if seconds is not None:
+        stages["pdf"] = {"calls": 1, "wall_ms": round(seconds[0] * 1000, 4), "cpu_ms": round(seconds[1] * 1000, 4)}
+        total = stage_totals.setdefault("pdf", {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+        for field in total:
+            total[field] += stages["pdf"][field]
+    write_metrics(Path(result["md_path"]).with_suffix(".metrics.json"), {**metrics, "pdf": pdf, "stages": stages})
+
+def run_batch(sources: list, out_dir: str, workers: int, render_options: dict,
+              pdf_engine=None, pdf_workers: int = 2, page_cap: int = PAGE_CAP,
+              strict_page_cap: bool = False, pdf_engine_name: str = "auto") -> int:
+    """Render every job from sources across a process pool and print a summary.
+
+    When pdf_engine is set, rendered Markdown is handed to a PdfWorkerPool as
+    results arrive so PDF conversion overlaps with rendering; otherwise
+    pdf_engine_name (the --pdf-engine choice) says why PDFs are skipped. With
+    strict_page_cap, reports the page model puts over page_cap get no PDF and
+    count as failures.
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    jobs = unique_output_names(iter_batch_sources(sources))
+    worker = partial(render_job, out_dir=out_dir, render_options=render_options)
+    cache = job_cache(render_options)
+    suffix = pdf_suffix(pdf_engine_name)
+    pdf_pool = PdfWorkerPool(pdf_engine, workers=pdf_workers) if pdf_engine is not None else None
+    pdf_futures = []
+    pdf_cached = 0
+
+    render_times = []
+    failures = 0
+    cache_hits = 0
+    total_chars = 0
+    over_cap = 0
+    stage_totals = {}
+    started = time.perf_counter()
+
+    if workers <= 1:
+        results = map(worker, jobs)
+        pool = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # batch only; costly to import
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = imap_bounded(pool, worker, jobs, window=workers * 4)
 
-    input_path = Path(sys.argv[1])
+    try:
+        for result in results:
+            if not result["ok"]:
+                failures += 1
+                print(f"❌ {result['name']}: {result['error']}", file=sys.stderr)
+                continue
+            render_times.append(result["render_seconds"])
+            cache_hits += result["cache_hit"]
+            total_chars += result["chars"]
+            for name, record in (result["stages"] or {}).items():
+                total = stage_totals.setdefault(name, {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+                for field in total:
+                    total[field] += record[field]
+            if result["pages"] > page_cap:
+                over_cap += 1
+                print(f"⚠️  {result['name']}: ~{result['pages']:.1f} pages exceeds {page_cap}-page hard cap")
+                if strict_page_cap:
+                    write_batch_metrics(result, "none")
+                    continue
+            if pdf_pool is None:
+                write_batch_metrics(result, "none")
+                continue
+            future = queue_pdf(result, cache, pdf_pool, suffix)
+            if future is None:
+                pdf_cached += 1
+                write_batch_metrics(result, "cached")
+            else:
+                pdf_futures.append((result, future))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if pdf_pool is not None:
+            pdf_pool.close()
+
+    pdf_failures = 0
+    for result, future in pdf_futures:
+        try:
+            pdf_path = future.result()
+        except PdfEngineError as e:
+            pdf_failures += 1
+            print(f"❌ {result['name']}: PDF {e}", file=sys.stderr)
+            write_batch_metrics(result, "failed", future.seconds, stage_totals)
+            continue
+        write_batch_metrics(result, pdf_engine.name, future.seconds, stage_totals)
+        if cache is not None:
+            cache.store_file(result["cache_key"], suffix, pdf_path)
+
+    elapsed = time.perf_counter() - started
+    rendered = len(render_times)
+    rate = rendered / elapsed if elapsed > 0 else 0.0
+
+    cache_note = ""
+    if cache is not None:
+        cache.evict()
+        cache_note = f", cache {cache_hits} hit/{rendered - cache_hits} miss"
+
+    print(f"✅ Rendered {rendered} reports to {out_dir} ({failures} failed, {over_cap} over page cap)")
+    print(f"📊 Batch: {rate:.1f} reports/sec over {elapsed:.2f}s with {max(workers, 1)} worker(s), "
+          f"{total_chars} chars total{cache_note}")
+    print(f"⏱️  Render time: p50 {percentile(render_times, 50) * 1000:.2f}ms, "
+          f"p95 {percentile(render_times, 95) * 1000:.2f}ms")
+    if stage_totals:
+        print("🔥 Hottest stages: " + ", ".join(
+            f"{name} {record['wall_ms']:.1f}ms" for name, record in hottest(stage_totals, 5)))
+    if pdf_engine is not None:
+        print(f"✅ PDFs via {pdf_engine.name}: {len(pdf_futures) - pdf_failures} converted, "
+              f"{pdf_cached} cached, {pdf_failures} failed")
+    else:
+        print(f"ℹ️  {skip_reason(pdf_engine_name)}")
+
+    return 1 if failures or pdf_failures or (strict_page_cap and over_cap) else 0
+
+def parse_args(argv=None) -> "argparse.Namespace":
+    """Parse CLI arguments for single-file and batch rendering."""
+    import argparse  # deferred: library callers (render_markdown, batch jobs) never parse argv
+    parser = argparse.ArgumentParser(
+        description="Render DiagnosticPro report JSON to Markdown (and PDF via pandoc when available).",
+        epilog="Single mode output will be: <output_base_name>.md (and .pdf if pandoc available)",
+    )
+    parser.add_argument("inputs", nargs="+", metavar="input",
+                        help="report JSON file; with --batch also directories, globs, .jsonl files or '-' for JSONL on stdin")
+    parser.add_argument("--batch", action="store_true",
+                        help="render many reports in one process pool instead of a single file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="batch worker processes (default: CPU count; 1 renders in-process)")
+    parser.add_argument("--out-dir", default="docs/out",
+                        help="output directory (default: docs/out)")
+    parser.add_argument("--page-cap", type=int, default=PAGE_CAP,
+                        help=f"hard page cap checked with the layout page model (default: {PAGE_CAP})")
+    parser.add_argument("--strict-page-cap", action="store_true",
+                        help="skip PDF generation and exit non-zero for reports over the page cap")
+    parser.add_argument("--validate", action="store_true",
+                        help="validate each report against the report schema before rendering")
+    parser.add_argument("--renderer", choices=RENDERER_CHOICES, default="compiled",
+                        help="compiled: precompiled 14-point template (default); markdown: render_markdown(); "
+                             "budgeted: trim sections by priority to fit --page-cap/--max-chars")
+    parser.add_argument("--max-chars", type=int, default=None,
+                        help="character budget for --renderer budgeted (default: none)")
+    parser.add_argument("--pdf-engine", choices=ENGINE_CHOICES, default="auto",
+                        help="auto: pandoc/xelatex when installed; text: pure-Python PDF writer; none: Markdown only")
+    parser.add_argument("--pdf-workers", type=int, default=2,
+                        help="concurrent PDF conversions in batch mode (default: 2)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="render cache directory (default: <out-dir>/.cache)")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="evict least-recently-used cache entries beyond this size")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="neither read nor write the render cache")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="ignore cached artifacts and overwrite them with fresh renders")
+    parser.add_argument("--stream", action="store_true",
+                        help="write Markdown section by section instead of building the whole document in memory")
+    parser.add_argument("--formats", default="", metavar="html,txt",
+                        help="also write these formats next to the Markdown, from one cached report IR")
+    parser.add_argument("--profile", action="store_true",
+                        help="write <name>.metrics.json with per-stage wall/CPU times (including PDF conversion) "
+                             "next to each report; only --renderer markdown also times each report section")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="with --profile, also record peak memory per stage (tracemalloc; slower)")
+    parser.add_argument("--cprofile", default=None, metavar="PATH",
+                        help="dump a cProfile of the run to PATH (view with snakeviz or stage_profiler.py)")
+    args = parser.parse_args(argv)
+
+    if not args.batch and len(args.inputs) > 2:
+        parser.error("single mode takes <input.json> [output_base_name]; use --batch for multiple inputs")
+    formats = tuple(fmt for fmt in args.formats.split(",") if fmt)
+    unknown = set(formats) - set(FORMAT_SUFFIXES)
+    if unknown:
+        parser.error(f"--formats: unknown format(s) {', '.join(sorted(unknown))} (choose from html, txt)")
+    args.render_options = {
+        "cache_dir": args.cache_dir or str(Path(args.out_dir) / ".cache"),
+        "cache_max_bytes": int(args.cache_max_mb * 1024 * 1024),
+        "no_cache": args.no_cache,
+        "rebuild": args.rebuild,
+        "pdf_engine": args.pdf_engine,
+        "renderer": args.renderer,
+        "page_cap": args.page_cap,
+        "max_chars": args.max_chars,
+        "validate": args.validate,
+        "stream": args.stream,
+        "formats": formats,
+        "profile": args.profile or args.profile_memory,
+        "profile_memory": args.profile_memory,
+    }
+    return args
+
+def render_single(args: "argparse.Namespace"):
+    """Render one report JSON to Markdown and, when an engine is available, PDF."""
+    input_path = Path(args.inputs[0])
     if not input_path.exists():
         print(f"Error: Input file not found: {input_path}", file=sys.stderr)
         sys.exit(1)
 
+    profiler = StageProfiler(args.profile_memory) if args.render_options["profile"] else None
+    stage = profiler.stage if profiler is not None else _no_stage
+
     # Determine output base name
-    if len(sys.argv) > 2:
-        output_base = sys.argv[2]
+    if len(args.inputs) > 1:
+        output_base = args.inputs[1]
     else:
         output_base = input_path.stem
 
     # Read JSON
-    with open(input_path, 'r') as f:
-        data = json.load(f)
-
-    # Render Markdown
-    markdown = render_markdown(data)
-
-    # Write Markdown
-    output_md = Path("docs/out") / f"{output_base}.md"
+    with stage("json_load"):
+        with open(input_path, 'r') as f:
+            data = json.load(f)
+
+    if args.validate:
+        with stage("validate"):
+            errors = validate_report(data)
+        if errors:
+            print(f"Error: {input_path} failed schema validation:", file=sys.stderr)
+            for error in errors:
+                print(f"  {error}", file=sys.stderr)
+            sys.exit(1)
+
+    cache = open_cache(args.render_options)
+    output_md = Path(args.out_dir) / f"{output_base}.md"
     output_md.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_md, 'w') as f:
-        f.write(markdown)
-
-    print(f"✅ Rendered Markdown: {output_md}")
-
-    # Calculate stats
-    char_count = len(markdown)
-    estimated_pages = char_count / 3000
-
-    print(f"📊 Stats: {char_count} chars, ~{estimated_pages:.1f} pages")
-
-    if estimated_pages > 6:
-        print("⚠️  WARNING: Estimated pages exceed 6-page hard cap!")
+    if args.stream:
+        # Render straight into the file, one section at a time
+        try:
+            with stage("render"):
+                char_count, estimated_pages, cache_key, cache_hit = stream_cached(
+                    data, output_md, cache, args.render_options)
+        except ValueError as e:  # BudgetExceededError from --renderer budgeted
+            print(f"Error: {input_path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ Rendered Markdown: {output_md}")
+    else:
+        # Render Markdown (served from the content-addressed cache when unchanged)
+        renderer = profiled_renderer(get_renderer(args.renderer, args.page_cap, args.max_chars), profiler)
+        try:
+            with stage("render"):
+                markdown, cache_key, cache_hit = render_cached(data, cache, renderer)
+        except ValueError as e:  # BudgetExceededError from --renderer budgeted
+            print(f"Error: {input_path}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        # Write Markdown
+        with stage("write_markdown"):
+            with open(output_md, 'w') as f:
+                f.write(markdown)
+
+        print(f"✅ Rendered Markdown: {output_md}")
+
+        # Calculate stats
+        char_count = len(markdown)
+        with stage("page_estimate"):
+            estimated_pages = estimate_pages(markdown)
+
+    if args.render_options["formats"]:
+        with stage("formats"):
+            for path in write_formats(data, output_md, cache, args.render_options):
+                print(f"✅ Rendered {path.suffix[1:].upper()}: {path}")
+
+    cache_note = f", {cache.stats()}" if cache is not None else ""
+    print(f"📊 Stats: {char_count} chars, ~{estimated_pages:.1f} pages{cache_note}")
+
+    if estimated_pages > args.page_cap:
+        print(f"⚠️  WARNING: Estimated pages exceed {args.page_cap}-page hard cap!")
+        if args.strict_page_cap:
+            print("❌ Skipping PDF generation (--strict-page-cap)", file=sys.stderr)
+            sys.exit(1)
+
+    output_pdf = Path(args.out_dir) / f"{output_base}.pdf"
+    suffix = pdf_suffix(args.pdf_engine)
+    cached_pdf = cache.lookup(cache_key, suffix) if cache is not None and suffix is not None else None
+    pdf_note = "none"
+    if cached_pdf is not None:
+        shutil.copyfile(cached_pdf, output_pdf)
+        pdf_note = "cached"
+        print(f"✅ Rendered PDF (cached): {output_pdf}")
+    else:
+        # Optionally render PDF (pandoc when available, or the pure-Python engine)
+        engine = select_engine(args.pdf_engine)
+        if engine is None:
+            print(f"ℹ️  {skip_reason(args.pdf_engine)}")
+        else:
+            try:
+                with stage("pdf"):
+                    convert_pdf(engine, output_md, output_pdf)
+                pdf_note = engine.name
+                print(f"✅ Rendered PDF: {output_pdf}")
+                if cache is not None:
+                    cache.store_file(cache_key, suffix, output_pdf)
+            except PdfEngineError as e:
+                pdf_note = "failed"
+                print(f"❌ PDF generation failed ({engine.name}): {e}", file=sys.stderr)
+
+    if cache is not None:
+        cache.evict()
+
+    if profiler is not None:
+        profiler.close()
+        output_metrics = output_md.with_suffix(".metrics.json")
+        write_metrics(output_metrics, report_metrics(data, char_count, estimated_pages, profiler,
+                                                     renderer=args.renderer, cacheHit=cache_hit, pdf=pdf_note))
+        print(f"⏱️  Stage metrics: {output_metrics}")
 
-    # Optionally render PDF via pandoc
-    try:
-        import subprocess
-        output_pdf = Path("docs/out") / f"{output_base}.pdf"
-        subprocess.run([
-            "pandoc",
-            str(output_md),
-            "-o", str(output_pdf),
-            "--pdf-engine=xelatex",
-            "-V", "geometry:margin=0.75in"
-        ], check=True, capture_output=True)
-        print(f"✅ Rendered PDF: {output_pdf}")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("ℹ️  Pandoc not available; skipping PDF generation")
+def main():
+    """Read JSON input, render to Markdown, optionally convert to PDF."""
+    args = parse_args()
+
+    with cprofile(args.cprofile):
+        if args.batch:
+            sys.exit(run_batch(args.inputs, args.out_dir, args.workers, args.render_options,
+                               pdf_engine=select_engine(args.pdf_engine), pdf_workers=args.pdf_workers,
+                               page_cap=args.page_cap, strict_page_cap=args.strict_page_cap,
+                               pdf_engine_name=args.pdf_engine))
+        render_single(args)
 
 if __name__ == "__main__":
     main()
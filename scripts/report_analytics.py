@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Report Analytics
+Fleet-level quality metrics over large corpora of generated report JSON.
+
+Reports as generate_mock_response() writes them (files, directories, .jsonl
+or '-') are parsed in chunks of CHUNK_ROWS into compact NumPy columns:
+float32 scores, costs and hours, uint32 byte counts and list lengths, uint8
+verdict flags. Each chunk is reduced with vectorized operations into a
+mergeable Summary of counts, sums and fixed-bin histograms and then dropped,
+so memory stays at one chunk plus the histograms however many reports are
+read. JSONL files are split into byte ranges and directories into file
+batches for a process pool. Percentiles come from the merged histograms:
+exact for percentages and list lengths, within 0.5% for costs, hours and
+byte counts (logarithmic bins).
+
+Metrics:
+  confidence score, threshold and margin, plus confidence_guard failures
+  (score below threshold with no uplift requirements)
+  readiness verdict rate
+  estimated_cost_range_usd low/high/spread and inverted ranges
+  estimated_time_hours
+  list lengths against the schema caps
+  report bytes against the 12000-byte length guard
+  --by day|week|month adds one row per meta.generated_at_iso period
+
+Requires NumPy (pip install numpy); the other scripts stay stdlib-only.
+
+Usage:
+  report_analytics.py [input ...] [--by day|week|month] [--workers N] [--json]
+                      inputs default to tests/golden; '-' reads JSONL on stdin
+  synth_corpus.py --count 1000000 --reports > corpus.jsonl && report_analytics.py corpus.jsonl --by day
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from report_schema import REPORT_SCHEMA
+
+ROOT = Path(__file__).resolve().parents[1]
+
+np = None
+
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            print("❌ report_analytics.py needs NumPy: pip install numpy", file=sys.stderr)
+            sys.exit(2)
+        np = numpy
+    return np
+
+CHUNK_ROWS = 65536
+RANGE_BYTES = 32 * 1024 * 1024   # JSONL byte range per worker task
+FILES_PER_TASK = 512
+MAX_BYTES = 12000                # tests/length_guard.sh
+PERCENTILES = (5, 50, 95, 99)
+PERIODS = ("day", "week", "month")
+
+# Capped list fields and their maxItems, straight from the schema
+LIST_CAPS = {name: spec["maxItems"] for name, spec in REPORT_SCHEMA["properties"].items()
+             if spec.get("type") == "array" and "maxItems" in spec}
+UPLIFT = "confidence_uplift_requirements"
+
+# Column name -> array typecode (the NumPy dtype is read from the buffer)
+COLUMNS = {
+    "score_pct": "f", "threshold_pct": "f",
+    "cost_low": "f", "cost_high": "f", "time_hours": "f",
+    "bytes": "I", "ready": "B", "period": "i",
+    **{name: "I" for name in LIST_CAPS},
+}
+
+# Histogram layouts: ("linear", low, high, step) or ("log", smallest, largest, ratio)
+PERCENT = ("linear", 0.0, 100.0, 0.1)
+METRICS = {
+    "score_pct": PERCENT,
+    "threshold_pct": PERCENT,
+    "margin_pct": ("linear", -100.0, 100.0, 0.1),
+    "cost_low": ("log", 0.01, 1e9, 1.01),
+    "cost_high": ("log", 0.01, 1e9, 1.01),
+    "cost_spread": ("log", 0.01, 1e9, 1.01),
+    "time_hours": ("log", 0.01, 1e6, 1.01),
+    "bytes": ("log", 1.0, 1e9, 1.01),
+}
+
+class Histogram:
+    """Fixed-bin, mergeable histogram with exact count, sum, min and max."""
+
+    def __init__(self, layout: tuple):
+        np = _numpy()
+        self.layout = layout
+        kind, low, high, step = layout
+        if kind == "linear":
+            self.size = int(round((high - low) / step)) + 1
+        else:
+            # bin 0 holds values <= 0; the rest are geometric from low
+            self.size = int(math.ceil(math.log(high / low) / math.log(step))) + 2
+        self.counts = np.zeros(self.size, dtype=np.int64)
+        self.n = 0
+        self.total = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+
+    def _bins(self, values):
+        kind, low, high, step = self.layout
+        if kind == "linear":
+            index = np.rint((values - low) / step)
+            return np.clip(index, 0, self.size - 1).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            index = np.floor(np.log(np.maximum(values, low) / low) / math.log(step)) + 1
+        return np.where(values > 0, np.clip(index, 1, self.size - 1), 0).astype(np.int64)
+
+    def _value(self, index: int) -> float:
+        kind, low, high, step = self.layout
+        if kind == "linear":
+            return low + index * step
+        return 0.0 if index == 0 else low * step ** (index - 0.5)
+
+    def add(self, values) -> None:
+        values = values[np.isfinite(values)].astype(np.float64)
+        if not len(values):
+            return
+        self.counts += np.bincount(self._bins(values), minlength=self.size)
+        self.n += len(values)
+        self.total += float(values.sum())
+        self.low = min(self.low, float(values.min()))
+        self.high = max(self.high, float(values.max()))
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts += other.counts
+        self.n += other.n
+        self.total += other.total
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile, read from the bins and clamped to the exact range."""
+        rank = max(1, math.ceil(q / 100 * self.n))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(max(self._value(index), self.low), self.high)
+
+    def describe(self) -> dict:
+        if not self.n:
+            return {"n": 0}
+        summary = {"n": self.n, "mean": self.total / self.n, "min": self.low, "max": self.high}
+        summary.update({f"p{q}": self.percentile(q) for q in PERCENTILES})
+        return summary
+
+class Summary:
+    """Mergeable aggregates over any number of report chunks."""
+
+    def __init__(self):
+        np = _numpy()
+        self.reports = 0
+        self.unreadable = 0
+        self.ready = 0
+        self.below_threshold = 0
+        self.guard_failures = 0
+        self.over_length = 0
+        self.inverted_costs = 0
+        self.metrics = {name: Histogram(layout) for name, layout in METRICS.items()}
+        # Lengths 0..cap, then one bin for everything over the cap; the exact
+        # total and longest list keep the mean and max true past the cap
+        self.lists = {name: np.zeros(cap + 2, dtype=np.int64) for name, cap in LIST_CAPS.items()}
+        self.list_totals = dict.fromkeys(LIST_CAPS, 0)
+        self.list_max = dict.fromkeys(LIST_CAPS, 0)
+        # Period start (date ordinal) -> [reports, ready, below threshold, score sum, scored]
+        self.periods = {}
+
+    def add_chunk(self, columns: dict) -> None:
+        score, threshold = columns["score_pct"], columns["threshold_pct"]
+        ready = columns["ready"].astype(bool)
+        # confidence_guard compares printf "%.0f" values: round half to even, as np.rint does
+        below = np.rint(score) < np.rint(threshold)
+        self.reports += len(score)
+        self.ready += int(ready.sum())
+        self.below_threshold += int(below.sum())
+        self.guard_failures += int((below & (columns[UPLIFT] == 0)).sum())
+        self.over_length += int((columns["bytes"] > MAX_BYTES).sum())
+        self.inverted_costs += int((columns["cost_high"] < columns["cost_low"]).sum())
+
+        derived = {"margin_pct": score - threshold, "cost_spread": columns["cost_high"] - columns["cost_low"]}
+        for name, histogram in self.metrics.items():
+            histogram.add(derived[name] if name in derived else columns[name])
+        for name, cap in LIST_CAPS.items():
+            self.lists[name] += np.bincount(np.minimum(columns[name], cap + 1), minlength=cap + 2)
+            self.list_totals[name] += int(columns[name].sum(dtype=np.int64))
+            self.list_max[name] = max(self.list_max[name], int(columns[name].max()))
+
+        dated = columns["period"] >= 0
+        if dated.any():
+            periods, inverse = np.unique(columns["period"][dated], return_inverse=True)
+            scored = ~np.isnan(score[dated])
+            rows = np.stack([
+                np.bincount(inverse, minlength=len(periods)),
+                np.bincount(inverse, weights=ready[dated], minlength=len(periods)),
+                np.bincount(inverse, weights=below[dated], minlength=len(periods)),
+                np.bincount(inverse, weights=np.where(scored, score[dated], 0.0), minlength=len(periods)),
+                np.bincount(inverse, weights=scored, minlength=len(periods)),
+            ], axis=1)
+            for period, row in zip(periods.tolist(), rows):
+                if period in self.periods:
+                    self.periods[period] += row
+                else:
+                    self.periods[period] = row
+
+    def merge(self, other: "Summary") -> None:
+        for name in ("reports", "unreadable", "ready", "below_threshold", "guard_failures",
+                     "over_length", "inverted_costs"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name, histogram in self.metrics.items():
+            histogram.merge(other.metrics[name])
+        for name in self.lists:
+            self.lists[name] += other.lists[name]
+            self.list_totals[name] += other.list_totals[name]
+            self.list_max[name] = max(self.list_max[name], other.list_max[name])
+        for period, row in other.periods.items():
+            if period in self.periods:
+                self.periods[period] += row
+            else:
+                self.periods[period] = row
+
+    def to_dict(self) -> dict:
+        reports = self.reports or 1
+        lists = {}
+        for name, cap in LIST_CAPS.items():
+            counts = self.lists[name]
+            cumulative = np.cumsum(counts)
+            lists[name] = {
+                "cap": cap,
+                "mean": self.list_totals[name] / reports,
+                # cap + 1 stands for any length over the cap
+                "p95": int(np.searchsorted(cumulative, max(1, math.ceil(0.95 * self.reports)))),
+                "max": self.list_max[name],
+                "at_cap": int(counts[cap]),
+                "over_cap": int(counts[cap + 1]),
+            }
+        return {
+            "reports": self.reports,
+            "unreadable": self.unreadable,
+            "ready_rate": self.ready / reports,
+            "below_threshold": self.below_threshold,
+            "confidence_guard_failures": self.guard_failures,
+            "over_length": self.over_length,
+            "inverted_cost_ranges": self.inverted_costs,
+            "metrics": {name: histogram.describe() for name, histogram in self.metrics.items()},
+            "lists": lists,
+            "periods": [
+                {"start": date.fromordinal(period).isoformat(), "reports": int(row[0]),
+                 "ready_rate": row[1] / row[0], "below_threshold_rate": row[2] / row[0],
+                 "mean_score_pct": row[3] / row[4] if row[4] else None}
+                for period, row in sorted(self.periods.items())
+            ],
+        }
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+def _mapping(value) -> dict:
+    return value if isinstance(value, dict) else {}
+
+class ChunkBuilder:
+    """Append reports row by row into typed buffers; flush every CHUNK_ROWS into the summary."""
+
+    def __init__(self, summary: Summary, by: str = None):
+        self.summary = summary
+        self.by = by
+        self._period_starts = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+        self.rows = 0
+
+    def _period(self, report: dict) -> int:
+        stamp = _mapping(report.get("meta")).get("generated_at_iso")
+        if self.by is None or not isinstance(stamp, str):
+            return -1
+        key = stamp[:10]
+        start = self._period_starts.get(key)
+        if start is None:
+            try:
+                day = date.fromisoformat(key)
+            except ValueError:
+                start = -1
+            else:
+                if self.by == "week":
+                    start = day.toordinal() - day.weekday()
+                elif self.by == "month":
+                    start = day.replace(day=1).toordinal()
+                else:
+                    start = day.toordinal()
+            self._period_starts[key] = start
+        return start
+
+    def add(self, report, size: int) -> None:
+        if not isinstance(report, dict):
+            self.summary.unreadable += 1
+            return
+        confidence = _mapping(report.get("confidence"))
+        cost = _mapping(report.get("estimated_cost_range_usd"))
+        columns = self.columns
+        columns["score_pct"].append(_number(confidence.get("score_pct")))
+        columns["threshold_pct"].append(_number(confidence.get("threshold_pct")))
+        columns["cost_low"].append(_number(cost.get("low")))
+        columns["cost_high"].append(_number(cost.get("high")))
+        columns["time_hours"].append(_number(report.get("estimated_time_hours")))
+        columns["bytes"].append(min(size, 0xFFFFFFFF))
+        verdict = _mapping(report.get("customer_readiness_check")).get("verdict")
+        columns["ready"].append(verdict == "ready_for_customer")
+        columns["period"].append(self._period(report))
+        for name in LIST_CAPS:
+            items = report.get(name)
+            columns[name].append(len(items) if isinstance(items, list) else 0)
+        self.rows += 1
+        if self.rows >= CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.rows:
+            # The typed buffers become NumPy columns without a copy
+            self.summary.add_chunk({name: np.frombuffer(column, dtype=column.typecode)
+                                    for name, column in self.columns.items()})
+        self._reset()
+
+def _load(builder: ChunkBuilder, raw: bytes) -> None:
+    try:
+        report = json.loads(raw)
+    except ValueError:
+        builder.summary.unreadable += 1
+        return
+    builder.add(report, len(raw.rstrip(b"\r\n")))
+
+def summarize_task(task: tuple, by: str = None) -> Summary:
+    """Summarize ("jsonl", path, start, end) lines starting in [start, end) or ("files", [paths])."""
+    summary = Summary()
+    builder = ChunkBuilder(summary, by)
+    if task[0] == "jsonl":
+        _, path, start, end = task
+        with open(path, "rb") as f:
+            position = start
+            if start:
+                # A line belongs to the range it starts in
+                f.seek(start - 1)
+                position += len(f.readline()) - 1
+            while position < end:
+                line = f.readline()
+                if not line:
+                    break
+                position += len(line)
+                if line.strip():
+                    _load(builder, line)
+    else:
+        for path in task[1]:
+            try:
+                raw = Path(path).read_bytes()
+            except OSError:
+                summary.unreadable += 1
+                continue
+            _load(builder, raw)
+    builder.flush()
+    return summary
+
+def plan_tasks(inputs: list) -> list:
+    """Split inputs into worker tasks: JSONL byte ranges and batches of JSON files."""
+    tasks = []
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths = sorted(path.glob("*.json")) + sorted(path.glob("*.jsonl"))
+        elif path.exists():
+            paths = [path]
+        else:
+            paths = sorted(Path(p) for p in glob.glob(item, recursive=True))
+        for p in paths:
+            if p.suffix != ".jsonl":
+                files.append(str(p))
+                continue
+            size = p.stat().st_size
+            for start in range(0, size, RANGE_BYTES):
+                tasks.append(("jsonl", str(p), start, min(size, start + RANGE_BYTES)))
+    for start in range(0, len(files), FILES_PER_TASK):
+        tasks.append(("files", files[start:start + FILES_PER_TASK]))
+    return tasks
+
+def summarize(inputs: list, by: str = None, workers: int = 1) -> Summary:
+    """Summarize every report from inputs ('-' reads JSONL on stdin) into one Summary."""
+    _numpy()
+    summary = Summary()
+    if "-" in inputs:
+        builder = ChunkBuilder(summary, by)
+        for line in sys.stdin.buffer:
+            if line.strip():
+                _load(builder, line)
+        builder.flush()
+    tasks = plan_tasks([item for item in inputs if item != "-"])
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(summarize_task, tasks, [by] * len(tasks)):
+                summary.merge(partial)
+    else:
+        for task in tasks:
+            summary.merge(summarize_task(task, by))
+    return summary
+
+def _format(value, unit: str = "") -> str:
+    if value is None:
+        return "-"
+    if unit == "$":
+        return f"${value:,.0f}"
+    if unit == "B":
+        return f"{value:,.0f}"
+    return f"{value:,.1f}{unit}" if abs(value) < 1000 else f"{value:,.0f}{unit}"
+
+def print_summary(result: dict, elapsed: float) -> None:
+    reports = result["reports"]
+    rate = reports / elapsed if elapsed > 0 else 0.0
+    print(f"📊 {reports:,} reports ({result['unreadable']} unreadable) in {elapsed:.2f}s ({rate:,.0f} reports/sec)")
+    if not reports:
+        return
+    print(f"✅ Ready for customer: {result['ready_rate']:.1%} "
+          f"(needs_revision {1 - result['ready_rate']:.1%})")
+    print(f"ℹ️  Below confidence threshold: {result['below_threshold']:,} "
+          f"({result['below_threshold'] / reports:.1%}), "
+          f"{result['confidence_guard_failures']:,} of them without uplift requirements")
+    if result["over_length"] or result["inverted_cost_ranges"]:
+        print(f"⚠️  {result['over_length']:,} reports over {MAX_BYTES} bytes, "
+              f"{result['inverted_cost_ranges']:,} cost ranges with high < low")
+
+    units = {"score_pct": "%", "threshold_pct": "%", "margin_pct": "%", "cost_low": "$", "cost_high": "$",
+             "cost_spread": "$", "time_hours": "h", "bytes": "B"}
+    header = ["metric", "mean"] + [f"p{q}" for q in PERCENTILES] + ["min", "max"]
+    print(f"\n{header[0]:<16}" + "".join(f"{name:>11}" for name in header[1:]))
+    for name, stats in result["metrics"].items():
+        if not stats["n"]:
+            continue
+        cells = [stats["mean"]] + [stats[f"p{q}"] for q in PERCENTILES] + [stats["min"], stats["max"]]
+        print(f"{name:<16}" + "".join(f"{_format(cell, units[name]):>11}" for cell in cells))
+
+    print(f"\n{'list':<32}{'cap':>5}{'mean':>8}{'p95':>6}{'max':>6}{'at cap':>10}{'over cap':>10}")
+    for name, stats in result["lists"].items():
+        p95 = f">{stats['cap']}" if stats["p95"] > stats["cap"] else stats["p95"]
+        print(f"{name:<32}{stats['cap']:>5}{stats['mean']:>8.2f}{p95:>6}{stats['max']:>6}"
+              f"{stats['at_cap'] / reports:>10.1%}{stats['over_cap']:>10,}")
+
+    if result["periods"]:
+        print(f"\n{'period':<12}{'reports':>10}{'ready':>9}{'below':>9}{'score':>8}")
+        for row in result["periods"]:
+            print(f"{row['start']:<12}{row['reports']:>10,}{row['ready_rate']:>9.1%}"
+                  f"{row['below_threshold_rate']:>9.1%}{_format(row['mean_score_pct'], '%'):>8}")
+
+def main():
+    """Summarize report corpora and print (or emit as JSON) the fleet-level metrics."""
+    parser = argparse.ArgumentParser(description="Vectorized quality analytics over generated report JSON.")
+    parser.add_argument("inputs", nargs="*", default=[str(ROOT / "tests" / "golden")],
+                        help="report JSON files, directories, .jsonl files or globs; - for JSONL on stdin "
+                             "(default: tests/golden)")
+    parser.add_argument("--by", choices=PERIODS, help="add per-period rows keyed on meta.generated_at_iso")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = summarize(args.inputs, args.by, args.workers).to_dict()
+    elapsed = time.perf_counter() - started
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_summary(result, elapsed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Budgeted Report Renderer
+Fits a report to a page (and optional character) budget in a single pass.
+
+render_markdown() applies fixed per-section caps and the page cap is only
+checked afterwards. Here the report is first rendered at its floor (every
+section at its minimum item count, long free text cut to a short excerpt),
+which fixes the cost of the static 14-point skeleton. Each further list item
+and each extra stretch of free text is then costed on its own with the page
+model and granted in priority order while it still fits. Page-model heights
+add up block by block, so the plan is exact without re-rendering the whole
+document; the final Markdown is rendered once from the plan. Omission notes
+are computed against the full lists and stay accurate.
+
+The Diagnostic Codes line is budgeted like a text field: it keeps at least
+its floor of codes and ends in a "+N more codes omitted" note when cut.
+Text inside list items (hypothesis names and evidence, action steps and
+reasons, plain list entries, single codes) and the confidence assessment is
+cut to ITEM_TEXT_LIMITS before planning, so one runaway entry cannot outweigh the
+rest of the report. A report whose floor still does not fit cannot be
+budgeted: render_budgeted() raises BudgetExceededError rather than return
+over-budget Markdown.
+
+Usage:
+  report_budget.py <report.json> [--pages N] [--chars N]   print the plan and fit
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from page_model import PAGE_CAP, PageModel, default_model
+from report_template import LIST_LIMITS, action_entries, hypothesis_entries, render_compiled
+
+# Sections in the order budget is granted. Lists never exceed LIST_LIMITS and
+# keep at least their floor; text fields keep at least floor characters and
+# codes at least floor codes.
+PRIORITIES = (
+    ("most_likely_cause", "text", 400),
+    ("codes", "codes", 12),
+    ("root_cause_hypotheses", "list", 1),
+    ("recommended_actions", "list", 1),
+    ("symptoms", "text", 300),
+    ("safety_notes", "list", 1),
+    ("disclaimers", "list", 3),
+    ("confidence_uplift_requirements", "list", 1),
+    ("warranty_or_tsb_refs", "list", 1),
+    ("tools_parts", "list", 0),
+)
+
+# Longest text kept inside one list item or the assessment (characters)
+ITEM_TEXT_LIMITS = {"name": 160, "text": 300, "assessment": 400}
+
+# Paragraphs each free-text field is rendered into: (prefix, suffix)
+TEXT_APPEARANCES = {
+    "most_likely_cause": (("", "\n\n"),),
+    "symptoms": (("**Reported Symptoms:** ", "\n\n"), ("", "\n\n")),
+    "codes": (("**Diagnostic Codes:** ", "\n\n"),),
+}
+
+def truncate_text(text: str, limit: int) -> str:
+    """Cut text to about limit characters at a word boundary, noting what was dropped."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit + 1)
+    kept = text[:cut if cut > 0 else limit].rstrip()
+    return f"{kept} … *+{len(text) - len(kept)} more characters omitted for brevity*"
+
+def truncate_codes(codes: list, limit: int) -> list:
+    """Keep the first limit codes, plus a note standing in for the rest."""
+    if len(codes) <= limit:
+        return codes
+    return codes[:limit] + [f"*+{len(codes) - limit} more codes omitted for brevity*"]
+
+def clip_item_text(data: dict) -> dict:
+    """Return the fields of data whose item text is over ITEM_TEXT_LIMITS, cut to fit."""
+    clipped = {}
+
+    def clip(item, fields):
+        if not isinstance(item, dict):
+            return truncate_text(item, ITEM_TEXT_LIMITS["text"]) if isinstance(item, str) else item
+        cut = {key: truncate_text(item[key], ITEM_TEXT_LIMITS[kind])
+               for key, kind in fields if isinstance(item.get(key), str)}
+        return {**item, **cut}
+
+    for field in LIST_LIMITS:
+        items = data.get(field)
+        if not isinstance(items, list):
+            continue
+        fields = {"root_cause_hypotheses": (("hypothesis", "name"), ("evidence", "text")),
+                  "recommended_actions": (("step", "name"), ("why", "text"))}.get(field, ())
+        kept = [clip(item, fields) for item in items]
+        if kept != items:
+            clipped[field] = kept
+    codes = data.get("codes")
+    if isinstance(codes, list):
+        kept = [truncate_text(code, ITEM_TEXT_LIMITS["name"]) if isinstance(code, str) else code
+                for code in codes]
+        if kept != codes:
+            clipped["codes"] = kept
+    confidence = data.get("confidence")
+    if isinstance(confidence, dict) and isinstance(confidence.get("assessment"), str):
+        assessment = truncate_text(confidence["assessment"], ITEM_TEXT_LIMITS["assessment"])
+        if assessment != confidence["assessment"]:
+            clipped["confidence"] = {**confidence, "assessment": assessment}
+    return clipped
+
+class BudgetExceededError(ValueError):
+    """The report is over budget even at its floor layout."""
+
+def list_entries(field: str, idx: int, item) -> tuple:
+    """Return every rendered appearance of one list item."""
+    if field == "root_cause_hypotheses":
+        return hypothesis_entries(idx, item)
+    if field == "recommended_actions":
+        return action_entries(idx, item)
+    if field == "warranty_or_tsb_refs":
+        return (f"- {item}\n",) * 2  # §10 and §14 Source Verification
+    return (f"- {item}\n",)
+
+class BudgetPlanner:
+    """Plan per-section limits so a report fits max_pages and max_chars."""
+
+    def __init__(self, max_pages: float = PAGE_CAP, max_chars: int = None, model: PageModel = None):
+        self.model = model or default_model()
+        self.max_height = max_pages * self.model.text_height
+        self.max_chars = max_chars
+
+    def _text_cost(self, field: str, text: str) -> tuple[float, int]:
+        height = chars = 0
+        if isinstance(text, list):
+            text = ", ".join(text)
+        for prefix, suffix in TEXT_APPEARANCES[field]:
+            block = f"{prefix}{text}{suffix}"
+            height += self.model.estimate_height(block)
+            chars += len(block)
+        return height, chars
+
+    def _fits(self, height: float, chars: int) -> bool:
+        return height <= self.max_height and (self.max_chars is None or chars <= self.max_chars)
+
+    def _shown_lists(self, data: dict) -> dict:
+        """Return the list fields that render items, mapped to their (capped) items."""
+        confidence = data.get("confidence", {})
+        shown = {}
+        for field, limit in LIST_LIMITS.items():
+            items = data.get(field) or []
+            if field == "confidence_uplift_requirements" and \
+                    confidence.get("score_pct", 0) >= confidence.get("threshold_pct", 85):
+                continue
+            shown[field] = items[:limit]
+        return shown
+
+    def plan(self, data: dict) -> dict:
+        """Return the budget plan for data.
+
+        The plan holds the trimmed report ("data"), per-list item limits
+        ("limits"), predicted height/chars/pages and whether it fits. When the
+        floor alone is over budget the floor is returned with fits False.
+        """
+        data = {**data, **clip_item_text(data)}
+        shown = self._shown_lists(data)
+        limits = dict(LIST_LIMITS)
+        texts = {}
+        for field, kind, floor in PRIORITIES:
+            if kind == "list" and field in shown:
+                limits[field] = min(floor, len(shown[field]))
+            elif kind == "text" and isinstance(data.get(field), str):
+                texts[field] = truncate_text(data[field], floor)
+            elif kind == "codes" and isinstance(data.get(field), list) and data[field]:
+                texts[field] = truncate_codes(data[field], floor)
+
+        floor_data = {**data, **texts}
+        floor_markdown = render_compiled(floor_data, limits)
+        height = self.model.estimate_height(floor_markdown)
+        chars = len(floor_markdown)
+        fits = self._fits(height, chars)
+
+        if fits:
+            for field, kind, floor in PRIORITIES:
+                if kind == "list" and field in shown:
+                    height, chars = self._grant_items(field, shown[field], limits, height, chars)
+                elif field in texts:
+                    cut = truncate_codes if kind == "codes" else truncate_text
+                    height, chars = self._grant_text(field, data[field], floor, texts, height, chars, cut)
+
+        return {
+            "data": {**data, **texts},
+            "limits": limits,
+            "height": height,
+            "chars": chars,
+            "pages": height / self.model.text_height,
+            "fits": fits,
+        }
+
+    def _grant_items(self, field: str, items: list, limits: dict, height: float, chars: int):
+        """Add items after the floor in order while each one still fits.
+
+        An added item shrinks or removes its section's omission note, so
+        keeping the floor's note cost in the total only overestimates.
+        """
+        for idx in range(limits[field], len(items)):
+            entries = list_entries(field, idx + 1, items[idx])
+            item_height = sum(self.model.estimate_height(entry) for entry in entries)
+            item_chars = sum(len(entry) for entry in entries)
+            if not self._fits(height + item_height, chars + item_chars):
+                break
+            height += item_height
+            chars += item_chars
+            limits[field] = idx + 1
+        return height, chars
+
+    def _grant_text(self, field: str, text, floor: int, texts: dict, height: float, chars: int,
+                    cut=truncate_text):
+        """Widen a truncated text field (or code list) to the longest excerpt that still fits."""
+        base_height, base_chars = self._text_cost(field, texts[field])
+
+        def extra(candidate):
+            cost_height, cost_chars = self._text_cost(field, candidate)
+            return height + cost_height - base_height, chars + cost_chars - base_chars
+
+        full = extra(text)
+        if self._fits(*full):
+            texts[field] = text
+            return full
+
+        # Binary search over cut points; only probes that were measured to fit are kept
+        best, best_cost = texts[field], (height, chars)
+        low, high = floor + 1, len(text) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            candidate = cut(text, middle)
+            cost = extra(candidate)
+            if self._fits(*cost):
+                best, best_cost = candidate, cost
+                low = middle + 1
+            else:
+                high = middle - 1
+        texts[field] = best
+        return best_cost
+
+_default_planner = None
+
+def plan_budget(data: dict, max_pages: float = PAGE_CAP, max_chars: int = None) -> dict:
+    """Plan data against the budget (the default planner is reused across calls)."""
+    global _default_planner
+    if max_pages == PAGE_CAP and max_chars is None:
+        if _default_planner is None:
+            _default_planner = BudgetPlanner()
+        return _default_planner.plan(data)
+    return BudgetPlanner(max_pages, max_chars).plan(data)
+
+def fitted_plan(data: dict, max_pages: float = PAGE_CAP, max_chars: int = None) -> dict:
+    """Plan data against the budget; raise BudgetExceededError when even the floor is over it."""
+    plan = plan_budget(data, max_pages, max_chars)
+    if not plan["fits"]:
+        budget = f"{max_pages:g} pages" + (f" / {max_chars} chars" if max_chars is not None else "")
+        raise BudgetExceededError(f"report needs ~{plan['pages']:.2f} pages / {plan['chars']} chars "
+                                  f"at its floor layout, over the {budget} budget")
+    return plan
+
+def render_budgeted(data: dict, max_pages: float = PAGE_CAP, max_chars: int = None) -> str:
+    """Render data to 14-point Markdown that fits max_pages (and max_chars).
+
+    Raises BudgetExceededError when the report cannot be trimmed to fit.
+    """
+    plan = fitted_plan(data, max_pages, max_chars)
+    return render_compiled(plan["data"], plan["limits"])
+
+def main():
+    """Print the budget plan for one report and check the rendered result."""
+    parser = argparse.ArgumentParser(description="Fit a report to a page/character budget.")
+    parser.add_argument("input", help="report JSON file")
+    parser.add_argument("--pages", type=float, default=PAGE_CAP, help=f"page budget (default: {PAGE_CAP})")
+    parser.add_argument("--chars", type=int, default=None, help="character budget (default: none)")
+    args = parser.parse_args()
+
+    with open(Path(args.input), 'r') as f:
+        data = json.load(f)
+
+    planner = BudgetPlanner(args.pages, args.chars)
+    plan = planner.plan(data)
+    markdown = render_compiled(plan["data"], plan["limits"])
+    measured = planner.model.estimate(markdown)
+
+    for field, kind, _ in PRIORITIES:
+        if kind == "list":
+            total = len(data.get(field) or [])
+            if total:
+                print(f"  {field}: {min(plan['limits'][field], total)}/{total} items")
+        elif kind == "codes":
+            total = len(data.get(field) or [])
+            if total:
+                print(f"  {field}: {min(len(plan['data'][field]), total)}/{total} codes")
+        elif isinstance(data.get(field), str):
+            print(f"  {field}: {len(plan['data'][field])}/{len(data[field])} chars")
+    print(f"📊 Planned ~{plan['pages']:.2f} pages / {plan['chars']} chars; "
+          f"rendered ~{measured:.2f} pages / {len(markdown)} chars")
+    if not plan["fits"]:
+        print("❌ Floor layout alone exceeds the budget", file=sys.stderr)
+        sys.exit(1)
+    print("✅ Fits budget")
+
+if __name__ == "__main__":
+    main()
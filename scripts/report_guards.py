@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Report Guards
+The report guard rules as plain functions over one parsed report.
+
+confidence_guard.sh, readiness_guard.sh, length_guard.sh and
+tests/page_estimator.py enforce these rules on files; tests/run_guards.py
+and pipeline_orchestrator.py apply them to reports they already hold, with
+the same pass/fail semantics and FAIL messages. Each check returns a list of
+FAIL lines, empty when the report passes.
+
+Usage:
+  report_guards.py <report.json> [...]     print FAIL lines; exit 1 if any
+"""
+
+import json
+import math
+import os
+import sys
+
+from page_model import estimate_pages as model_pages
+from report_markdown import render_markdown
+
+MAX_CHARS = 12000
+MAX_REASON = 220
+VERDICTS = ("ready_for_customer", "needs_revision")
+GUARDS = ("confidence_guard", "readiness_guard", "length_guard", "page_estimator")
+
+def estimate_pages(markdown: str) -> int:
+    """Whole pages the rendered report Markdown will occupy (layout page model)."""
+    return math.ceil(model_pages(markdown)) if markdown else 0
+
+def page_limit(name: str) -> int:
+    """Page limit for a fixture: 6 for the oversized mock_H report, else 4."""
+    if "mock_H" in name:
+        return 6
+    return 4
+
+def check_confidence(path, report: dict) -> list:
+    """A score below its threshold needs at least one uplift requirement."""
+    confidence = report.get("confidence") or {}
+    score = confidence.get("score_pct")
+    threshold = confidence.get("threshold_pct")
+    if not isinstance(score, (int, float)) or not isinstance(threshold, (int, float)):
+        return [f"FAIL confidence_guard: {path} missing numeric confidence score/threshold"]
+    uplift = report.get("confidence_uplift_requirements") or []
+    # printf "%.0f" in the shell guard rounds half to even, as round() does
+    if round(score) < round(threshold) and len(uplift) == 0:
+        return [f"FAIL confidence_guard: {path} has score {score} < {threshold} but no uplift requirements"]
+    return []
+
+def check_readiness(path, report: dict) -> list:
+    """The readiness verdict must be known and its reason at most MAX_REASON characters."""
+    failures = []
+    readiness = report.get("customer_readiness_check") or {}
+    verdict = readiness.get("verdict")
+    reason = readiness.get("short_reason")
+    # jq -r prints missing values as "null"
+    verdict = "null" if verdict is None else verdict
+    reason = "null" if reason is None else str(reason)
+    if verdict not in VERDICTS:
+        failures.append(f"FAIL readiness_guard: {path} has invalid verdict '{verdict}'")
+    if len(reason) > MAX_REASON:
+        failures.append(f"FAIL readiness_guard: {path} reason length {len(reason)} > {MAX_REASON}")
+    return failures
+
+def check_length(path, raw: bytes) -> list:
+    """The report JSON must fit in MAX_CHARS bytes."""
+    # wc -c counts bytes, not characters
+    if len(raw) > MAX_CHARS:
+        return [f"FAIL length_guard: {path} has {len(raw)} characters (limit {MAX_CHARS})"]
+    return []
+
+def check_pages(name: str, report: dict) -> list:
+    """The rendered report must fit the page limit for its file name."""
+    estimated_pages = estimate_pages(render_markdown(report))
+    limit = page_limit(name)
+    if estimated_pages > limit:
+        return [f"FAIL page_estimator: {name} => {estimated_pages} pages (limit {limit})"]
+    return []
+
+def main():
+    """Run every guard over the report files given."""
+    if len(sys.argv) < 2:
+        print("Usage: report_guards.py <report.json> [...]", file=sys.stderr)
+        sys.exit(1)
+    status = 0
+    for path in sys.argv[1:]:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        report = json.loads(raw)
+        failures = (check_confidence(path, report) + check_readiness(path, report)
+                    + check_length(path, raw) + check_pages(os.path.basename(path), report))
+        for failure in failures:
+            print(failure, file=sys.stderr)
+        status = status or bool(failures)
+    sys.exit(1 if status else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Report IR
+Format-neutral 14-point report, built once and emitted as Markdown, HTML or text.
+
+build_ir() applies the report rules once (report_template.report_facts():
+truncation, "+N more" notes, cost thresholds, hypothesis ranking) and keeps
+only what differs per report: the scalar slot values and, for list slots,
+small block lists. Everything static comes from templates/14point/report.md,
+which is parsed once per process into the same block shapes and compiled
+per output format into literal text with slot holes, so an emitter only
+formats the dynamic blocks. The IR is plain JSON and can be cached next to
+the rendered Markdown (".ir.json" in RenderCache).
+
+Blocks are lists so the IR round-trips through JSON unchanged:
+  ["h", level, runs]              heading
+  ["p", lines(, indent)]          paragraph; continuation lines indented in Markdown/text
+  ["ul"|"ol", items(, loose)]     list; each item is a list of lines
+  ["table", header, rows]         header/rows hold one runs list per cell
+  ["hr"]                          horizontal rule
+A line is a list of runs; a run is a plain string or ["b"|"i", text].
+
+Usage:
+  report_ir.py                                   check Markdown parity on tests/golden + tests/mocks
+  report_ir.py <report.json> [--format md|html|txt] [--ir]   print one format (or the IR JSON)
+"""
+
+import json
+import re
+import sys
+from html import escape
+from pathlib import Path
+
+from page_model import PAGE_CAP
+from render_cache import canonical_json
+from report_template import LIST_LIMITS, SLOTS, TEMPLATE_PATH, _template_text, report_facts
+
+IR_VERSION = "1"
+FORMATS = ("md", "html", "txt")
+
+BLOCK_SLOT = re.compile(r"^\{\{(\w+_block)\}\}(.*)$")
+HOLE = re.compile(r"\{\{(#?)(\w+)\}\}")
+INLINE = re.compile(r"\*\*(.+?)\*\*|\*(.+?)\*")
+LIST_ITEM = re.compile(r"^(- |\d+\. )")
+
+INLINE_SLOTS = tuple(sorted(name for name in SLOTS if not name.endswith("_block")))
+
+NO_WARRANTY = "No active TSBs or warranty coverage identified for this symptom pattern"
+DEFAULT_SOURCES = (
+    "OEM Service Manual (specific VIN lookup required)",
+    "NHTSA Complaints Database",
+    "Technical Service Bulletin Archives",
+)
+
+HTML_PAGE = (
+    '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+    "<title>DiagnosticPro Diagnostic Report</title>\n</head>\n<body>\n{body}</body>\n</html>\n"
+)
+
+_skeleton = None
+_compiled = {}
+
+# ---------------------------------------------------------------------------
+# Template skeleton
+
+def parse_runs(text: str) -> list:
+    """Split one line of template Markdown into runs."""
+    runs = []
+    last = 0
+    for match in INLINE.finditer(text):
+        if match.start() > last:
+            runs.append(text[last:match.start()])
+        runs.append(["b", match.group(1)] if match.group(1) is not None else ["i", match.group(2)])
+        last = match.end()
+    if last < len(text):
+        runs.append(text[last:])
+    return runs
+
+def parse_template(text: str) -> list:
+    """Parse the 14-point template into blocks, with ["slot", name] for each *_block slot.
+
+    Only the Markdown the template uses is understood: headings, paragraphs,
+    single-line list items, pipe tables and rules.
+    """
+    blocks = []
+    pending = []  # lines of the block being read
+    kind = None
+
+    def flush():
+        nonlocal pending, kind
+        if kind == "p":
+            blocks.append(["p", [parse_runs(line) for line in pending]])
+        elif kind in ("ul", "ol"):
+            blocks.append([kind, [[parse_runs(LIST_ITEM.sub("", line, 1))] for line in pending]])
+        elif kind == "table":
+            rows = [[parse_runs(cell.strip()) for cell in line.strip("|").split("|")] for line in pending]
+            blocks.append(["table", rows[0], rows[2:]])  # rows[1] is the |---| separator
+        pending, kind = [], None
+
+    lines = text.split("\n")
+    while lines:
+        line = lines.pop(0)
+        slot = BLOCK_SLOT.match(line)
+        if slot:
+            flush()
+            blocks.append(["slot", slot.group(1)])
+            if slot.group(2):
+                lines.insert(0, slot.group(2))
+            continue
+        if not line:
+            flush()
+            continue
+        if line == "---":
+            flush()
+            blocks.append(["hr"])
+            continue
+        if line.startswith("#"):
+            flush()
+            hashes, _, title = line.partition(" ")
+            blocks.append(["h", len(hashes), parse_runs(title)])
+            continue
+        line_kind = ("table" if line.startswith("|")
+                     else "ul" if line.startswith("- ")
+                     else "ol" if LIST_ITEM.match(line) else "p")
+        if kind is not None and line_kind != kind:
+            flush()
+        kind = line_kind
+        pending.append(line)
+    flush()
+    return blocks
+
+def load_skeleton(path: str = TEMPLATE_PATH) -> list:
+    """Return the parsed template blocks, reading the on-disk file on first use."""
+    global _skeleton
+    if _skeleton is None:
+        _skeleton = parse_template(_template_text(path))
+    return _skeleton
+
+# ---------------------------------------------------------------------------
+# Emitters
+
+def _lines(block: list) -> tuple:
+    return block[1], (block[2] if len(block) > 2 else 0)
+
+class MarkdownEmitter:
+    """Markdown identical to render_markdown(); every block ends with a blank line."""
+
+    @staticmethod
+    def runs(runs: list) -> str:
+        return "".join([run if type(run) is str else (f"**{run[1]}**" if run[0] == "b" else f"*{run[1]}*")
+                        for run in runs])
+
+    def block(self, block: list) -> str:
+        kind = block[0]
+        if kind == "p":
+            lines, indent = _lines(block)
+            pad = "\n" + " " * indent
+            return pad.join([self.runs(line) for line in lines]) + "\n\n"
+        if kind in ("ul", "ol"):
+            items = []
+            pad = "\n" + " " * (3 if kind == "ol" else 2)
+            for idx, item in enumerate(block[1], 1):
+                prefix = f"{idx}. " if kind == "ol" else "- "
+                items.append(prefix + pad.join([self.runs(line) for line in item]) + "\n")
+            loose = len(block) > 2 and block[2]
+            return ("\n" if loose else "").join(items) + "\n"
+        if kind == "h":
+            return "#" * block[1] + " " + self.runs(block[2]) + "\n\n"
+        if kind == "table":
+            header = [self.runs(cell) for cell in block[1]]
+            rows = ["| " + " | ".join(header) + " |",
+                    "|" + "|".join(["-" * (len(cell) + 2) for cell in header]) + "|"]
+            rows += ["| " + " | ".join([self.runs(cell) for cell in row]) + " |" for row in block[2]]
+            return "\n".join(rows) + "\n\n"
+        if kind == "hr":
+            return "---\n\n"
+        raise ValueError(f"Unknown IR block: {kind}")
+
+    @staticmethod
+    def inline(value) -> str:
+        return value if type(value) is str else format(value)
+
+    @staticmethod
+    def finish(text: str) -> str:
+        return text[:-2]  # render_markdown() output has no trailing newline
+
+class HtmlEmitter:
+    """HTML body fragment; all report text is escaped."""
+
+    @staticmethod
+    def runs(runs: list) -> str:
+        return "".join([escape(run, False) if type(run) is str
+                        else (f"<strong>{escape(run[1], False)}</strong>" if run[0] == "b"
+                              else f"<em>{escape(run[1], False)}</em>")
+                        for run in runs])
+
+    def block(self, block: list) -> str:
+        kind = block[0]
+        if kind == "p":
+            return "<p>" + "<br>\n".join([self.runs(line) for line in block[1]]) + "</p>\n"
+        if kind in ("ul", "ol"):
+            if not block[1]:
+                return ""
+            items = ["<li>" + "<br>\n".join([self.runs(line) for line in item]) + "</li>\n" for item in block[1]]
+            return f"<{kind}>\n" + "".join(items) + f"</{kind}>\n"
+        if kind == "h":
+            return f"<h{block[1]}>{self.runs(block[2])}</h{block[1]}>\n"
+        if kind == "table":
+            header = "".join([f"<th>{self.runs(cell)}</th>" for cell in block[1]])
+            rows = "".join(["<tr>" + "".join([f"<td>{self.runs(cell)}</td>" for cell in row]) + "</tr>\n"
+                            for row in block[2]])
+            return f"<table>\n<thead>\n<tr>{header}</tr>\n</thead>\n<tbody>\n{rows}</tbody>\n</table>\n"
+        if kind == "hr":
+            return "<hr>\n"
+        raise ValueError(f"Unknown IR block: {kind}")
+
+    @staticmethod
+    def inline(value) -> str:
+        return escape(value if type(value) is str else format(value), False)
+
+    @staticmethod
+    def finish(text: str) -> str:
+        return text
+
+class TextEmitter:
+    """Plain text for email and SMS channels: no markup, underlined headings."""
+
+    @staticmethod
+    def runs(runs: list) -> str:
+        return "".join([run if type(run) is str else run[1] for run in runs])
+
+    def block(self, block: list) -> str:
+        kind = block[0]
+        if kind == "p":
+            lines, indent = _lines(block)
+            return ("\n" + " " * indent).join([self.runs(line) for line in lines]) + "\n\n"
+        if kind in ("ul", "ol"):
+            if not block[1]:
+                return ""
+            items = []
+            pad = "\n" + " " * (3 if kind == "ol" else 2)
+            for idx, item in enumerate(block[1], 1):
+                prefix = f"{idx}. " if kind == "ol" else "- "
+                items.append(prefix + pad.join([self.runs(line) for line in item]) + "\n")
+            return "".join(items) + "\n"
+        if kind == "h":
+            title = self.runs(block[2])
+            underline = {1: "=", 2: "-"}.get(block[1])
+            return f"{title}\n{underline * len(title)}\n\n" if underline else f"{title}\n\n"
+        if kind == "table":
+            rows = [[self.runs(cell) for cell in block[1]]] + [[self.runs(cell) for cell in row] for row in block[2]]
+            width = max(len(row[0]) for row in rows)
+            return "\n".join([f"{row[0]:<{width}}  {'  '.join(row[1:])}".rstrip() for row in rows]) + "\n\n"
+        if kind == "hr":
+            return ""
+        raise ValueError(f"Unknown IR block: {kind}")
+
+    @staticmethod
+    def inline(value) -> str:
+        return value if type(value) is str else format(value)
+
+    @staticmethod
+    def finish(text: str) -> str:
+        return text.rstrip("\n") + "\n"
+
+EMITTERS = {"md": MarkdownEmitter(), "html": HtmlEmitter(), "txt": TextEmitter()}
+
+def compile_format(fmt: str) -> list:
+    """Return the template for fmt as [(literal, is_block_slot, slot name or None), ...].
+
+    The skeleton is emitted once with {{slot}} / {{#slot}} holes left in the
+    text; static blocks become literal strings.
+    """
+    if fmt not in _compiled:
+        emitter = EMITTERS[fmt]
+        text = "".join([f"{{{{#{block[1]}}}}}" if block[0] == "slot" else emitter.block(block)
+                        for block in load_skeleton()])
+        pieces = []
+        last = 0
+        for match in HOLE.finditer(text):
+            pieces.append((text[last:match.start()], bool(match.group(1)), match.group(2)))
+            last = match.end()
+        pieces.append((text[last:], False, None))
+        _compiled[fmt] = pieces
+    return _compiled[fmt]
+
+def emit(ir: dict, fmt: str = "md") -> str:
+    """Serialize an IR built by build_ir() to "md", "html" (body fragment) or "txt"."""
+    if ir.get("version") != IR_VERSION:
+        raise ValueError(f"Unsupported report IR version: {ir.get('version')}")
+    emitter = EMITTERS[fmt]
+    slots = ir["slots"]
+    out = []
+    for literal, is_block, name in compile_format(fmt):
+        out.append(literal)
+        if name is None:
+            continue
+        if is_block:
+            out.extend([emitter.block(block) for block in slots[name]])
+        else:
+            out.append(emitter.inline(slots[name]))
+    return emitter.finish("".join(out))
+
+def html_document(fragment: str) -> str:
+    """Wrap an emit(ir, "html") fragment in a standalone UTF-8 page."""
+    return HTML_PAGE.format(body=fragment)
+
+# ---------------------------------------------------------------------------
+# IR construction
+
+def _text(value) -> str:
+    return value if type(value) is str else format(value)
+
+def _bullets(items) -> list:
+    return ["ul", [[[_text(item)]] for item in items]]
+
+def _with_note(blocks: list, note: str) -> list:
+    # truncate_list() notes are Markdown italics: "*+N more ... omitted*"
+    if note:
+        blocks.append(["p", [[["i", note[1:-1]]]]])
+    return blocks
+
+def build_ir(data: dict, limits: dict = LIST_LIMITS) -> dict:
+    """Build the format-neutral IR for one report (same rules as render_markdown)."""
+    facts = report_facts(data, limits)
+    slots = {name: facts[name] for name in INLINE_SLOTS}
+
+    uplift = []
+    if facts["uplift"] is not None:
+        uplift = _with_note([["h", 3, ["To Raise Confidence:"]], _bullets(facts["uplift"][0])], facts["uplift"][1])
+
+    hypotheses, mechanisms, ranked = [], [], []
+    for idx, hyp in enumerate(facts["hypotheses"][0], 1):
+        name = hyp.get('hypothesis', 'Unknown')
+        likelihood = hyp.get('likelihood', 'unknown').upper()
+        evidence = hyp.get('evidence', 'No evidence')
+        hypotheses.append(["p", [[["b", f"{idx}. {name}"], " — ", ["i", f"{likelihood} likelihood"]],
+                                 [f"Evidence: {hyp.get('evidence', 'No evidence provided')}"]], 3])
+        mechanisms.append([[f"{name}: {evidence}"]])
+        ranked.append([[["b", _text(name)], f" — {likelihood} ({evidence})"]])
+
+    actions, immediate = [], []
+    for action in facts["actions"][0]:
+        step = _text(action.get('step', 'Unknown step'))
+        actions.append([[["b", step]], [["i", "Why:"], f" {action.get('why', 'No reason provided')}"]])
+        immediate.append([[step]])
+
+    if facts["warranty"] is not None:
+        warranty = _with_note([_bullets(facts["warranty"][0])], facts["warranty"][1])
+        sources = [_bullets(facts["warranty"][0])]
+    else:
+        warranty = [_bullets([NO_WARRANTY])]
+        sources = [_bullets(DEFAULT_SOURCES)]
+
+    slots.update({
+        "uplift_block": uplift,
+        "hypotheses_block": _with_note(hypotheses, facts["hypotheses"][1]),
+        "actions_block": _with_note([["ol", actions, True]] if actions else [], facts["actions"][1]),
+        "safety_block": _with_note([_bullets(facts["safety"][0])], facts["safety"][1]),
+        "mechanisms_block": [["ul", mechanisms]],
+        "tools_block": _with_note([_bullets(facts["tools"][0])], facts["tools"][1]),
+        "warranty_block": warranty,
+        "ranked_block": [["ol", ranked]],
+        "immediate_block": [["ul", immediate]],
+        "sources_block": sources,
+        "disclaimers_block": _with_note([_bullets(facts["disclaimers"][0])], facts["disclaimers"][1]),
+    })
+    return {"version": IR_VERSION, "slots": slots}
+
+def ir_cached(data: dict, cache, limits: dict = LIST_LIMITS) -> tuple[dict, bool]:
+    """Return (ir, hit), building the IR only when cache has no ".ir.json" entry for data."""
+    if cache is None:
+        return build_ir(data, limits), False
+    key = cache.key_for(data)
+    cached = cache.lookup(key, ".ir.json")
+    if cached is not None:
+        with open(cached, 'r', encoding="utf-8") as f:
+            ir = json.load(f)
+        if ir.get("version") == IR_VERSION:
+            return ir, True
+    ir = build_ir(data, limits)
+    cache.store_text(key, ".ir.json", canonical_json(ir).decode("utf-8"))
+    return ir, False
+
+def render_formats(data: dict, formats=FORMATS, renderer: str = "compiled", page_cap: float = PAGE_CAP,
+                   max_chars: int = None, cache=None) -> dict:
+    """Build the IR for data once and return {format: text} for each of formats.
+
+    With renderer "budgeted" the IR is built from the budget plan for
+    page_cap/max_chars, so every format shows the same trimmed sections as
+    the budgeted Markdown.
+    """
+    limits = LIST_LIMITS
+    if renderer == "budgeted":
+        from report_budget import fitted_plan
+        plan = fitted_plan(data, page_cap, max_chars)
+        data, limits = plan["data"], plan["limits"]
+    ir, _ = ir_cached(data, cache, limits)
+    return {fmt: emit(ir, fmt) for fmt in formats}
+
+def check_parity() -> int:
+    """Compare emit(build_ir(), "md") with render_markdown() on every fixture; return failures."""
+    from render_from_json import render_markdown
+    from report_template import fixture_payloads
+
+    failures = 0
+    count = 0
+    for name, payload in fixture_payloads():
+        payload.setdefault("meta", {}).setdefault("generated_at_iso", "1970-01-01T00:00:00Z")
+        ir = json.loads(canonical_json(build_ir(payload)))  # must survive a JSON round trip
+        count += 1
+        if emit(ir, "md") != render_markdown(payload):
+            print(f"FAIL report_ir: {name} Markdown differs from render_markdown()", file=sys.stderr)
+            failures += 1
+        for fmt in ("html", "txt"):
+            emit(ir, fmt)
+    if not failures:
+        print(f"✅ IR Markdown parity checked on {count} fixtures")
+    return failures
+
+def main():
+    """Print one report in the requested format, or check parity when no report is given."""
+    import argparse  # deferred: render_formats() callers never parse argv
+    parser = argparse.ArgumentParser(
+        description="Emit a report through the format-neutral IR, or check Markdown parity "
+                    "on tests/golden + tests/mocks when no report is given.")
+    parser.add_argument("report", nargs="?", help="report JSON file")
+    parser.add_argument("--format", choices=FORMATS, default="md", help="output format (default: md)")
+    parser.add_argument("--ir", action="store_true", help="print the IR JSON instead of a format")
+    args = parser.parse_args()
+    if args.report is None:
+        if args.ir or args.format != "md":
+            parser.error("--format and --ir need a report")
+        sys.exit(1 if check_parity() else 0)
+
+    with open(Path(args.report), 'r') as f:
+        data = json.load(f)
+    ir = build_ir(data)
+    if args.ir:
+        print(json.dumps(ir, indent=2, ensure_ascii=False))
+    elif args.format == "html":
+        sys.stdout.write(html_document(emit(ir, "html")))
+    else:
+        print(emit(ir, args.format))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Markdown Renderer
+The 14-point Markdown renderer and the renderer registry, kept import-light.
+
+render_markdown() and get_renderer() are what one-shot callers (fast_cli.py,
+worker processes, the daemon) need, so this module imports only datetime and
+functools: the CLI machinery in render_from_json.py (render cache, profiler,
+PDF engines, schema validation) and the page model are never loaded to
+render one report. The compiled and budgeted renderers are imported when
+get_renderer() first asks for them. render_from_json.py re-exports all of it.
+"""
+
+from datetime import datetime
+from functools import partial
+
+def truncate_list(items: list, max_items: int, label: str) -> tuple[list, str]:
+    """Truncate list to max_items and return remainder note."""
+    if len(items) <= max_items:
+        return items, ""
+
+    remaining = len(items) - max_items
+    note = f"*+{remaining} more {label} omitted for brevity*"
+    return items[:max_items], note
+
+def _no_mark(name=None):
+    pass
+
+def render_markdown(data: dict, profiler=None) -> str:
+    """Render diagnostic JSON to Markdown using 14-point framework.
+
+    A StageProfiler passed as profiler times every section as "section.<name>".
+    """
+
+    mark = profiler.mark if profiler is not None else _no_mark
+    lines = []
+
+    # Header
+    mark("section.header")
+    lines.append("# DiagnosticPro Diagnostic Report")
+    lines.append("")
+    generated_at = data.get("meta", {}).get("generated_at_iso", datetime.utcnow().isoformat() + "Z")
+    lines.append(f"**Generated:** {generated_at}")
+    lines.append(f"**Submission ID:** {data.get('submissionId', 'UNKNOWN')}")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # Customer & Equipment Snapshot
+    mark("section.customer_equipment")
+    lines.append("## Customer & Equipment Information")
+    lines.append("")
+    customer = data.get("customer", {})
+    lines.append(f"**Customer:** {customer.get('name', 'N/A')} ({customer.get('email', 'N/A')})")
+
+    equipment = data.get("equipment", {})
+    eq_parts = []
+    if equipment.get("year"): eq_parts.append(equipment["year"])
+    if equipment.get("make"): eq_parts.append(equipment["make"])
+    if equipment.get("model"): eq_parts.append(equipment["model"])
+    eq_str = " ".join(eq_parts) if eq_parts else f"{equipment.get('type', 'Unknown')} equipment"
+    lines.append(f"**Equipment:** {eq_str}")
+
+    lines.append("")
+    lines.append(f"**Reported Symptoms:** {data.get('symptoms', 'None provided')}")
+    lines.append("")
+
+    codes = data.get("codes", [])
+    if codes:
+        lines.append(f"**Diagnostic Codes:** {', '.join(codes)}")
+    else:
+        lines.append("**Diagnostic Codes:** None reported")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 1. PRIMARY DIAGNOSIS
+    mark("section.01_primary_diagnosis")
+    lines.append("## 1. PRIMARY DIAGNOSIS")
+    lines.append("")
+    lines.append("**Most Likely Root Cause:**")
+    lines.append("")
+    lines.append(data.get("most_likely_cause", "Analysis incomplete"))
+    lines.append("")
+
+    confidence = data.get("confidence", {})
+    score = confidence.get("score_pct", 0)
+    threshold = confidence.get("threshold_pct", 85)
+    assessment = confidence.get("assessment", "No assessment provided")
+
+    lines.append(f"**Confidence:** {score}% (Target: {threshold}%)")
+    lines.append(f"*{assessment}*")
+    lines.append("")
+
+    uplift_reqs = data.get("confidence_uplift_requirements", [])
+    if uplift_reqs and score < threshold:
+        lines.append("### To Raise Confidence:")
+        lines.append("")
+        uplift_display, uplift_note = truncate_list(uplift_reqs, 8, "requirements")
+        for req in uplift_display:
+            lines.append(f"- {req}")
+        if uplift_note:
+            lines.append("")
+            lines.append(uplift_note)
+        lines.append("")
+
+    lines.append("---")
+    lines.append("")
+
+    # 2. DIFFERENTIAL DIAGNOSIS
+    mark("section.02_differential_diagnosis")
+    lines.append("## 2. DIFFERENTIAL DIAGNOSIS")
+    lines.append("")
+    lines.append("**Alternative Causes Ranked by Likelihood:**")
+    lines.append("")
+
+    hypotheses = data.get("root_cause_hypotheses", [])
+    hypotheses_display, hyp_note = truncate_list(hypotheses, 5, "hypotheses")
+
+    for idx, hyp in enumerate(hypotheses_display, 1):
+        likelihood = hyp.get("likelihood", "unknown").upper()
+        lines.append(f"**{idx}. {hyp.get('hypothesis', 'Unknown')}** — *{likelihood} likelihood*")
+        lines.append(f"   Evidence: {hyp.get('evidence', 'No evidence provided')}")
+        lines.append("")
+
+    if hyp_note:
+        lines.append(hyp_note)
+        lines.append("")
+
+    lines.append("---")
+    lines.append("")
+
+    # 3. DIAGNOSTIC VERIFICATION
+    mark("section.03_diagnostic_verification")
+    lines.append("## 3. DIAGNOSTIC VERIFICATION")
+    lines.append("")
+    lines.append("**Required Tests & Procedures:**")
+    lines.append("")
+
+    actions = data.get("recommended_actions", [])
+    actions_display, actions_note = truncate_list(actions, 8, "actions")
+
+    for idx, action in enumerate(actions_display, 1):
+        lines.append(f"{idx}. **{action.get('step', 'Unknown step')}**")
+        lines.append(f"   *Why:* {action.get('why', 'No reason provided')}")
+        lines.append("")
+
+    if actions_note:
+        lines.append(actions_note)
+        lines.append("")
+
+    lines.append("---")
+    lines.append("")
+
+    # 4. SHOP INTERROGATION
+    mark("section.04_shop_interrogation")
+    lines.append("## 4. SHOP INTERROGATION")
+    lines.append("")
+    lines.append("**Critical Questions to Ask Your Mechanic:**")
+    lines.append("")
+    lines.append("1. What exact diagnostic tests did you perform to isolate this issue?")
+    lines.append("2. Can you show me the freeze-frame data or live sensor readings?")
+    lines.append("3. What are the specific test values that confirm your diagnosis?")
+    lines.append("4. Have you checked TSBs and known failure patterns for this symptom?")
+    lines.append("5. What's your confidence level, and what would increase it to 100%?")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 5. CONVERSATION SCRIPTING
+    mark("section.05_conversation_scripting")
+    cost_low = data.get("estimated_cost_range_usd", {}).get("low", 0)
+    cost_high = data.get("estimated_cost_range_usd", {}).get("high", 0)
+
+    lines.append("## 5. CONVERSATION SCRIPTING")
+    lines.append("")
+    lines.append("**What to Say to Protect Yourself:**")
+    lines.append("")
+    lines.append(f"- \"Before authorizing any repair over ${cost_low}, I need to see the diagnostic data that confirms this issue.\"")
+    lines.append("- \"Can you explain why [alternative hypothesis] isn't the cause?\"")
+    lines.append(f"- \"I'd like a second opinion before proceeding with repairs exceeding ${cost_high}.\"")
+    lines.append("- \"Show me the exact test results that rule out warranty coverage or TSB applicability.\"")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 6. COST BREAKDOWN
+    mark("section.06_cost_breakdown")
+    lines.append("## 6. COST BREAKDOWN")
+    lines.append("")
+    lines.append("**Fair Price Expectations:**")
+    lines.append("")
+    lines.append(f"- **Parts & Labor Range:** ${cost_low} – ${cost_high} USD")
+    time_hours = data.get("estimated_time_hours", 0)
+    lines.append(f"- **Estimated Time:** {time_hours} hours")
+    red_flag_cost = int(cost_high * 1.5)
+    lines.append(f"- **Red Flags:** Any quote exceeding ${red_flag_cost} without additional failures found")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 7. RIPOFF DETECTION
+    mark("section.07_ripoff_detection")
+    lines.append("## 7. RIPOFF DETECTION")
+    lines.append("")
+    lines.append("**Watch Out For:**")
+    lines.append("")
+
+    safety_notes = data.get("safety_notes", [])
+    safety_display, safety_note = truncate_list(safety_notes, 6, "safety notes")
+
+    for note in safety_display:
+        lines.append(f"- {note}")
+
+    if safety_note:
+        lines.append("")
+        lines.append(safety_note)
+
+    lines.append("")
+    lines.append("**Common Scams:**")
+    lines.append("")
+    lines.append("- Replacing parts \"just in case\" without diagnostic confirmation")
+    lines.append("- Charging diagnostic fees without isolating root cause")
+    lines.append("- Recommending unnecessary preventive maintenance during urgent repairs")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 8. AUTHORIZATION GUIDE
+    mark("section.08_authorization_guide")
+    lines.append("## 8. AUTHORIZATION GUIDE")
+    lines.append("")
+    lines.append("**Decision Matrix:**")
+    lines.append("")
+    lines.append("| Scenario | Your Response |")
+    lines.append("|----------|---------------|")
+    lines.append("| Diagnosis matches this report + cost within range | ✅ **APPROVE** with confidence |")
+    lines.append("| Diagnosis differs but mechanic shows test data | ⚠️ **REQUEST EXPLANATION** before proceeding |")
+    threshold_cost = int(cost_high * 1.3)
+    lines.append(f"| Quote exceeds ${threshold_cost} | 🔴 **SECOND OPINION REQUIRED** |")
+    lines.append("| Shop refuses to show diagnostic data | 🚫 **REJECT & LEAVE** immediately |")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 9. TECHNICAL EDUCATION
+    mark("section.09_technical_education")
+    lines.append("## 9. TECHNICAL EDUCATION")
+    lines.append("")
+    lines.append("**How This System Works & Why It Fails:**")
+    lines.append("")
+    lines.append(data.get("symptoms", "Symptom information not provided"))
+    lines.append("")
+    lines.append("**Failure Mechanisms:**")
+    lines.append("")
+    for hyp in hypotheses_display:
+        lines.append(f"- {hyp.get('hypothesis', 'Unknown')}: {hyp.get('evidence', 'No evidence')}")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 10. OEM PARTS STRATEGY
+    mark("section.10_oem_parts_strategy")
+    lines.append("## 10. OEM PARTS STRATEGY")
+    lines.append("")
+    lines.append("**Recommended Parts & Tools:**")
+    lines.append("")
+
+    tools_parts = data.get("tools_parts", [])
+    tools_display, tools_note = truncate_list(tools_parts, 12, "tools/parts")
+
+    for tool in tools_display:
+        lines.append(f"- {tool}")
+
+    if tools_note:
+        lines.append("")
+        lines.append(tools_note)
+
+    lines.append("")
+    lines.append("### Warranty & Technical Service Bulletins:")
+    lines.append("")
+
+    warranty_refs = data.get("warranty_or_tsb_refs", [])
+    if warranty_refs:
+        warranty_display, warranty_note = truncate_list(warranty_refs, 8, "references")
+        for ref in warranty_display:
+            lines.append(f"- {ref}")
+        if warranty_note:
+            lines.append("")
+            lines.append(warranty_note)
+    else:
+        lines.append("- No active TSBs or warranty coverage identified for this symptom pattern")
+
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 11. NEGOTIATION TACTICS
+    mark("section.11_negotiation_tactics")
+    lines.append("## 11. NEGOTIATION TACTICS")
+    lines.append("")
+    lines.append("**Professional Price Discussion:**")
+    lines.append("")
+    lines.append(f"1. **Establish Baseline:** \"Your quote of $X is above the industry average of ${cost_high} for this repair.\"")
+    lines.append("2. **Request Itemization:** \"Can you break down parts cost vs labor separately?\"")
+    lines.append("3. **Leverage Competition:** \"I have quotes from two other shops—can you match or explain the difference?\"")
+    lines.append("4. **Time-Based Discounts:** \"If I authorize this today, can you reduce the rate?\"")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 12. LIKELY CAUSES (RANKED BY CONFIDENCE)
+    mark("section.12_likely_causes")
+    lines.append("## 12. LIKELY CAUSES (RANKED BY CONFIDENCE)")
+    lines.append("")
+    for idx, hyp in enumerate(hypotheses_display, 1):
+        likelihood = hyp.get("likelihood", "unknown").upper()
+        lines.append(f"{idx}. **{hyp.get('hypothesis', 'Unknown')}** — {likelihood} ({hyp.get('evidence', 'No evidence')})")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 13. RECOMMENDATIONS
+    mark("section.13_recommendations")
+    lines.append("## 13. RECOMMENDATIONS")
+    lines.append("")
+    lines.append("**Immediate Actions:**")
+    lines.append("")
+    for action in actions_display:
+        lines.append(f"- {action.get('step', 'Unknown step')}")
+    lines.append("")
+    lines.append("**Future Preventive Maintenance:**")
+    lines.append("")
+    lines.append("- Monitor related systems for early warning signs")
+    lines.append("- Document all repairs for pattern analysis")
+    lines.append("- Follow OEM maintenance intervals strictly")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # 14. SOURCE VERIFICATION
+    mark("section.14_source_verification")
+    lines.append("## 14. SOURCE VERIFICATION")
+    lines.append("")
+    lines.append("**Authoritative References:**")
+    lines.append("")
+
+    if warranty_refs:
+        for ref in warranty_display:
+            lines.append(f"- {ref}")
+    else:
+        lines.append("- OEM Service Manual (specific VIN lookup required)")
+        lines.append("- NHTSA Complaints Database")
+        lines.append("- Technical Service Bulletin Archives")
+
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # DISCLAIMERS
+    mark("section.disclaimers")
+    lines.append("## DISCLAIMERS")
+    lines.append("")
+    disclaimers = data.get("disclaimers", [])
+    for disclaimer in disclaimers[:10]:  # Max 10
+        lines.append(f"- {disclaimer}")
+
+    if len(disclaimers) > 10:
+        lines.append("")
+        lines.append(f"*+{len(disclaimers) - 10} more disclaimers omitted*")
+
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # Footer
+    mark("section.footer")
+    readiness = data.get("customer_readiness_check", {})
+    verdict = readiness.get("verdict", "unknown")
+    reason = readiness.get("short_reason", "No reason provided")
+
+    lines.append(f"**Customer Readiness Status:** {verdict}")
+    lines.append(f"*Reason:* {reason}")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    submission_id = data.get("submissionId", "UNKNOWN")
+    lines.append(f"*Report generated by DiagnosticPro AI | Submission ID: {submission_id} | {generated_at}*")
+
+    mark("section.join")
+    markdown = "\n".join(lines)
+    mark()
+    return markdown
+
+RENDERER_CHOICES = ("markdown", "compiled", "budgeted")
+
+def get_renderer(name: str = "markdown", page_cap: int = None, max_chars: int = None):
+    """Return the report renderer registered under name.
+
+    "markdown" is render_markdown() above; "compiled" is the precompiled
+    template in report_template.py, which produces identical bytes;
+    "budgeted" (report_budget.py) trims sections to fit page_cap (default:
+    PAGE_CAP) and max_chars. Each renderer's modules are imported on first
+    request.
+    """
+    if name == "budgeted":
+        from report_budget import render_budgeted
+        from page_model import PAGE_CAP
+        return partial(render_budgeted, max_pages=PAGE_CAP if page_cap is None else page_cap,
+                       max_chars=max_chars)
+    if name == "compiled":
+        from report_template import render_compiled
+        return render_compiled
+    if name == "markdown":
+        return render_markdown
+    raise ValueError(f"Unknown renderer: {name}")
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Report Schema Validator
+In-process validation of diagnostic report JSON, no Node/Ajv subprocess.
+
+The schema (DIAGPRO.REPORT.schema.json at the repo root when present, otherwise
+the built-in REPORT_SCHEMA below, which encodes the caps generate_mock_response()
+applies) is compiled once into a tree of small field-specific check functions.
+Validation collects every error rather than stopping at the first.
+
+Usage:
+  report_schema.py [input ...]   validate JSON files, directories, .jsonl files
+                                 or '-' (JSONL on stdin); exits 1 if any invalid
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCHEMA_PATH = ROOT / "DIAGPRO.REPORT.schema.json"
+
+def _strings(max_items: int, max_length: int = None) -> dict:
+    items = {"type": "string"}
+    if max_length is not None:
+        items["maxLength"] = max_length
+    return {"type": "array", "maxItems": max_items, "items": items}
+
+REPORT_SCHEMA = {
+    "type": "object",
+    "required": [
+        "submissionId", "customer", "equipment", "symptoms", "codes",
+        "root_cause_hypotheses", "most_likely_cause", "recommended_actions",
+        "tools_parts", "safety_notes", "estimated_cost_range_usd",
+        "estimated_time_hours", "warranty_or_tsb_refs", "disclaimers",
+        "confidence", "confidence_uplift_requirements", "customer_readiness_check",
+    ],
+    "properties": {
+        "submissionId": {"type": "string", "minLength": 1},
+        "customer": {
+            "type": "object",
+            "required": ["email"],
+            "properties": {
+                "email": {"type": "string"},
+                "name": {"type": ["string", "null"]},
+            },
+        },
+        "equipment": {
+            "type": "object",
+            "required": ["type"],
+            "properties": {
+                "type": {"type": "string"},
+                "make": {"type": ["string", "null"]},
+                "model": {"type": ["string", "null"]},
+                "year": {"type": ["string", "null"]},
+            },
+        },
+        "symptoms": {"type": "string"},
+        "codes": {"type": "array", "items": {"type": "string"}},
+        "root_cause_hypotheses": {
+            "type": "array",
+            "minItems": 1,
+            "maxItems": 5,
+            "items": {
+                "type": "object",
+                "required": ["hypothesis", "evidence", "likelihood"],
+                "properties": {
+                    "hypothesis": {"type": "string"},
+                    "evidence": {"type": "string"},
+                    "likelihood": {"enum": ["high", "medium", "low"]},
+                },
+            },
+        },
+        "most_likely_cause": {"type": "string"},
+        "recommended_actions": {
+            "type": "array",
+            "maxItems": 8,
+            "items": {
+                "type": "object",
+                "required": ["step", "why"],
+                "properties": {
+                    "step": {"type": "string"},
+                    "why": {"type": "string"},
+                },
+            },
+        },
+        "tools_parts": _strings(12),
+        "safety_notes": _strings(6),
+        "estimated_cost_range_usd": {
+            "type": "object",
+            "required": ["low", "high"],
+            "properties": {
+                "low": {"type": "number", "minimum": 0},
+                "high": {"type": "number", "minimum": 0},
+            },
+        },
+        "estimated_time_hours": {"type": "number", "minimum": 0},
+        "warranty_or_tsb_refs": _strings(8),
+        "disclaimers": _strings(10),
+        "confidence": {
+            "type": "object",
+            "required": ["score_pct", "threshold_pct"],
+            "properties": {
+                "score_pct": {"type": "number", "minimum": 0, "maximum": 100},
+                "threshold_pct": {"type": "number", "minimum": 0, "maximum": 100},
+                "assessment": {"type": "string"},
+            },
+        },
+        "confidence_uplift_requirements": _strings(8),
+        "customer_readiness_check": {
+            "type": "object",
+            "required": ["verdict", "short_reason"],
+            "properties": {
+                "verdict": {"enum": ["ready_for_customer", "needs_revision"]},
+                "short_reason": {"type": "string", "maxLength": 220},
+            },
+        },
+        "meta": {
+            "type": "object",
+            "properties": {
+                "model": {"type": "string"},
+                "version": {"type": "string"},
+                "generated_at_iso": {"type": "string"},
+            },
+        },
+    },
+}
+
+def _is_type(name: str):
+    """Return a predicate for one JSON Schema type name (bool is not a number)."""
+    if name == "string":
+        return lambda v: isinstance(v, str)
+    if name == "integer":
+        return lambda v: isinstance(v, int) and not isinstance(v, bool)
+    if name == "number":
+        return lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+    if name == "boolean":
+        return lambda v: isinstance(v, bool)
+    if name == "null":
+        return lambda v: v is None
+    if name == "array":
+        return lambda v: isinstance(v, list)
+    if name == "object":
+        return lambda v: isinstance(v, dict)
+    raise ValueError(f"Unsupported schema type: {name}")
+
+SUPPORTED_KEYWORDS = frozenset({
+    "type", "enum", "required", "properties", "additionalProperties", "items",
+    "minItems", "maxItems", "minLength", "maxLength", "minimum", "maximum",
+})
+ANNOTATION_KEYWORDS = frozenset({
+    "$schema", "$id", "$comment", "title", "description", "default", "examples",
+    "deprecated", "readOnly", "writeOnly",
+})
+
+def compile_schema(schema: dict):
+    """Compile a JSON Schema subset into check(value, path, errors).
+
+    Supported keywords: type, enum, required, properties, additionalProperties
+    (boolean), items (a single schema), minItems, maxItems, minLength,
+    maxLength, minimum, maximum. Annotation keywords ($schema, title,
+    description, ...) are ignored; any other keyword ($ref, pattern, anyOf,
+    const, format, ...) raises ValueError rather than silently passing every
+    report. Each node becomes a list of closures, so per-report work is just
+    the checks that apply to that field.
+    """
+    unsupported = sorted(set(schema) - SUPPORTED_KEYWORDS - ANNOTATION_KEYWORDS)
+    if unsupported:
+        raise ValueError(f"Unsupported schema keyword(s): {', '.join(unsupported)}")
+    if not isinstance(schema.get("additionalProperties", False), bool):
+        raise ValueError("Unsupported schema keyword: additionalProperties must be a boolean")
+    if "items" in schema and not isinstance(schema["items"], dict):
+        raise ValueError("Unsupported schema keyword: items must be a single schema")
+    checks = []
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else list(types)
+        predicates = [_is_type(name) for name in names]
+        expected = " or ".join(names)
+
+        def check_type(value, path, errors):
+            for predicate in predicates:
+                if predicate(value):
+                    return True
+            errors.append(f"{path}: expected {expected}, got {_type_name(value)}")
+            return False
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: {value!r} is not one of {allowed}")
+        checks.append(check_enum)
+
+    if "minLength" in schema or "maxLength" in schema:
+        min_length = schema.get("minLength", 0)
+        max_length = schema.get("maxLength")
+
+        def check_length(value, path, errors):
+            if isinstance(value, str):
+                if len(value) < min_length:
+                    errors.append(f"{path}: shorter than {min_length} characters")
+                if max_length is not None and len(value) > max_length:
+                    errors.append(f"{path}: {len(value)} characters exceeds maxLength {max_length}")
+        checks.append(check_length)
+
+    if "minimum" in schema or "maximum" in schema:
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+
+        def check_range(value, path, errors):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if minimum is not None and value < minimum:
+                    errors.append(f"{path}: {value} is below minimum {minimum}")
+                if maximum is not None and value > maximum:
+                    errors.append(f"{path}: {value} is above maximum {maximum}")
+        checks.append(check_range)
+
+    if "minItems" in schema or "maxItems" in schema or "items" in schema:
+        min_items = schema.get("minItems", 0)
+        max_items = schema.get("maxItems")
+        item_check = compile_schema(schema["items"]) if "items" in schema else None
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if len(value) < min_items:
+                errors.append(f"{path}: {len(value)} items is fewer than minItems {min_items}")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: {len(value)} items exceeds maxItems {max_items}")
+            if item_check is not None:
+                for index, item in enumerate(value):
+                    item_check(item, f"{path}[{index}]", errors)
+        checks.append(check_array)
+
+    if "properties" in schema or "required" in schema or schema.get("additionalProperties") is False:
+        required = list(schema.get("required", []))
+        properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+        closed = schema.get("additionalProperties") is False
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required property '{name}'")
+            for name, check in properties.items():
+                if name in value:
+                    check(value[name], f"{path}.{name}", errors)
+            if closed:
+                for name in value:
+                    if name not in properties:
+                        errors.append(f"{path}: unexpected property '{name}'")
+        checks.append(check_object)
+
+    def check(value, path, errors):
+        for step in checks:
+            # A failed type check makes the remaining keyword checks meaningless
+            if step(value, path, errors) is False:
+                return
+    return check
+
+def _type_name(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+def load_schema(path: Path = SCHEMA_PATH) -> dict:
+    """Return the repo's report schema file when present, else REPORT_SCHEMA."""
+    if path.exists():
+        with open(path, 'r') as f:
+            return json.load(f)
+    return REPORT_SCHEMA
+
+_validator = None
+
+def validate_report(report) -> list:
+    """Return every schema error for report (empty list when valid)."""
+    global _validator
+    if _validator is None:
+        _validator = compile_schema(load_schema())
+    errors = []
+    _validator(report, "$", errors)
+    return errors
+
+def iter_reports(sources: list):
+    """Yield (label, report_or_exception) from files, directories, .jsonl and '-'."""
+    def from_jsonl(stream, label):
+        for lineno, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield f"{label}:{lineno}", json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield f"{label}:{lineno}", e
+
+    for source in sources:
+        if source == "-":
+            yield from from_jsonl(sys.stdin, "stdin")
+            continue
+        path = Path(source)
+        paths = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for item in paths:
+            try:
+                if item.suffix == ".jsonl":
+                    with open(item, 'r') as f:
+                        yield from from_jsonl(f, item.name)
+                    continue
+                with open(item, 'r') as f:
+                    yield item.name, json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                yield item.name, e
+
+def main():
+    """Validate every report from the given sources and print all errors."""
+    global _validator
+    sources = sys.argv[1:] or [str(ROOT / "tests" / "golden")]
+    try:
+        _validator = compile_schema(load_schema())
+    except ValueError as e:
+        print(f"Error: invalid report schema: {e}", file=sys.stderr)
+        sys.exit(1)
+    checked = invalid = 0
+    started = time.perf_counter()
+
+    for label, report in iter_reports(sources):
+        checked += 1
+        errors = [f"$: unreadable ({report})"] if isinstance(report, Exception) else validate_report(report)
+        if errors:
+            invalid += 1
+            print(f"Validation failed for {label}:", file=sys.stderr)
+            for error in errors:
+                print(f"  {error}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    rate = checked / elapsed if elapsed > 0 else 0.0
+    print(f"{'✅' if not invalid else '❌'} {checked - invalid}/{checked} reports valid ({rate:.0f} reports/sec)")
+    sys.exit(1 if invalid else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Streaming Report Writer
+Writes 14-point Markdown section by section instead of as one string.
+
+render_markdown() and render_compiled() build the whole document before it
+is written, and the caller then holds it for len() and the page estimate;
+for reports with very long symptoms or notes that is several full copies.
+Here report_template.iter_sections() produces one section at a time with
+long fields passed through uncopied, each chunk goes straight to the file or
+socket, and the character count (and optionally the page-model height,
+which adds up section by section) is kept as a running total. Peak memory is
+then about the largest section rather than the whole report.
+
+Usage:
+  report_stream.py <report.json> <out.md|-> [--renderer compiled|budgeted] [--pages N] [--chars N]
+                   [--compare-memory]   also measure peak memory against render_compiled() + write
+"""
+
+import argparse
+import io
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+from page_model import PAGE_CAP, PageModel, default_model
+from report_template import CHUNK_CHARS, LIST_LIMITS, iter_sections, render_compiled
+
+class MarkdownStreamWriter:
+    """Write Markdown chunks to a text file, binary file or socket, counting as it goes.
+
+    chars, bytes and chunks are running totals; with measure_pages the
+    page-model height of every section written through write_section() is
+    added to height.
+    """
+
+    def __init__(self, out, measure_pages: bool = False, model: PageModel = None,
+                 chunk_chars: int = CHUNK_CHARS, progress=None):
+        self.chars = 0
+        self.bytes = 0
+        self.chunks = 0
+        self.height = 0.0
+        self.model = model or (default_model() if measure_pages else None)
+        self.measure_pages = measure_pages
+        self.chunk_chars = chunk_chars
+        self.progress = progress
+        if hasattr(out, "sendall"):
+            self._send = lambda chunk: out.sendall(chunk.encode("utf-8"))
+        elif isinstance(out, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(out, "mode", ""):
+            self._send = lambda chunk: out.write(chunk.encode("utf-8"))
+        else:
+            self._send = out.write
+
+    def write(self, chunk: str):
+        """Write one chunk and update the running totals."""
+        if not chunk:
+            return
+        self._send(chunk)
+        self.chars += len(chunk)
+        self.bytes += len(chunk.encode("utf-8")) if not chunk.isascii() else len(chunk)
+        self.chunks += 1
+        if self.progress is not None:
+            self.progress(self.chars)
+
+    def write_section(self, parts: list):
+        """Write one section's parts, joining short runs and passing long parts through."""
+        if self.measure_pages:
+            self.height += self.model.estimate_height("".join(parts))
+        buffer = []
+        for part in parts:
+            if len(part) >= self.chunk_chars:
+                self.write("".join(buffer))
+                buffer = []
+                self.write(part)
+            else:
+                buffer.append(part)
+        self.write("".join(buffer))
+
+    @property
+    def pages(self) -> float:
+        return self.height / self.model.text_height if self.model is not None else 0.0
+
+    def summary(self) -> dict:
+        result = {"chars": self.chars, "bytes": self.bytes, "chunks": self.chunks}
+        if self.measure_pages:
+            result["pages"] = self.pages
+        return result
+
+def stream_report(data: dict, out, renderer: str = "compiled", page_cap: float = PAGE_CAP,
+                  max_chars: int = None, measure_pages: bool = False, progress=None) -> dict:
+    """Stream data's 14-point Markdown to out; return {chars, bytes, chunks[, pages]}.
+
+    renderer "compiled" (and "markdown", which renders the same bytes)
+    streams the template directly; "budgeted" plans the section limits for
+    page_cap/max_chars first and streams the planned report.
+    """
+    limits = LIST_LIMITS
+    if renderer == "budgeted":
+        from report_budget import fitted_plan
+        plan = fitted_plan(data, page_cap, max_chars)
+        data, limits = plan["data"], plan["limits"]
+    elif renderer not in ("compiled", "markdown"):
+        raise ValueError(f"Unknown renderer: {renderer}")
+    writer = MarkdownStreamWriter(out, measure_pages=measure_pages, progress=progress)
+    for parts in iter_sections(data, limits):
+        writer.write_section(parts)
+    return writer.summary()
+
+def measure_file(path, model: PageModel = None) -> dict:
+    """Return {chars, pages} for a Markdown file, reading one section at a time."""
+    model = model or default_model()
+    chars = 0
+    height = 0.0
+    section = []
+    with open(path, 'r', encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("## ") and section:
+                height += model.estimate_height("".join(section))
+                section = []
+            section.append(line)
+            chars += len(line)
+    if section:
+        height += model.estimate_height("".join(section))
+    return {"chars": chars, "pages": height / model.text_height}
+
+def _peak_bytes(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def main():
+    """Stream one report to a file or stdout and print the running totals."""
+    parser = argparse.ArgumentParser(description="Stream a report's 14-point Markdown section by section.")
+    parser.add_argument("input", help="report JSON file")
+    parser.add_argument("output", help="output Markdown file, or - for stdout")
+    parser.add_argument("--renderer", choices=("compiled", "budgeted"), default="compiled")
+    parser.add_argument("--pages", type=float, default=PAGE_CAP, help=f"page budget for budgeted (default: {PAGE_CAP})")
+    parser.add_argument("--chars", type=int, default=None, help="character budget for budgeted (default: none)")
+    parser.add_argument("--compare-memory", action="store_true",
+                        help="report peak traced memory of streaming vs render_compiled() + write")
+    args = parser.parse_args()
+
+    with open(Path(args.input), 'r') as f:
+        data = json.load(f)
+
+    def run():
+        if args.output == "-":
+            return stream_report(data, sys.stdout, args.renderer, args.pages, args.chars, measure_pages=True)
+        with open(args.output, 'w', encoding="utf-8") as f:
+            return stream_report(data, f, args.renderer, args.pages, args.chars, measure_pages=True)
+
+    result = run()
+    print(f"📊 Streamed {result['chars']} chars ({result['bytes']} bytes) in {result['chunks']} chunks, "
+          f"~{result['pages']:.2f} pages", file=sys.stderr)
+
+    if args.compare_memory and args.output != "-":
+        def whole():
+            markdown = render_compiled(data)
+            with open(args.output, 'w', encoding="utf-8") as f:
+                f.write(markdown)
+            return len(markdown), default_model().estimate(markdown)
+
+        streamed = _peak_bytes(run)
+        buffered = _peak_bytes(whole)
+        print(f"🧠 Peak memory: streamed {streamed / 1024:.1f} KiB vs whole-document {buffered / 1024:.1f} KiB",
+              file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
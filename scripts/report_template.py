@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Compiled Report Template
+Precompiled 14-point report renderer producing the same bytes as render_markdown().
+
+templates/14point/report.md holds the report layout with {{slot}} placeholders.
+It is compiled once per process into a Python function whose body is a single
+f-string, so every static block (§4 Shop Interrogation, §7 Common Scams, §8
+Decision Matrix, §11 Negotiation Tactics, ...) is a frozen constant and each
+report only computes its dynamic slots.
+
+iter_compiled() renders the same bytes as a stream of chunks, one section
+at a time, for report_stream.py.
+
+Usage:
+  report_template.py [--iterations N]   check parity against render_markdown()
+                                        on tests/golden + tests/mocks and time both
+"""
+
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from report_markdown import truncate_list
+
+# Plain os.path strings: pathlib would add ~10ms to every fast_cli.py render
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(ROOT, "templates", "14point", "report.md")
+
+SLOT_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+SECTION_START = re.compile(r"^(?=## )", re.M)
+
+# iter_compiled() yields slot values at least this long as chunks of their own
+CHUNK_CHARS = 16384
+
+SLOTS = frozenset({
+    "generated_at", "submission_id", "customer_name", "customer_email", "equipment",
+    "symptoms", "codes", "most_likely_cause", "score", "threshold", "assessment",
+    "uplift_block", "hypotheses_block", "actions_block", "cost_low", "cost_high",
+    "time_hours", "red_flag_cost", "safety_block", "threshold_cost",
+    "education_symptoms", "mechanisms_block", "tools_block", "warranty_block",
+    "ranked_block", "immediate_block", "sources_block", "disclaimers_block",
+    "verdict", "reason",
+})
+
+# Per-section item caps applied by render_markdown(); budgeted renders pass lower ones
+LIST_LIMITS = {
+    "confidence_uplift_requirements": 8,
+    "root_cause_hypotheses": 5,
+    "recommended_actions": 8,
+    "safety_notes": 6,
+    "tools_parts": 12,
+    "warranty_or_tsb_refs": 8,
+    "disclaimers": 10,
+}
+
+_compiled = None
+_sections = None
+
+def _check_slots(text: str):
+    unknown = set(SLOT_PATTERN.findall(text)) - SLOTS
+    if unknown:
+        raise ValueError(f"Unknown template slots: {', '.join(sorted(unknown))}")
+
+def compile_template(text: str):
+    """Compile {{slot}} template text into a function of the slot values.
+
+    The generated function is one f-string expression: literal runs become
+    string constants and slots become format fields, so rendering is a single
+    string build with no per-call parsing. Unknown slot names fail at compile
+    time rather than per report.
+    """
+    _check_slots(text)
+    pieces = []
+    last = 0
+    for match in SLOT_PATTERN.finditer(text):
+        pieces.append(repr(text[last:match.start()]))
+        pieces.append("f'{" + match.group(1) + "}'")
+        last = match.end()
+    pieces.append(repr(text[last:]))
+    source = f"def render({', '.join(sorted(SLOTS))}):\n    return (\n        " + "\n        ".join(pieces) + "\n    )\n"
+    namespace = {}
+    exec(compile(source, TEMPLATE_PATH, "exec"), namespace)
+    return namespace["render"]
+
+def compile_sections(text: str) -> list:
+    """Split {{slot}} template text at its "## " headings into [(literal, slot or None), ...] per section."""
+    _check_slots(text)
+    sections = []
+    for section in SECTION_START.split(text):
+        if not section:
+            continue
+        pieces = []
+        last = 0
+        for match in SLOT_PATTERN.finditer(section):
+            pieces.append((section[last:match.start()], match.group(1)))
+            last = match.end()
+        pieces.append((section[last:], None))
+        sections.append(pieces)
+    return sections
+
+def _template_text(path: str) -> str:
+    with open(path, 'r', encoding="utf-8") as f:
+        text = f.read()
+    if text.endswith("\n"):
+        text = text[:-1]  # render_markdown() output has no trailing newline
+    return text
+
+def load_template(path: str = TEMPLATE_PATH):
+    """Return the compiled template function, compiling the on-disk file on first use."""
+    global _compiled
+    if _compiled is None:
+        _compiled = compile_template(_template_text(path))
+    return _compiled
+
+def load_sections(path: str = TEMPLATE_PATH) -> list:
+    """Return the template split by compile_sections(), parsing the on-disk file on first use."""
+    global _sections
+    if _sections is None:
+        _sections = compile_sections(_template_text(path))
+    return _sections
+
+def _bullets(items) -> str:
+    return "".join([f"- {item}\n" for item in items])
+
+def _with_note(block: str, note: str) -> str:
+    return f"{block}\n{note}\n" if note else block
+
+def hypothesis_entries(idx: int, hyp: dict) -> tuple[str, str, str]:
+    """Return one hypothesis as rendered in §2, §9 (failure mechanisms) and §12."""
+    name = hyp.get('hypothesis', 'Unknown')
+    likelihood = hyp.get('likelihood', 'unknown').upper()
+    return (
+        f"**{idx}. {name}** — *{likelihood} likelihood*\n"
+        f"   Evidence: {hyp.get('evidence', 'No evidence provided')}\n\n",
+        f"- {name}: {hyp.get('evidence', 'No evidence')}\n",
+        f"{idx}. **{name}** — {likelihood} ({hyp.get('evidence', 'No evidence')})\n",
+    )
+
+def action_entries(idx: int, action: dict) -> tuple[str, str]:
+    """Return one recommended action as rendered in §3 and §13."""
+    step = action.get('step', 'Unknown step')
+    return (
+        f"{idx}. **{step}**\n   *Why:* {action.get('why', 'No reason provided')}\n\n",
+        f"- {step}\n",
+    )
+
+def report_facts(data: dict, limits: dict = LIST_LIMITS) -> dict:
+    """Apply the 14-point rules to one report once, independent of output format.
+
+    Returns every scalar slot under its slot name, plus (display, note) pairs
+    for the list sections: "uplift" (None when confidence meets the
+    threshold), "hypotheses", "actions", "safety", "tools", "warranty" (None
+    without references) and "disclaimers". Notes are the Markdown "*+N more
+    ...*" lines, or "" when nothing was omitted. limits maps list fields to
+    the most items shown; omitted items are counted against the full list.
+    """
+    meta = data.get("meta", {})
+    if "generated_at_iso" in meta:
+        generated_at = meta["generated_at_iso"]
+    else:
+        generated_at = datetime.utcnow().isoformat() + "Z"
+    customer = data.get("customer", {})
+
+    equipment = data.get("equipment", {})
+    eq_parts = []
+    if equipment.get("year"): eq_parts.append(equipment["year"])
+    if equipment.get("make"): eq_parts.append(equipment["make"])
+    if equipment.get("model"): eq_parts.append(equipment["model"])
+    eq_str = " ".join(eq_parts) if eq_parts else f"{equipment.get('type', 'Unknown')} equipment"
+
+    codes = data.get("codes", [])
+
+    confidence = data.get("confidence", {})
+    score = confidence.get("score_pct", 0)
+    threshold = confidence.get("threshold_pct", 85)
+
+    uplift = None
+    uplift_reqs = data.get("confidence_uplift_requirements", [])
+    if uplift_reqs and score < threshold:
+        uplift = truncate_list(uplift_reqs, limits["confidence_uplift_requirements"], "requirements")
+
+    cost_low = data.get("estimated_cost_range_usd", {}).get("low", 0)
+    cost_high = data.get("estimated_cost_range_usd", {}).get("high", 0)
+
+    warranty_refs = data.get("warranty_or_tsb_refs", [])
+    warranty = None
+    if warranty_refs:
+        warranty = truncate_list(warranty_refs, limits["warranty_or_tsb_refs"], "references")
+
+    disclaimers = data.get("disclaimers", [])
+    max_disclaimers = limits["disclaimers"]
+    disclaimers_note = ""
+    if len(disclaimers) > max_disclaimers:
+        disclaimers_note = f"*+{len(disclaimers) - max_disclaimers} more disclaimers omitted*"
+
+    readiness = data.get("customer_readiness_check", {})
+
+    return {
+        "generated_at": generated_at,
+        "submission_id": data.get("submissionId", "UNKNOWN"),
+        "customer_name": customer.get("name", "N/A"),
+        "customer_email": customer.get("email", "N/A"),
+        "equipment": eq_str,
+        "symptoms": data.get("symptoms", "None provided"),
+        "codes": ", ".join(codes) if codes else "None reported",
+        "most_likely_cause": data.get("most_likely_cause", "Analysis incomplete"),
+        "score": score,
+        "threshold": threshold,
+        "assessment": confidence.get("assessment", "No assessment provided"),
+        "cost_low": cost_low,
+        "cost_high": cost_high,
+        "time_hours": data.get("estimated_time_hours", 0),
+        "red_flag_cost": int(cost_high * 1.5),
+        "threshold_cost": int(cost_high * 1.3),
+        "education_symptoms": data.get("symptoms", "Symptom information not provided"),
+        "verdict": readiness.get("verdict", "unknown"),
+        "reason": readiness.get("short_reason", "No reason provided"),
+        "uplift": uplift,
+        "hypotheses": truncate_list(
+            data.get("root_cause_hypotheses", []), limits["root_cause_hypotheses"], "hypotheses"),
+        "actions": truncate_list(data.get("recommended_actions", []), limits["recommended_actions"], "actions"),
+        "safety": truncate_list(data.get("safety_notes", []), limits["safety_notes"], "safety notes"),
+        "tools": truncate_list(data.get("tools_parts", []), limits["tools_parts"], "tools/parts"),
+        "warranty": warranty,
+        "disclaimers": (disclaimers[:max_disclaimers], disclaimers_note),
+    }
+
+def build_slots(data: dict, limits: dict = LIST_LIMITS) -> dict:
+    """Compute every dynamic slot for one report (same rules as render_markdown).
+
+    The scalar slots come straight from report_facts(); the list sections
+    are formatted here as Markdown blocks.
+    """
+    slots = report_facts(data, limits)
+
+    uplift = slots.pop("uplift")
+    uplift_block = ""
+    if uplift is not None:
+        uplift_block = "### To Raise Confidence:\n\n" + _with_note(_bullets(uplift[0]), uplift[1]) + "\n"
+
+    hypotheses_display, hyp_note = slots.pop("hypotheses")
+    hypotheses = [hypothesis_entries(idx, hyp) for idx, hyp in enumerate(hypotheses_display, 1)]
+    hypotheses_block = "".join([entry[0] for entry in hypotheses])
+    if hyp_note:
+        hypotheses_block += f"{hyp_note}\n\n"
+
+    actions_display, actions_note = slots.pop("actions")
+    actions = [action_entries(idx, action) for idx, action in enumerate(actions_display, 1)]
+    actions_block = "".join([entry[0] for entry in actions])
+    if actions_note:
+        actions_block += f"{actions_note}\n\n"
+
+    warranty = slots.pop("warranty")
+    if warranty is not None:
+        warranty_block = _with_note(_bullets(warranty[0]), warranty[1])
+        sources_block = _bullets(warranty[0])
+    else:
+        warranty_block = "- No active TSBs or warranty coverage identified for this symptom pattern\n"
+        sources_block = (
+            "- OEM Service Manual (specific VIN lookup required)\n"
+            "- NHTSA Complaints Database\n"
+            "- Technical Service Bulletin Archives\n"
+        )
+
+    disclaimers_display, disclaimers_note = slots.pop("disclaimers")
+    disclaimers_block = _bullets(disclaimers_display)
+    if disclaimers_note:
+        disclaimers_block += f"\n{disclaimers_note}\n"
+
+    safety_display, safety_note = slots.pop("safety")
+    tools_display, tools_note = slots.pop("tools")
+
+    slots.update({
+        "uplift_block": uplift_block,
+        "hypotheses_block": hypotheses_block,
+        "actions_block": actions_block,
+        "safety_block": _with_note(_bullets(safety_display), safety_note),
+        "mechanisms_block": "".join([entry[1] for entry in hypotheses]),
+        "tools_block": _with_note(_bullets(tools_display), tools_note),
+        "warranty_block": warranty_block,
+        "ranked_block": "".join([entry[2] for entry in hypotheses]),
+        "immediate_block": "".join([entry[1] for entry in actions]),
+        "sources_block": sources_block,
+        "disclaimers_block": disclaimers_block,
+    })
+    return slots
+
+def render_compiled(data: dict, limits: dict = LIST_LIMITS) -> str:
+    """Render diagnostic JSON to Markdown using the precompiled 14-point template."""
+    return load_template()(**build_slots(data, limits))
+
+def iter_sections(data: dict, limits: dict = LIST_LIMITS):
+    """Yield each report section as a list of strings.
+
+    Slot values are yielded as the objects build_slots() returned, so long
+    free-text fields are never copied into a larger string.
+    """
+    slots = build_slots(data, limits)
+    for pieces in load_sections():
+        parts = []
+        for literal, slot in pieces:
+            if literal:
+                parts.append(literal)
+            if slot is not None:
+                value = slots[slot]
+                parts.append(value if type(value) is str else format(value))
+        yield parts
+
+def iter_compiled(data: dict, limits: dict = LIST_LIMITS, chunk_chars: int = CHUNK_CHARS):
+    """Yield render_compiled() output in chunks that never span two sections.
+
+    Short pieces of a section are joined into one chunk; pieces of
+    chunk_chars or more are yielded on their own.
+    """
+    for parts in iter_sections(data, limits):
+        buffer = []
+        for part in parts:
+            if len(part) >= chunk_chars:
+                if buffer:
+                    yield "".join(buffer)
+                    buffer = []
+                yield part
+            else:
+                buffer.append(part)
+        if buffer:
+            yield "".join(buffer)
+
+def fixture_payloads():
+    """Yield (name, payload) for every golden report and mock submission."""
+    import glob
+    import json
+    for pattern in ("tests/golden/*.json", "tests/mocks/*.json"):
+        for path in sorted(glob.glob(os.path.join(ROOT, pattern))):
+            with open(path, 'r') as f:
+                yield os.path.basename(path), json.load(f)
+
+def main():
+    """Verify byte-identical output (compiled and streamed) against render_markdown() and time both renderers."""
+    from report_markdown import render_markdown
+
+    iterations = 2000
+    if "--iterations" in sys.argv:
+        iterations = int(sys.argv[sys.argv.index("--iterations") + 1])
+
+    fixtures = list(fixture_payloads())
+    status = 0
+    for name, payload in fixtures:
+        payload.setdefault("meta", {}).setdefault("generated_at_iso", "1970-01-01T00:00:00Z")
+        expected = render_markdown(payload)
+        if render_compiled(payload) != expected:
+            print(f"FAIL report_template: {name} differs from render_markdown()", file=sys.stderr)
+            status = 1
+        if "".join(iter_compiled(payload, chunk_chars=64)) != expected:
+            print(f"FAIL report_template: {name} streamed chunks differ from render_markdown()", file=sys.stderr)
+            status = 1
+
+    timings = {}
+    for label, renderer in (("render_markdown", render_markdown), ("render_compiled", render_compiled)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for _, payload in fixtures:
+                renderer(payload)
+        timings[label] = (time.perf_counter() - started) / (iterations * len(fixtures))
+
+    print(f"✅ Parity checked on {len(fixtures)} fixtures" if status == 0 else "❌ Parity failures found")
+    for label, seconds in timings.items():
+        print(f"⏱️  {label}: {seconds * 1e6:.1f}µs/report")
+    print(f"📊 Speedup: {timings['render_markdown'] / timings['render_compiled']:.2f}x")
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Stage Profiler
+Wall time, CPU time and peak memory per pipeline stage.
+
+A StageProfiler records named stages (JSON load, mock generation, each
+render_markdown() section, file write, PDF conversion) and accumulates
+calls, wall milliseconds (perf_counter) and CPU milliseconds (process_time)
+per name. Stages nest with stage(); mark() times consecutive sections of one
+function without nesting a with-block per section. With memory=True the
+peak traced allocation above each stage's starting point is recorded as
+well, via tracemalloc (which slows allocation-heavy code noticeably, so it
+is opt-in).
+
+as_dict() is what render_from_json.py --profile writes into
+<name>.metrics.json; cprofile() wraps a block in cProfile and dumps a .prof
+file for snakeviz/flameprof/gprof2dot.
+
+Usage:
+  stage_profiler.py <name.metrics.json|name.prof> [--top N]   hottest stages or functions
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+tracemalloc = None
+
+class StageProfiler:
+    """Accumulates wall/CPU time (and optionally peak memory) per named stage."""
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.stages = {}
+        self._stack = []  # open frames: [name, wall0, cpu0, traced0, peak_seen]
+        self._marked = False
+        self._started_tracing = False
+        if memory:
+            global tracemalloc
+            import tracemalloc  # deferred: only memory profiling needs it
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def _open(self, name: str):
+        frame = [name, time.perf_counter(), time.process_time(), 0, 0]
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # reset_peak() below would lose the enclosing stage's peak so far
+            if self._stack:
+                self._stack[-1][4] = max(self._stack[-1][4], peak)
+            tracemalloc.reset_peak()
+            frame[3] = frame[4] = current
+        self._stack.append(frame)
+
+    def _close(self):
+        wall_end = time.perf_counter()
+        cpu_end = time.process_time()
+        name, wall0, cpu0, traced0, peak_seen = self._stack.pop()
+        record = self.add(name, wall_end - wall0, cpu_end - cpu0)
+        if self.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], peak_seen)
+            record["peak_kib"] = max(record.get("peak_kib", 0.0), (peak - traced0) / 1024)
+            if self._stack:
+                self._stack[-1][4] = max(self._stack[-1][4], peak)
+
+    def add(self, name: str, wall_seconds: float, cpu_seconds: float) -> dict:
+        """Record one call of stage name timed elsewhere; return its accumulated record."""
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0}
+        record["calls"] += 1
+        record["wall_ms"] += wall_seconds * 1000
+        record["cpu_ms"] += cpu_seconds * 1000
+        return record
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage name."""
+        depth = len(self._stack)
+        self._open(name)
+        try:
+            yield self
+        finally:
+            # Close sections left open by mark() when the block raised
+            if len(self._stack) > depth + 1:
+                self._marked = False
+            while len(self._stack) > depth:
+                self._close()
+
+    def mark(self, name: str = None):
+        """End the section started by the previous mark() and start section name.
+
+        mark(None) ends the last section.
+        """
+        if self._marked:
+            self._close()
+        self._marked = name is not None
+        if self._marked:
+            self._open(name)
+
+    def as_dict(self) -> dict:
+        """Stages in first-seen order with times rounded for JSON output."""
+        stages = {}
+        for name, record in self.stages.items():
+            stages[name] = {
+                "calls": record["calls"],
+                "wall_ms": round(record["wall_ms"], 4),
+                "cpu_ms": round(record["cpu_ms"], 4),
+            }
+            if "peak_kib" in record:
+                stages[name]["peak_kib"] = round(record["peak_kib"], 1)
+        return stages
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+@contextmanager
+def cprofile(path):
+    """Run the enclosed block under cProfile and dump the stats to path (None: no-op)."""
+    if path is None:
+        yield None
+        return
+    import cProfile
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(path))
+
+def hottest(stages: dict, top: int = 10) -> list:
+    """Return [(name, record)] for the top stages by wall time."""
+    return sorted(stages.items(), key=lambda item: item[1]["wall_ms"], reverse=True)[:top]
+
+def main():
+    """Print the hottest stages of a metrics file or functions of a .prof dump."""
+    args = sys.argv[1:]
+    top = 15
+    if "--top" in args:
+        at = args.index("--top")
+        top = int(args[at + 1])
+        del args[at:at + 2]
+    if len(args) != 1:
+        print("Usage: stage_profiler.py <name.metrics.json|name.prof> [--top N]", file=sys.stderr)
+        sys.exit(1)
+
+    path = Path(args[0])
+    if path.suffix == ".prof":
+        import pstats
+        pstats.Stats(str(path)).sort_stats("cumulative").print_stats(top)
+        return
+    with open(path, 'r') as f:
+        stages = json.load(f).get("stages", {})
+    for name, record in hottest(stages, top):
+        peak = f"  peak {record['peak_kib']:.1f} KiB" if "peak_kib" in record else ""
+        print(f"  {name:<40} {record['wall_ms']:>10.3f} ms wall {record['cpu_ms']:>10.3f} ms cpu"
+              f"  x{record['calls']}{peak}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Synthetic Submission Corpus
+Seeded, streaming generator of realistic submissions for scale and stress runs.
+
+Field distributions follow the submissions we have (tests/mocks, tests/live,
+tests/regress/oversize.json) and the DTC knowledge base: equipment type mix
+(with the aliases customers actually type), make/model/year per type, DTC
+count and mix (exact knowledge-base codes, family-only codes, J1939
+SPN/FMI spellings, codes nothing resolves), customer names and emails,
+optional confidence_threshold_pct and a long-tailed notes length (log-normal
+body plus rare forum-essay outliers). Submission IDs and timestamps use the
+production shape recorded in 04-assets/data/AI_DIAGNOSTIC_SUBMISSION_DATA.json
+(diag_<epoch ms>_<8 hex>).
+
+Every record is generated from its own seed (seed, index), so a corpus is
+reproducible, --start/--count slices shard it across processes with
+identical records, and output is written one line at a time: memory stays
+flat for any --count.
+
+Usage:
+  synth_corpus.py --count N [--seed S] [--start I] [--out corpus.jsonl|-] [--stats]
+                  [--max-notes CHARS] [--reports]
+
+  synth_corpus.py --count 1000000 | mock_vertex.py --stream > metrics.jsonl
+  synth_corpus.py --count 100000 --reports | render_from_json.py --batch - --out-dir docs/out/synth --pdf-engine none
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+
+# Production submission IDs are diag_<epoch ms>_<8 hex>; the corpus starts at the recorded one
+BASE_EPOCH_MS = 1759187784321
+MEAN_GAP_MS = 37_000
+
+EQUIPMENT_MIX = (("vehicle", 60), ("hvac", 14), ("generator", 10), ("other", 7), ("marine", 5), ("electronics", 4))
+
+# Share of submissions that spell the type the way customers do ("car", "genset", ...)
+ALIAS_RATE = 0.05
+TYPE_ALIASES = {
+    "vehicle": ("car", "truck", "automotive", "rv", "motorcycle"),
+    "generator": ("genset", "generators"),
+    "hvac": ("heat_pump",),
+    "marine": ("boat",),
+    "electronics": ("electronic",),
+    "other": ("other",),
+}
+
+CATALOG = {
+    "vehicle": {
+        "Toyota": ("Camry", "Corolla", "Tacoma", "RAV4", "Tundra"),
+        "Honda": ("Civic", "Accord", "CR-V", "Odyssey"),
+        "Ford": ("F-150", "Transit", "Escape", "Explorer"),
+        "Chevrolet": ("Silverado 1500", "Malibu", "Equinox"),
+        "Subaru": ("Outback", "Forester", "Impreza"),
+        "Nissan": ("Altima", "Rogue", "Frontier"),
+        "Ram": ("1500", "2500"),
+        "Freightliner": ("Cascadia", "M2 106"),
+        "Kenworth": ("T680", "W900"),
+        "Peterbilt": ("579", "389"),
+    },
+    "hvac": {
+        "Carrier": ("Infinity 18", "Comfort 24ANB1", "Performance 16"),
+        "Daikin": ("SkyAir", "DX20VC", "FTXS"),
+        "Trane": ("XR14", "XV20i"),
+        "Lennox": ("EL16XC1", "XC25"),
+        "Mitsubishi": ("MUZ-FH", "PUZ-A"),
+    },
+    "generator": {
+        "Cummins": ("RS20A", "QuietConnect RV", "C150D6D"),
+        "Generac": ("Guardian 22kW", "Protector 48kW", "XT8500EFI"),
+        "Kohler": ("20RESCL", "14RESA"),
+        "Honda": ("EU2200i", "EU7000is"),
+        "Caterpillar": ("XQ60", "C15"),
+    },
+    "marine": {
+        "Yamaha": ("F150", "F250", "VF115"),
+        "Mercury": ("Verado 300", "FourStroke 115"),
+        "Volvo Penta": ("D4-300", "V8-380"),
+    },
+    "electronics": {
+        "Samsung": ("QN65Q80", "WF45R6100"),
+        "LG": ("OLED55C1", "WM4000HWA"),
+        "Dell": ("XPS 15", "PowerEdge R740"),
+    },
+    "other": {
+        "Bosch": ("GSB 18V", "PST 900"),
+        "Lincoln Electric": ("Power MIG 210",),
+        None: (None,),
+    },
+}
+HEAVY_MAKES = frozenset({"Freightliner", "Kenworth", "Peterbilt", "Caterpillar", "Cummins", "Volvo Penta"})
+
+# Exact knowledge-base codes, family-only codes, and codes no entry resolves
+CODE_POOLS = {
+    "vehicle": ("P0300", "P0301", "P0302", "P0304", "P0171", "P0174", "P0172", "P0420", "P0430",
+                "P0455", "P0456", "P0442", "P0128", "P0101", "P0113", "P0217", "P0340", "P0500",
+                "P0700", "U0100", "U0121", "U0140", "B1234", "C0035", "B0092"),
+    "heavy": ("SPN3364 FMI17", "SPN 3364 FMI 17", "SPN1761 FMI1", "SPN3556 FMI18", "SPN3226 FMI2",
+              "SPN4364 FMI18", "SPN3251 FMI0", "SPN3719 FMI16", "SPN 100 FMI 1", "P20EE"),
+    "hvac": ("CH21", "CH10", "CH05", "E1", "E5", "E7", "COMP_FAULT", "LPS", "HPS"),
+    "generator": ("ECU-1425", "ECU-1111", "ECU-2701", "SPN 110 FMI 0", "LOW OIL PRESSURE", "OVERCRANK"),
+    "marine": ("E-03", "SPN 100 FMI 1", "P0217", "ALARM 15"),
+    "electronics": ("E07", "ERR-42", "dE", "4E", "OE"),
+    "other": ("E01", "FAULT 3"),
+}
+
+# (number of codes, weight); tests/mocks + live carry 0-3 codes, mostly two
+CODE_COUNTS = ((0, 22), (1, 30), (2, 34), (3, 10), (4, 3), (6, 1))
+
+SYMPTOMS = {
+    "vehicle": (
+        "MIL on", "reduced power under load", "rough idle after cold start", "hesitation on acceleration",
+        "stalls at stop lights", "hard start when warm", "fuel smell near the rear", "ticking from the engine bay",
+        "dash lights flicker and gauges drop out", "transmission slips between 2nd and 3rd",
+        "DEF warning with derate countdown", "regen requested every few hours", "whining noise that rises with speed",
+    ),
+    "hvac": (
+        "blowing warm air", "outdoor unit short-cycles", "ice on the suction line", "error light flashing",
+        "high humidity indoors", "compressor hums but will not start", "breaker trips on startup",
+        "water leaking from the indoor unit",
+    ),
+    "generator": (
+        "shuts down after 20 minutes under load", "will not start on auto transfer", "voltage fluctuates",
+        "black smoke at startup", "low oil pressure shutdown", "surges at light load", "fuel pressure alarm",
+    ),
+    "marine": (
+        "overheat alarm at cruise", "will not reach rated RPM", "rough idle in gear", "water in fuel separator",
+        "trim not responding", "alarm beeps intermittently",
+    ),
+    "electronics": (
+        "does not power on", "restarts randomly", "no picture but sound works", "error code on display",
+        "drum will not spin", "fan runs constantly",
+    ),
+    "other": (
+        "intermittent fault", "makes a grinding noise", "stops working after warming up", "burning smell",
+        "trips the breaker", "worked yesterday, dead today",
+    ),
+}
+
+NOTE_SENTENCES = (
+    "Customer reports the problem started after a recent service visit.",
+    "Battery and terminals tested good at the parts store last week.",
+    "Fuel trims lean on both banks at idle, closer to normal at cruise.",
+    "Previous shop replaced the sensor but the fault returned within a week.",
+    "Happens more often in hot weather and after long highway runs.",
+    "Owner has a basic code reader but no scan tool with live data.",
+    "Unit is out of manufacturer warranty; extended coverage status unknown.",
+    "Maintenance records are incomplete for the last two years.",
+    "Intermittent: sometimes fine for days, then fails three times in one trip.",
+    "Forum threads suggest a known wiring chafe point behind the bracket.",
+    "Quote received was considerably higher than expected for this repair.",
+    "Customer would like to understand which tests to insist on before authorizing work.",
+    "Noise is loudest on cold mornings and fades after ten minutes.",
+    "Fleet dispatcher notes two other units with the same symptom this quarter.",
+    "Tenant reports the thermostat was replaced in spring.",
+)
+
+FIRST_NAMES = ("Alex", "Jamie", "Sam", "Taylor", "Jordan", "Morgan", "Casey", "Riley", "Avery", "Quinn",
+               "Sarah", "Marshall", "Priya", "Diego", "Mei", "Omar", "Elena", "Kwame", "Hana", "Luca")
+LAST_NAMES = ("Rivera", "Chen", "Mitchell", "Thompson", "Patel", "Garcia", "Nguyen", "Okafor", "Kim",
+              "Rossi", "Johnson", "Schmidt", "Silva", "Haddad", "Novak", "Tanaka")
+ORGANIZATIONS = ("Facility Ops", "Tenant Services", "Fleet Safety Desk", "Logistics Dispatch",
+                 "Makerspace Lead", "Property Management", "Marina Services", "Campus Maintenance")
+EMAIL_DOMAINS = ("example.com", "example.org", "example.net", "mail.example.com")
+
+# Notes: share absent, log-normal median/sigma, and the rare forum-essay tail
+NOTES_ABSENT = 0.12
+NOTES_MEDIAN_CHARS = 110
+NOTES_SIGMA = 0.9
+ESSAY_RATE = 0.005
+ESSAY_SCALE = (10, 60)
+MAX_NOTES_CHARS = 50_000
+
+def _cumulative(pairs) -> tuple:
+    values, weights = zip(*pairs)
+    total = 0
+    cumulative = []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return values, cumulative
+
+_EQUIPMENT = _cumulative(EQUIPMENT_MIX)
+_CODE_COUNTS = _cumulative(CODE_COUNTS)
+
+def _weighted(rng: random.Random, table: tuple):
+    values, cumulative = table
+    return rng.choices(values, cum_weights=cumulative)[0]
+
+def _sentences(rng: random.Random, pool: tuple, length: int) -> str:
+    """Join random sentences from pool until about length characters, cut at a word boundary."""
+    parts = []
+    total = 0
+    while total < length:
+        sentence = rng.choice(pool)
+        parts.append(sentence)
+        total += len(sentence) + 1
+    text = " ".join(parts)
+    if len(text) > length:
+        cut = text.rfind(" ", 0, length)
+        text = text[:cut if cut > 0 else length]
+    return text
+
+class SubmissionGenerator:
+    """Builds submission index i of the corpus for a seed; records are independent of each other."""
+
+    def __init__(self, seed: int = 0, max_notes: int = MAX_NOTES_CHARS):
+        self.seed = seed
+        self.max_notes = max_notes
+        self._rng = random.Random()
+
+    def customer(self, rng: random.Random) -> dict:
+        if rng.random() < 0.15:
+            name = rng.choice(ORGANIZATIONS)
+            local = name.lower().replace(" ", ".")
+        else:
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            name = f"{first} {last}"
+            local = f"{first}.{last}".lower() + (str(rng.randrange(100)) if rng.random() < 0.3 else "")
+        customer = {"email": f"{local}@{rng.choice(EMAIL_DOMAINS)}", "name": name}
+        roll = rng.random()
+        if roll < 0.02:
+            del customer["email"]
+        elif roll < 0.03:
+            del customer["name"]
+        return customer
+
+    def equipment(self, rng: random.Random, kind: str) -> dict:
+        make = rng.choice(tuple(CATALOG[kind]))
+        model = rng.choice(CATALOG[kind][make])
+        # Recent model years dominate; older units thin out toward 1995
+        year = None if make is None else str(2025 - min(30, int(rng.expovariate(1 / 7))))
+        shown = rng.choice(TYPE_ALIASES[kind]) if rng.random() < ALIAS_RATE else kind
+        return {"type": shown, "make": make, "model": model, "year": year}
+
+    def codes(self, rng: random.Random, kind: str, make) -> list:
+        count = _weighted(rng, _CODE_COUNTS)
+        if kind == "other" and rng.random() < 0.7:
+            count = 0
+        pool = CODE_POOLS["heavy"] if make in HEAVY_MAKES and rng.random() < 0.7 else CODE_POOLS[kind]
+        codes = []
+        for _ in range(count):
+            if kind == "vehicle" and rng.random() < 0.2:
+                code = f"{rng.choice('PPPPBCU')}0{rng.randrange(1000):03d}"  # family-only lookups
+            else:
+                code = rng.choice(pool)
+            if code not in codes:
+                codes.append(code)
+        return codes
+
+    def notes_length(self, rng: random.Random) -> int:
+        if rng.random() < NOTES_ABSENT:
+            return 0
+        length = rng.lognormvariate(math.log(NOTES_MEDIAN_CHARS), NOTES_SIGMA)
+        if rng.random() < ESSAY_RATE:
+            length *= rng.uniform(*ESSAY_SCALE)
+        return max(20, min(self.max_notes, int(length)))
+
+    def submission(self, index: int) -> dict:
+        rng = self._rng
+        rng.seed((self.seed << 40) + index)
+        kind = _weighted(rng, _EQUIPMENT)
+        equipment = self.equipment(rng, kind)
+        symptoms = ", ".join(rng.sample(SYMPTOMS[kind], min(len(SYMPTOMS[kind]), 1 + int(rng.expovariate(0.5)))))
+        symptoms = symptoms[0].upper() + symptoms[1:] + "."
+        if rng.random() < 0.4:
+            symptoms += " " + _sentences(rng, NOTE_SENTENCES, rng.randrange(60, 260))
+        record = {
+            "submissionId": f"diag_{BASE_EPOCH_MS + index * MEAN_GAP_MS + rng.randrange(MEAN_GAP_MS)}"
+                            f"_{rng.getrandbits(32):08x}",
+            "customer": self.customer(rng),
+            "equipment": equipment,
+            "symptoms": symptoms,
+            "codes": self.codes(rng, kind, equipment["make"]),
+        }
+        notes_length = self.notes_length(rng)
+        if notes_length:
+            record["notes"] = _sentences(rng, NOTE_SENTENCES, notes_length)
+        roll = rng.random()
+        if roll < 0.25:
+            record["confidence_threshold_pct"] = 85
+        elif roll < 0.30:
+            record["confidence_threshold_pct"] = rng.choice((80, 90, 95))
+        return record
+
+    def __call__(self, start: int = 0, count: int = 1):
+        """Yield submissions start .. start + count - 1."""
+        for index in range(start, start + count):
+            yield self.submission(index)
+
+class CorpusStats:
+    """Constant-memory summary of a generated corpus (counts and log2 length buckets)."""
+
+    def __init__(self):
+        self.records = 0
+        self.bytes = 0
+        self.types = Counter()
+        self.code_counts = Counter()
+        self.notes_buckets = Counter()
+        self.max_notes = 0
+
+    def add(self, record: dict, line_bytes: int):
+        self.records += 1
+        self.bytes += line_bytes
+        self.types[record["equipment"]["type"]] += 1
+        self.code_counts[len(record["codes"])] += 1
+        notes = len(record.get("notes", ""))
+        self.notes_buckets[0 if not notes else 1 << notes.bit_length()] += 1
+        self.max_notes = max(self.max_notes, notes)
+
+    def lines(self) -> list:
+        def share(counter):
+            return ", ".join(f"{key}: {count / self.records:.1%}" for key, count in sorted(counter.items()))
+        return [
+            f"📊 {self.records} submissions, {self.bytes / 1e6:.1f} MB, max notes {self.max_notes} chars",
+            f"   equipment.type  {share(self.types)}",
+            f"   codes per item  {share(self.code_counts)}",
+            f"   notes ≤ chars   {share(self.notes_buckets)}",
+        ]
+
+def main():
+    """Write count submissions (or mock reports with --reports) as JSONL."""
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic submission corpus as JSONL.")
+    parser.add_argument("--count", type=int, default=1000, help="records to write (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed (default: 0)")
+    parser.add_argument("--start", type=int, default=0, help="first record index, for sharding (default: 0)")
+    parser.add_argument("--out", default="-", help="output JSONL path, or - for stdout (default)")
+    parser.add_argument("--max-notes", type=int, default=MAX_NOTES_CHARS,
+                        help=f"cap on notes length in chars (default: {MAX_NOTES_CHARS})")
+    parser.add_argument("--reports", action="store_true",
+                        help="emit mock_vertex reports (fixed clock) instead of submissions, for render_from_json --batch -")
+    parser.add_argument("--stats", action="store_true", help="print field distributions and throughput to stderr")
+    args = parser.parse_args()
+
+    generate = SubmissionGenerator(args.seed, args.max_notes)
+    to_report = None
+    if args.reports:
+        from mock_vertex import fixed_clock, generate_mock_response
+        clock = fixed_clock()
+        to_report = lambda record: generate_mock_response(record, clock)  # noqa: E731
+
+    stats = CorpusStats() if args.stats else None
+    out = sys.stdout if args.out == "-" else open(args.out, 'w', encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        for record in generate(args.start, args.count):
+            line = json.dumps(to_report(record) if to_report else record,
+                              ensure_ascii=False, separators=(",", ":")) + "\n"
+            out.write(line)
+            if stats is not None:
+                stats.add(record, len(line))
+    except BrokenPipeError:
+        sys.exit(0)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if stats is not None:
+        elapsed = time.perf_counter() - started
+        for line in stats.lines():
+            print(line, file=sys.stderr)
+        print(f"⏱️  {stats.records / elapsed:.0f} records/sec", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
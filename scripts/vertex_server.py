@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+DiagnosticPro Offline Vertex Stand-in Server
+Serves generate_mock_response() behind a Vertex-compatible generateContent
+endpoint so the backend's Vertex call path can be load-tested offline.
+
+Any POST path ending in ":generateContent" is accepted, e.g.
+  /v1/projects/P/locations/us-central1/publishers/google/models/M:generateContent
+The request's text parts are read as a submission: the object itself when
+the whole prompt is JSON, else the labelled customer/equipment/codes/symptoms
+sections of the schema-driven prompt (tests/run_vertex_once.js), else the
+"- Field: value" lines of the backend prompt. The report comes back as the first candidate's text with
+usageMetadata token counts (about 4 characters per token).
+
+Faults are injected per request from a seeded RNG: extra latency drawn from
+--latency, HTTP errors (--error-rate), hung connections (--timeout-rate) and
+truncated, unparseable report JSON (--malformed-rate). --max-concurrency
+bounds requests in progress; once --max-queue more are waiting, new ones get
+429 RESOURCE_EXHAUSTED like a real quota. GET /stats returns counters and
+latency percentiles; GET /healthz returns ok.
+
+--fixed-time/--deterministic pin meta.generated_at_iso, and --memo N keeps
+an LRU of N reports keyed on the normalized submission (--memo-ignore-id
+shares entries across submissionIds); its hit rate is reported in /stats.
+
+Usage:
+  vertex_server.py [--port 8787] [--latency lognormal:120,0.5] [--error-rate 0.05]
+                   [--timeout-rate 0.01] [--malformed-rate 0.02] [--max-concurrency 64]
+                   [--deterministic] [--memo 4096 [--memo-ignore-id]]
+  mock_vertex.py --serve [same options]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+from collections import Counter, deque
+
+from mock_vertex import MockMemo, fixed_clock, generate_mock_response, submission_errors
+from prompt_budget import estimate_tokens
+
+ERROR_STATUS = {
+    400: "INVALID_ARGUMENT",
+    404: "NOT_FOUND",
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    503: "UNAVAILABLE",
+    504: "DEADLINE_EXCEEDED",
+}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           422: "Unprocessable Entity", 429: "Too Many Requests", 500: "Internal Server Error", 503: "Service Unavailable",
+           504: "Gateway Timeout"}
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+# Request path post() sends to; the server accepts any path ending in ":generateContent"
+GENERATE_PATH = "/v1/projects/offline/locations/us-central1/publishers/google/models/mock:generateContent"
+
+# Backend prompt lines ("- Symptoms: ...") mapped onto submission fields
+PROMPT_FIELD = re.compile(r"^- (Vehicle|Equipment Type|Symptoms|Problem|Extracted Error Codes): (.*)$", re.M)
+
+# Schema-driven prompt section labels (tests/run_vertex_once.js) → (submission field, value type)
+SECTION_FIELDS = {
+    "submissionid": ("submissionId", str),
+    "customer": ("customer", dict),
+    "equipment": ("equipment", dict),
+    "symptoms": ("symptoms", str),
+    "codes": ("codes", list),
+    "diagnosticcodes": ("codes", list),
+    "errorcodes": ("codes", list),
+    "notes": ("notes", str),
+    "confidencethreshold": ("confidence_threshold_pct", float),
+}
+PROMPT_SECTION = re.compile(r"^[ \t>*#-]*(submission ?id|customer|equipment|symptoms|codes|diagnostic codes|error codes|"
+                            r"notes|confidence threshold)(?: ?\(?[\w %]*\)?)?[ \t]*:", re.I | re.M)
+
+def parse_latency(spec: str):
+    """Return a function rng -> seconds for a latency spec in milliseconds.
+
+    fixed:MS, uniform:LOW,HIGH, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exp:MEAN
+    """
+    kind, _, raw = spec.partition(":")
+    try:
+        values = [float(v) for v in raw.split(",")] if raw else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    shapes = {
+        "fixed": (1, lambda rng, ms: ms),
+        "uniform": (2, lambda rng, low, high: rng.uniform(low, high)),
+        "normal": (2, lambda rng, mean, sd: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda rng, median, sigma: median * math.exp(rng.gauss(0.0, sigma))),
+        "exp": (1, lambda rng, mean: rng.expovariate(1.0 / mean) if mean > 0 else 0.0),
+    }
+    if kind not in shapes or len(values) != shapes[kind][0]:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    draw = shapes[kind][1]
+    return lambda rng: max(0.0, draw(rng, *values)) / 1000.0
+
+def request_text(body: dict) -> str:
+    """Join every text part of a generateContent request (user contents only)."""
+    texts = []
+    for content in body.get("contents") or []:
+        if isinstance(content, dict):
+            texts.extend(part.get("text", "") for part in content.get("parts") or [] if isinstance(part, dict))
+    return "\n".join(texts)
+
+def _section_value(text: str, kind: str):
+    """Parse a labelled section's value: JSON for dict/list sections, else text to the next blank line."""
+    stripped = text.lstrip()
+    if kind in (dict, list):
+        if not stripped.startswith("{" if kind is dict else "["):
+            return None
+        try:
+            value, _ = json.JSONDecoder().raw_decode(stripped)
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, kind) else None
+    value = stripped.split("\n\n", 1)[0].strip()
+    if kind is float:
+        try:
+            return float(value.split()[0].rstrip("%")) if value else None
+        except ValueError:
+            return None
+    return value
+
+def sections_from_prompt(text: str) -> dict:
+    """Submission fields from the schema-driven prompt's labelled sections.
+
+    tests/run_vertex_once.js fills the user template with customer_json,
+    equipment_json, codes_json, symptoms_text and notes_text; each follows a
+    label line such as "Equipment:" or "## Diagnostic codes:". Sections whose
+    value does not parse as the expected type are left out.
+    """
+    matches = list(PROMPT_SECTION.finditer(text))
+    submission = {}
+    for at, match in enumerate(matches):
+        field, kind = SECTION_FIELDS[match.group(1).lower().replace(" ", "")]
+        end = matches[at + 1].start() if at + 1 < len(matches) else len(text)
+        value = _section_value(text[match.end():end], kind)
+        if value is not None and field not in submission:
+            if kind is float:
+                submission[field] = int(value) if value.is_integer() else value
+            elif value != "":
+                submission[field] = value
+    return submission
+
+def submission_from_prompt(text: str) -> dict:
+    """Recover a submission dict from prompt text.
+
+    A prompt that is a single JSON object is used as-is. Otherwise the
+    schema-driven prompt's labelled customer/equipment/codes/symptoms
+    sections are read, and failing those the backend prompt's
+    "- Field: value" lines supply equipment, symptoms and codes.
+    """
+    try:
+        whole = json.loads(text)
+    except json.JSONDecodeError:
+        whole = None
+    if isinstance(whole, dict):
+        return whole
+
+    submission = sections_from_prompt(text)
+    if isinstance(submission.get("equipment"), dict) or isinstance(submission.get("codes"), list):
+        return submission
+
+    fields = {name: value.strip() for name, value in PROMPT_FIELD.findall(text)}
+    submission = {}
+    equipment = {"type": fields.get("Equipment Type", "vehicle")}
+    vehicle = [part for part in fields.get("Vehicle", "").split() if part != "N/A"]
+    if vehicle:
+        equipment["make"] = vehicle[0]
+        if len(vehicle) > 2:
+            equipment["model"] = " ".join(vehicle[1:-1])
+            equipment["year"] = vehicle[-1]
+        elif len(vehicle) == 2:
+            equipment["model"] = vehicle[1]
+    submission["equipment"] = equipment
+    symptoms = " ".join(v for v in (fields.get("Problem"), fields.get("Symptoms")) if v and v != "N/A")
+    if symptoms:
+        submission["symptoms"] = symptoms
+    codes = fields.get("Extracted Error Codes", "")
+    if codes and codes != "None auto-detected":
+        submission["codes"] = [code.strip() for code in codes.split(",") if code.strip()]
+    return submission
+
+class FaultProfile:
+    """Seeded per-request fault draws."""
+
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, timeout_rate: float = 0.0,
+                 malformed_rate: float = 0.0, error_codes=(429, 500, 503), seed: int = None):
+        for name, rate in (("error", error_rate), ("timeout", timeout_rate), ("malformed", malformed_rate)):
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"--{name}-rate must be between 0 and 1")
+        if error_rate + timeout_rate + malformed_rate > 1.0:
+            raise ValueError("error, timeout and malformed rates must sum to at most 1")
+        unknown = set(error_codes) - set(ERROR_STATUS)
+        if unknown:
+            raise ValueError(f"Unsupported error codes: {', '.join(str(c) for c in sorted(unknown))}")
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.malformed_rate = malformed_rate
+        self.error_codes = tuple(error_codes)
+        self.rng = random.Random(seed)
+
+    def draw(self) -> tuple[str, float]:
+        """Return (outcome, delay_seconds); outcome is ok, error, timeout or malformed."""
+        roll = self.rng.random()
+        delay = self.latency(self.rng)
+        if roll < self.error_rate:
+            return "error", delay
+        roll -= self.error_rate
+        if roll < self.timeout_rate:
+            return "timeout", delay
+        roll -= self.timeout_rate
+        if roll < self.malformed_rate:
+            return "malformed", delay
+        return "ok", delay
+
+async def read_request(reader):
+    """Read one HTTP/1.1 request; return (method, path, headers, body) or None at EOF."""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise ValueError("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+def http_response(status: int, payload: bytes, content_type: str, keep_alive: bool = True) -> bytes:
+    """Serialize one HTTP/1.1 response."""
+    return (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    ).encode("latin-1") + payload
+
+async def post(host: str, port: int, body: bytes, timeout: float) -> tuple:
+    """POST one generateContent request on a fresh connection; return (status, body)."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(
+            f"POST {GENERATE_PATH} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    if not raw:
+        raise ConnectionError("connection closed without a response")
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), payload
+
+class VertexStandIn:
+    """asyncio HTTP/1.1 server answering generateContent with mock reports."""
+
+    def __init__(self, faults: FaultProfile, max_concurrency: int = 0, max_queue: int = 0,
+                 timeout_seconds: float = 60.0, model: str = "mock-vertex-offline",
+                 clock=None, memo: MockMemo = None):
+        self.faults = faults
+        self.clock = clock
+        self.memo = memo
+        self.limit = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.model = model
+        self.counts = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waiting = 0
+        self.latencies = deque(maxlen=10000)
+        self.started = time.monotonic()
+
+    async def handle_connection(self, reader, writer):
+        """Serve keep-alive requests on one connection until the client closes."""
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                response = await self._dispatch(method, path, body)
+                if response is None:  # injected timeout: hang up without answering
+                    break
+                writer.write(http_response(*response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes):
+        if method == "GET" and path == "/healthz":
+            return 200, b'{"status":"ok"}', "application/json"
+        if method == "GET" and path == "/stats":
+            return 200, json.dumps(self.stats()).encode("utf-8"), "application/json"
+        if not path.endswith(":generateContent"):
+            return self._error(404, f"Unknown endpoint {path}")
+        if method != "POST":
+            return self._error(405, "generateContent requires POST")
+
+        if self.limit is not None and self.limit.locked() and self.waiting >= self.max_queue:
+            self.counts["rejected"] += 1
+            return self._error(429, "Quota exceeded: too many concurrent requests")
+
+        self.waiting += 1
+        try:
+            if self.limit is not None:
+                await self.limit.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.monotonic()
+        try:
+            return await self._generate(body)
+        except Exception as e:  # never drop the connection without an answer
+            self.counts["internal_error"] += 1
+            return self._error(500, f"Report generation failed: {type(e).__name__}: {e}")
+        finally:
+            self.in_flight -= 1
+            self.latencies.append(time.monotonic() - started)
+            if self.limit is not None:
+                self.limit.release()
+
+    async def _generate(self, body: bytes):
+        self.counts["requests"] += 1
+        try:
+            request = json.loads(body)
+            if not isinstance(request, dict):
+                raise ValueError("request body must be a JSON object")
+        except ValueError as e:
+            self.counts["bad_request"] += 1
+            return self._error(400, f"Invalid JSON payload: {e}")
+
+        outcome, delay = self.faults.draw()
+        self.counts[outcome] += 1
+        if outcome == "timeout":
+            await asyncio.sleep(self.timeout_seconds)
+            return None
+        if delay:
+            await asyncio.sleep(delay)
+        if outcome == "error":
+            code = self.faults.rng.choice(self.faults.error_codes)
+            return self._error(code, f"Injected {ERROR_STATUS[code]} fault")
+
+        prompt = request_text(request)
+        submission = submission_from_prompt(prompt)
+        errors = submission_errors(submission)
+        if errors:
+            self.counts["bad_request"] += 1
+            return self._error(400, f"Invalid submission: {'; '.join(errors)}")
+        if self.memo is not None:
+            report = self.memo.generate(submission)
+        else:
+            report = generate_mock_response(submission, self.clock)
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if outcome == "malformed":
+            text = text[:self.faults.rng.randint(1, max(1, len(text) - 1))]
+        response = {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": estimate_tokens(prompt),
+                "candidatesTokenCount": estimate_tokens(text),
+                "totalTokenCount": estimate_tokens(prompt) + estimate_tokens(text),
+            },
+            "modelVersion": self.model,
+        }
+        return 200, json.dumps(response, ensure_ascii=False).encode("utf-8"), "application/json"
+
+    def _error(self, code: int, message: str):
+        status = ERROR_STATUS.get(code, "FAILED_PRECONDITION")
+        payload = {"error": {"code": code, "message": message, "status": status}}
+        return code, json.dumps(payload).encode("utf-8"), "application/json"
+
+    def stats(self) -> dict:
+        """Return request counters, concurrency high-water marks and latency percentiles."""
+        ordered = sorted(self.latencies)
+
+        def pct(p):
+            return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1] * 1000 if ordered else 0.0
+
+        stats = {
+            "uptimeSeconds": round(time.monotonic() - self.started, 3),
+            "counts": dict(self.counts),
+            "inFlight": self.in_flight,
+            "peakInFlight": self.peak_in_flight,
+            "waiting": self.waiting,
+            "latencyMs": {"p50": round(pct(50), 2), "p95": round(pct(95), 2), "p99": round(pct(99), 2)},
+        }
+        if self.memo is not None:
+            stats["memo"] = self.memo.stats()
+        return stats
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve mock Vertex generateContent responses over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8787, help="bind port (default: 8787)")
+    parser.add_argument("--latency", default="fixed:0",
+                        help="added latency in ms: fixed:MS, uniform:LO,HI, normal:MEAN,SD, "
+                             "lognormal:MEDIAN,SIGMA or exp:MEAN (default: fixed:0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with an HTTP error")
+    parser.add_argument("--error-codes", default="429,500,503",
+                        help="comma-separated HTTP codes for injected errors (default: 429,500,503)")
+    parser.add_argument("--timeout-rate", type=float, default=0.0,
+                        help="fraction that hang for --timeout-seconds and then drop the connection")
+    parser.add_argument("--timeout-seconds", type=float, default=60.0, help="hang time for timeouts (default: 60)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="fraction answered 200 with truncated, unparseable report JSON")
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="requests processed at once; 0 = unlimited (default)")
+    parser.add_argument("--max-queue", type=int, default=1024,
+                        help="requests allowed to wait for a slot before 429 (default: 1024)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible fault injection")
+    parser.add_argument("--fixed-time", default=None, metavar="ISO",
+                        help="stamp every report's meta.generated_at_iso with this time")
+    parser.add_argument("--deterministic", action="store_true",
+                        help="same as --fixed-time DETERMINISTIC_TIMESTAMP (2025-01-01T00:00:00Z)")
+    parser.add_argument("--memo", type=int, default=0, metavar="N",
+                        help="memoize up to N reports keyed on the normalized submission (default: off)")
+    parser.add_argument("--memo-ignore-id", action="store_true",
+                        help="memo key ignores submissionId (hits are returned with the request's id)")
+    return parser.parse_args(argv)
+
+async def serve(args: argparse.Namespace):
+    faults = FaultProfile(args.latency, args.error_rate, args.timeout_rate, args.malformed_rate,
+                          [int(code) for code in args.error_codes.split(",") if code], args.seed)
+    clock = fixed_clock(args.fixed_time) if args.fixed_time else fixed_clock() if args.deterministic else None
+    memo = MockMemo(args.memo, clock, args.memo_ignore_id) if args.memo > 0 else None
+    stand_in = VertexStandIn(faults, args.max_concurrency, args.max_queue, args.timeout_seconds,
+                             clock=clock, memo=memo)
+    server = await asyncio.start_server(stand_in.handle_connection, args.host, args.port, backlog=1024)
+    address = server.sockets[0].getsockname()
+    print(f"✅ Mock Vertex listening on http://{address[0]}:{address[1]} (POST ...:generateContent, GET /stats)",
+          file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None) -> int:
+    """Run the stand-in server until interrupted."""
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
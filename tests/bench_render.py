@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Render-time benchmark for the offline report stack.
+
+Times generate_mock_response(), render_markdown() (plus the compiled template
+and budgeted renderers) and the page estimator over tests/golden, tests/mocks,
+tests/regress/oversize.json and synthetic inputs blown up 10x/100x/1000x.
+Reports per-stage latency percentiles, throughput and tracemalloc peaks.
+
+  python3 tests/bench_render.py --save-baseline tests/outputs/bench-baseline.json
+  python3 tests/bench_render.py --baseline tests/outputs/bench-baseline.json --max-slowdown 25
+"""
+import argparse
+import copy
+import json
+import math
+import pathlib
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from mock_vertex import generate_mock_response  # noqa: E402
+from page_estimator import estimate_pages  # noqa: E402
+from render_from_json import render_markdown  # noqa: E402
+from report_budget import BudgetExceededError, render_budgeted  # noqa: E402
+from report_template import render_compiled  # noqa: E402
+
+SCALES = (1, 10, 100, 1000)
+TEXT_FIELDS = ("symptoms", "notes", "most_likely_cause")
+LIST_FIELDS = (
+    "codes", "root_cause_hypotheses", "recommended_actions", "tools_parts", "safety_notes",
+    "warranty_or_tsb_refs", "disclaimers", "confidence_uplift_requirements",
+)
+
+
+def load_json(pattern: str) -> list:
+    return [json.loads(path.read_text(encoding="utf-8")) for path in sorted(ROOT.glob(pattern))]
+
+
+def scale_payload(payload: dict, factor: int) -> dict:
+    """Repeat every free-text field and list in payload `factor` times."""
+    if factor == 1:
+        return payload
+    scaled = copy.deepcopy(payload)
+    for field in TEXT_FIELDS:
+        if isinstance(scaled.get(field), str):
+            scaled[field] = " ".join([scaled[field]] * factor)
+    for field in LIST_FIELDS:
+        if isinstance(scaled.get(field), list) and scaled[field]:
+            scaled[field] = scaled[field] * factor
+    return scaled
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(fn, inputs: list, repeats: int) -> dict:
+    """Time fn over every input `repeats` times, then take one tracemalloc pass."""
+    samples = []
+    for _ in range(repeats):
+        for item in inputs:
+            started = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    peaks = []
+    for item in inputs:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fn(item)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+
+    total = sum(samples)
+    return {
+        "calls": len(samples),
+        "mean_us": total / len(samples) * 1e6,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p95_us": percentile(samples, 95) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+        "ops_per_sec": len(samples) / total if total else 0.0,
+        "peak_alloc_kb": max(peaks) / 1024,
+    }
+
+
+def build_cases(scales=SCALES) -> list:
+    """Return (stage, fixture_set, scale, fn, inputs) for every benchmark case at scales."""
+    submissions = load_json("tests/mocks/*.json") + load_json("tests/regress/oversize.json")
+    golden = load_json("tests/golden/*.json")
+    generated = [generate_mock_response(payload) for payload in submissions]
+
+    cases = []
+    for scale in scales:
+        scaled_submissions = [scale_payload(p, scale) for p in submissions]
+        scaled_golden = [scale_payload(p, scale) for p in golden]
+        scaled_generated = [scale_payload(p, scale) for p in generated]
+        rendered = [render_markdown(p) for p in scaled_golden]
+
+        cases.append(("generate_mock_response", "mocks+oversize", scale, generate_mock_response, scaled_submissions))
+        cases.append(("render_markdown", "golden", scale, render_markdown, scaled_golden))
+        cases.append(("render_markdown", "generated", scale, render_markdown, scaled_generated))
+        cases.append(("render_compiled", "golden", scale, render_compiled, scaled_golden))
+        cases.append(("render_budgeted", "golden", scale, render_budgeted, scaled_golden))
+        cases.append(("page_estimator", "golden-rendered", scale, estimate_pages, rendered))
+    return cases
+
+
+def compare(results: dict, baseline: dict, max_slowdown: float) -> list:
+    """Return failure messages for cases whose p50 regressed past max_slowdown percent."""
+    failures = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if "p50_us" not in current or not previous or previous.get("p50_us", 0) <= 0:
+            continue
+        slowdown = (current["p50_us"] / previous["p50_us"] - 1) * 100
+        if slowdown > max_slowdown:
+            failures.append(
+                f"FAIL bench_render: {key} p50 {current['p50_us']:.2f}us vs baseline "
+                f"{previous['p50_us']:.2f}us (+{slowdown:.0f}% > {max_slowdown:.0f}%)"
+            )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark mock generation, rendering and page estimation.")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="repeats per case at 1x; divided by the scale factor (min 3)")
+    parser.add_argument("--scales", default=",".join(str(s) for s in SCALES),
+                        help="comma-separated scale factors to run (default: 1,10,100,1000)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results JSON to PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--max-slowdown", type=float, default=25.0,
+                        help="allowed p50 regression versus baseline, in percent (default: 25)")
+    args = parser.parse_args()
+
+    wanted = sorted({int(s) for s in args.scales.split(",") if s})
+    results = {}
+    failed = []
+    print(f"{'case':<48} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'ops/s':>10} {'peak KB':>9}")
+    for stage, fixture_set, scale, fn, inputs in build_cases(wanted):
+        repeats = max(3, args.iterations // scale)
+        key = f"{stage}/{fixture_set}/x{scale}"
+        try:
+            stats = measure(fn, inputs, repeats)
+        except BudgetExceededError as e:
+            # Recorded rather than timed: a refused render has no latency to compare
+            results[key] = {"error": str(e)}
+            failed.append(f"FAIL bench_render: {key} raised {type(e).__name__}: {e}")
+            print(f"{key:<48} {'failed':>9}")
+            continue
+        results[key] = stats
+        print(f"{key:<48} {stats['p50_us']:>9.2f} {stats['p95_us']:>9.2f} {stats['p99_us']:>9.2f} "
+              f"{stats['ops_per_sec']:>10.0f} {stats['peak_alloc_kb']:>9.1f}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+
+    if args.save_baseline:
+        out = pathlib.Path(args.save_baseline)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {out}")
+
+    status = 0
+    for failure in failed:
+        print(failure, file=sys.stderr)
+        status = 1
+    if args.baseline:
+        baseline = json.loads(pathlib.Path(args.baseline).read_text(encoding="utf-8"))
+        for failure in compare(results, baseline, args.max_slowdown):
+            print(failure, file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
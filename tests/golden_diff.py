@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""Golden-output regression differ for rendered 14-point Markdown.
+
+Renders every fixture, hashes the whole output and each section, and
+compares against the manifest stored in tests/regress/baseline/. Reports
+whose input and renderer code are unchanged since the baseline are skipped
+without rendering; reports whose output hash matches are unchanged;
+only the rest get structural, section-aware diffs (sections added, removed
+or reordered, plus a unified diff per changed section against the stored
+baseline Markdown). Render, hash and diff all run in a process pool, and
+the summary counts how many reports changed in each of the 14 sections.
+
+The renderer fingerprint covers only the code the selected renderer can
+reach: starting from the renderer function, the source of every function
+and class under scripts/ it refers to (transitively), the public constants
+they read and the template file, so an edit to a CLI or an unrelated
+renderer keeps the skip. Submissions additionally depend on the generator
+fingerprint (generate_mock_response() and the DTC knowledge base).
+
+Inputs are report or submission JSON files, directories, globs or JSONL
+files (e.g. synth_corpus.py --reports output). Submissions (no report
+fields, such as tests/mocks) are first turned into reports by
+generate_mock_response() on the fixed mock clock; reports without
+meta.generated_at_iso are pinned to the epoch so output is reproducible.
+
+  python3 tests/golden_diff.py                          # tests/golden + tests/mocks vs the baseline
+  python3 tests/golden_diff.py --update                 # accept current output as the new baseline
+  python3 tests/golden_diff.py corpus.jsonl --baseline /tmp/corpus-baseline --hashes-only --update
+"""
+import argparse
+import difflib
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pathlib
+import re
+import sys
+import time
+import types
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from mock_vertex import fixed_clock, generate_mock_response  # noqa: E402
+from render_cache import canonical_json  # noqa: E402
+from render_from_json import RENDERER_CHOICES, get_renderer, safe_output_name  # noqa: E402
+from report_template import SECTION_START  # noqa: E402
+
+DEFAULT_INPUTS = [str(ROOT / "tests" / "golden"), str(ROOT / "tests" / "mocks")]
+DEFAULT_BASELINE = ROOT / "tests" / "regress" / "baseline"
+MANIFEST_VERSION = 1
+PINNED_TIMESTAMP = "1970-01-01T00:00:00Z"
+
+# Data files read at render or generation time, which the code walk cannot see
+RENDERER_DATA = ("templates/14point/report.md",)
+GENERATOR_DATA = ("04-assets/data/dtc_knowledge_base.json",)
+# Module globals of these types are hashed by value; others (caches, instances) are not
+CONSTANT_TYPES = (str, bytes, int, float, bool, tuple, list, dict, set, frozenset, type(None))
+
+# Any of these marks a payload as a report rather than a submission
+REPORT_FIELDS = ("root_cause_hypotheses", "most_likely_cause", "recommended_actions", "customer_readiness_check")
+
+HEADING = re.compile(r"## (?:(\d+)\. )?([^\n]*)")
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _is_repo_code(obj) -> bool:
+    module = sys.modules.get(getattr(obj, "__module__", None) or "")
+    path = getattr(module, "__file__", None)
+    return path is not None and pathlib.Path(path).resolve().parent == ROOT / "scripts"
+
+
+def _referenced_names(code: types.CodeType) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _referenced_names(const)
+    return names
+
+
+def _functions(obj) -> list:
+    """The plain functions making up a function or class."""
+    if inspect.isfunction(obj):
+        return [obj]
+    found = []
+    for value in vars(obj).values():
+        value = getattr(value, "__func__", None) or getattr(value, "fget", None) or value
+        if inspect.isfunction(value):
+            found.append(value)
+    return found
+
+
+def code_fingerprint(roots: list, data_files: tuple) -> str:
+    """Hash roots' source plus every repo function, class and public constant they reach."""
+    digest = hashlib.sha256()
+    stack, seen = list(roots), set()
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, functools.partial):
+            digest.update(repr((obj.args, sorted(obj.keywords.items()))).encode("utf-8"))
+            obj = obj.func
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        digest.update(f"\0{obj.__module__}.{obj.__qualname__}\0".encode("utf-8"))
+        digest.update(inspect.getsource(obj).encode("utf-8"))
+        for function in _functions(obj):
+            namespace = function.__globals__
+            for name in sorted(_referenced_names(function.__code__)):
+                value = namespace.get(name)
+                if (inspect.isfunction(value) or inspect.isclass(value)) and _is_repo_code(value):
+                    stack.append(value)
+                elif isinstance(value, CONSTANT_TYPES) and not name.startswith("_") and name in namespace:
+                    digest.update(f"\0{function.__module__}.{name}={value!r}".encode("utf-8"))
+    for source in data_files:
+        path = ROOT / source
+        digest.update(b"\0" + (path.read_bytes() if path.exists() else b""))
+    return digest.hexdigest()
+
+
+def renderer_fingerprint(renderer: str) -> str:
+    return code_fingerprint([get_renderer(renderer)], RENDERER_DATA)
+
+
+def generator_fingerprint() -> str:
+    return code_fingerprint([generate_mock_response, fixed_clock], GENERATOR_DATA)
+
+
+def is_submission(payload: dict) -> bool:
+    return not any(field in payload for field in REPORT_FIELDS)
+
+
+def split_sections(markdown: str) -> list:
+    """Return [(section_id, label, text)]: "header", "customer", "1".."14", "disclaimers"."""
+    sections = []
+    for text in SECTION_START.split(markdown):
+        if not text:
+            continue
+        match = HEADING.match(text)
+        if match is None:
+            sections.append(("header", "Header", text))
+        elif match.group(1):
+            sections.append((match.group(1), f"§{match.group(1)} {match.group(2)}", text))
+        else:
+            title = match.group(2)
+            section_id = "customer" if title.startswith("Customer") else title.split()[0].lower()
+            sections.append((section_id, title, text))
+    return sections
+
+
+def expand_inputs(inputs: list) -> list:
+    """Return [(name, path, byte offset or None)]; JSONL files contribute one entry per line."""
+    entries = []
+    for item in inputs:
+        path = pathlib.Path(item)
+        if path.is_dir():
+            paths = sorted(path.glob("*.json")) + sorted(path.glob("*.jsonl"))
+        elif path.exists():
+            paths = [path]
+        else:
+            paths = sorted(pathlib.Path(p) for p in glob.glob(item, recursive=True))
+        for p in paths:
+            if p.suffix != ".jsonl":
+                entries.append((f"{p.parent.name}/{p.stem}", p, None))
+                continue
+            with open(p, "rb") as f:
+                offset = 0
+                for lineno, line in enumerate(f, 1):
+                    if line.strip():
+                        entries.append((f"{p.stem}/{lineno}", p, offset))
+                    offset += len(line)
+    return entries
+
+
+def load_payload(path: pathlib.Path, offset) -> dict:
+    """Read a JSON file, or the JSONL line starting at byte offset."""
+    if offset is None:
+        return json.loads(path.read_text(encoding="utf-8"))
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+
+def baseline_path(baseline: pathlib.Path, name: str) -> pathlib.Path:
+    return baseline / "md" / (safe_output_name(name.replace("/", "__")) + ".md")
+
+
+def diff_sections(name: str, old: str, new: str, max_lines: int) -> dict:
+    """Structural diff of two renders: section ids added/removed/reordered and per-section unified diffs."""
+    old_sections = {sid: (label, text) for sid, label, text in split_sections(old)}
+    new_sections = {sid: (label, text) for sid, label, text in split_sections(new)}
+    result = {
+        "added": [sid for sid in new_sections if sid not in old_sections],
+        "removed": [sid for sid in old_sections if sid not in new_sections],
+        "reordered": [sid for sid in old_sections if sid in new_sections] != [
+            sid for sid in new_sections if sid in old_sections],
+        "diffs": {},
+    }
+    for sid, (label, text) in new_sections.items():
+        if sid in old_sections and old_sections[sid][1] != text:
+            lines = list(difflib.unified_diff(
+                old_sections[sid][1].splitlines(), text.splitlines(),
+                f"baseline/{name} {label}", f"current/{name} {label}", n=1, lineterm=""))
+            if len(lines) > max_lines:
+                lines = lines[:max_lines] + [f"... {len(lines) - max_lines} more diff lines"]
+            result["diffs"][sid] = lines
+    return result
+
+
+def check_entry(entry: tuple, options: dict) -> dict:
+    """Render one fixture and compare it with its manifest record; never raises."""
+    name, path, offset, record = entry
+    result = {"name": name, "status": "unchanged", "record": record, "sections": []}
+    try:
+        payload = load_payload(path, offset)
+        if not isinstance(payload, dict):
+            raise ValueError(f"expected a JSON object, got {type(payload).__name__}")
+        input_hash = sha256(canonical_json(payload))
+        submission = is_submission(payload)
+        if (record is not None and not options["update"] and record["input"] == input_hash
+                and options["fingerprint_unchanged"] and (options["generator_unchanged"] or not submission)):
+            result["status"] = "skipped"
+            return result
+
+        if submission:
+            payload = generate_mock_response(payload, fixed_clock())
+        else:
+            payload.setdefault("meta", {}).setdefault("generated_at_iso", PINNED_TIMESTAMP)
+        markdown = get_renderer(options["renderer"])(payload)
+        sections = split_sections(markdown)
+        current = {
+            "input": input_hash,
+            "output": sha256(markdown.encode("utf-8")),
+            "sections": {sid: sha256(text.encode("utf-8"))[:16] for sid, _, text in sections},
+        }
+        labels = {sid: label for sid, label, _ in sections}
+        result["record"] = current
+
+        if options["update"]:
+            if not options["hashes_only"]:
+                target = baseline_path(options["baseline"], name)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(markdown, encoding="utf-8")
+            return result
+        if record is None:
+            result["status"] = "new"
+            return result
+        if record["output"] == current["output"]:
+            return result
+
+        result["status"] = "changed"
+        old_hashes = record["sections"]
+        changed = [sid for sid, digest in current["sections"].items() if old_hashes.get(sid) != digest]
+        changed += [sid for sid in old_hashes if sid not in current["sections"]]
+        result["sections"] = [(sid, labels.get(sid, sid)) for sid in changed]
+        stored = baseline_path(options["baseline"], name)
+        if stored.exists():
+            result["diff"] = diff_sections(name, stored.read_text(encoding="utf-8"), markdown,
+                                           options["max_diff_lines"])
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def load_manifest(baseline: pathlib.Path) -> dict:
+    path = baseline / "manifest.json"
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "renderer": None, "fingerprint": None, "generator": None, "reports": {}}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise SystemExit(f"{path}: unsupported manifest version {manifest.get('version')}")
+    return manifest
+
+
+def print_result(result: dict, show_diff: bool):
+    labels = ", ".join(label for _, label in result["sections"]) or "whole report"
+    print(f"❌ {result['name']}: {labels}")
+    diff = result.get("diff")
+    if diff is None:
+        return
+    for key in ("added", "removed"):
+        if diff[key]:
+            print(f"   sections {key}: {', '.join(diff[key])}")
+    if diff["reordered"]:
+        print("   sections reordered")
+    if show_diff:
+        for lines in diff["diffs"].values():
+            for line in lines:
+                print(f"   {line}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Diff rendered Markdown against the golden baseline.")
+    parser.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS,
+                        help="report JSON/JSONL files, directories or globs (default: tests/golden tests/mocks)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="baseline directory holding manifest.json and md/ (default: tests/regress/baseline)")
+    parser.add_argument("--renderer", choices=RENDERER_CHOICES, default="markdown",
+                        help="renderer under test (default: markdown, i.e. render_markdown())")
+    parser.add_argument("--update", action="store_true", help="write the current output as the new baseline")
+    parser.add_argument("--hashes-only", action="store_true",
+                        help="with --update, store only hashes (section names still diff, text does not)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes (default: CPU count)")
+    parser.add_argument("--no-diff", action="store_true", help="list changed sections without the unified diffs")
+    parser.add_argument("--max-diff-lines", type=int, default=40, help="diff lines shown per section (default: 40)")
+    parser.add_argument("--report", metavar="PATH", help="write a JSON summary of every changed report")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    baseline = pathlib.Path(args.baseline)
+    manifest = load_manifest(baseline)
+    fingerprint = renderer_fingerprint(args.renderer)
+    generator = generator_fingerprint()
+    options = {
+        "renderer": args.renderer,
+        "baseline": baseline,
+        "update": args.update,
+        "hashes_only": args.hashes_only,
+        "max_diff_lines": args.max_diff_lines,
+        "fingerprint_unchanged": manifest["fingerprint"] == fingerprint and manifest["renderer"] == args.renderer,
+        "generator_unchanged": manifest.get("generator") == generator,
+    }
+    records = manifest["reports"]
+    entries = [(name, path, offset, records.get(name)) for name, path, offset in expand_inputs(args.inputs)]
+
+    if args.workers > 1 and len(entries) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(check_entry, entries, [options] * len(entries),
+                                    chunksize=max(1, len(entries) // (args.workers * 4))))
+    else:
+        results = [check_entry(entry, options) for entry in entries]
+
+    statuses = Counter(result["status"] for result in results)
+    seen = {result["name"] for result in results}
+    missing = sorted(name for name in records if name not in seen)
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        if result["status"] == "error":
+            print(f"FAIL golden_diff: {result['name']} {result['error']}", file=sys.stderr)
+
+    if args.update:
+        reports = {result["name"]: result["record"] for result in results if result["status"] != "error"}
+        baseline.mkdir(parents=True, exist_ok=True)
+        (baseline / "manifest.json").write_text(json.dumps(
+            {"version": MANIFEST_VERSION, "renderer": args.renderer, "fingerprint": fingerprint,
+             "generator": generator, "reports": dict(sorted(reports.items()))}, indent=1) + "\n", encoding="utf-8")
+        print(f"✅ Baseline updated: {len(reports)} reports in {baseline} ({elapsed:.2f}s)")
+        return 1 if statuses.get("error") else 0
+
+    changed = [result for result in results if result["status"] == "changed"]
+    for result in changed:
+        print_result(result, not args.no_diff)
+    for result in results:
+        if result["status"] == "new":
+            print(f"➕ {result['name']}: not in the baseline")
+    for name in missing:
+        print(f"➖ {name}: in the baseline but not rendered")
+
+    by_section = Counter()
+    labels = {}
+    for result in changed:
+        for sid, label in result["sections"]:
+            by_section[sid] += 1
+            labels[sid] = label
+    print(f"📊 {len(results)} reports in {elapsed:.2f}s: {statuses.get('unchanged', 0) + statuses.get('skipped', 0)} "
+          f"unchanged ({statuses.get('skipped', 0)} skipped by manifest), {len(changed)} changed, "
+          f"{statuses.get('new', 0)} new, {len(missing)} missing, {statuses.get('error', 0)} errors")
+    if by_section:
+        print("📊 Sections changed: " + ", ".join(f"{labels[sid]} ({count})" for sid, count in by_section.most_common()))
+
+    if args.report:
+        out = pathlib.Path(args.report)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps({
+            "reports": len(results),
+            "statuses": dict(statuses),
+            "missing": missing,
+            "sectionsChanged": {labels[sid]: count for sid, count in by_section.most_common()},
+            "changed": [{k: v for k, v in result.items() if k != "record"} for result in changed],
+        }, indent=2) + "\n", encoding="utf-8")
+
+    return 1 if changed or missing or statuses.get("new") or statuses.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
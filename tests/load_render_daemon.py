@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Latency and throughput check for the resident render daemon.
+
+Sends tests/golden reports to POST /render over keep-alive connections,
+pipelining --depth requests per connection, and prints throughput, status
+counts and client-side latency percentiles. --spawn N also times N cold
+`render_from_json.py` processes on the same reports for comparison.
+
+  python3 scripts/render_daemon.py --socket /tmp/render.sock &
+  python3 tests/load_render_daemon.py --socket /tmp/render.sock --requests 5000 --connections 8 --depth 16 --spawn 5
+"""
+import argparse
+import asyncio
+import json
+import math
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+async def read_response(reader) -> tuple:
+    """Read one HTTP/1.1 response; return (status, body)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed without a response")
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return int(status_line.split(b" ", 2)[1]), await reader.readexactly(length)
+
+
+async def run_connection(args, bodies: list, indexes: range, latencies: list, statuses: Counter):
+    """Pipeline the requests for indexes over one connection, at most args.depth outstanding."""
+    if args.socket:
+        reader, writer = await asyncio.open_unix_connection(args.socket)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    sent = []
+    outstanding = asyncio.Semaphore(args.depth)
+
+    async def send():
+        for index in indexes:
+            await outstanding.acquire()
+            body = bodies[index % len(bodies)]
+            sent.append(time.perf_counter())
+            writer.write(f"POST /render HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    answered = 0
+    try:
+        for answered in range(len(indexes)):
+            status, payload = await read_response(reader)
+            latencies.append(time.perf_counter() - sent[answered])
+            statuses[status] += 1
+            if status == 200 and "markdown" not in json.loads(payload):
+                statuses["missing_markdown"] += 1
+            outstanding.release()
+        await sender
+    except (ConnectionError, asyncio.IncompleteReadError):
+        # e.g. the daemon drained; requests it never read are not answered
+        statuses["unanswered"] += len(indexes) - answered
+        sender.cancel()
+    finally:
+        writer.close()
+
+
+def time_spawns(count: int, reports: list) -> list:
+    """Return wall seconds for count cold render_from_json.py processes."""
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for index in range(count):
+            source = reports[index % len(reports)]
+            started = time.perf_counter()
+            subprocess.run([sys.executable, str(ROOT / "scripts" / "render_from_json.py"), str(source),
+                            "--out-dir", tmp, "--pdf-engine", "none", "--no-cache"],
+                           check=True, stdout=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run(args) -> int:
+    reports = sorted((ROOT / "tests" / "golden").glob("*.json"))
+    bodies = [json.dumps({"report": json.loads(p.read_text(encoding="utf-8")),
+                          "options": {"markdown": True}}).encode("utf-8") for p in reports]
+    latencies = []
+    statuses = Counter()
+    per_connection = math.ceil(args.requests / args.connections)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_connection(args, bodies, range(start, min(start + per_connection, args.requests)), latencies, statuses)
+        for start in range(0, args.requests, per_connection)
+    ))
+    elapsed = time.perf_counter() - started
+
+    ok = statuses.get(200, 0)
+    print(f"✅ {ok}/{args.requests} renders in {elapsed:.2f}s ({args.requests / elapsed:.0f} req/s, "
+          f"{args.connections} connection(s) x depth {args.depth})")
+    print(f"📊 Statuses: {dict(sorted(statuses.items(), key=str))}")
+    print(f"⏱️  Latency: p50 {percentile(latencies, 50) * 1000:.3f}ms, p95 {percentile(latencies, 95) * 1000:.3f}ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.3f}ms")
+    if args.spawn:
+        spawns = time_spawns(args.spawn, reports)
+        print(f"🐢 Cold render_from_json.py: p50 {percentile(spawns, 50) * 1000:.1f}ms over {args.spawn} spawns")
+    return 0 if ok == args.requests and not statuses.get("missing_markdown") else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure render daemon latency and throughput.")
+    parser.add_argument("--socket", default=None, help="daemon Unix socket (default: TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--requests", type=int, default=2000, help="total renders (default: 2000)")
+    parser.add_argument("--connections", type=int, default=4, help="keep-alive connections (default: 4)")
+    parser.add_argument("--depth", type=int, default=8, help="pipelined requests per connection (default: 8)")
+    parser.add_argument("--spawn", type=int, default=0, help="also time N cold render_from_json.py processes")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
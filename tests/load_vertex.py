@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Offline load test against the mock Vertex stand-in server.
+
+Sends tests/mocks submissions as generateContent requests at a fixed
+concurrency, retrying HTTP errors, timeouts and unparseable report JSON with
+exponential backoff the way the backend's attempt loop does. Prints
+throughput, the outcome of every attempt, the attempts-per-request histogram
+and end-to-end latency percentiles.
+
+  python3 scripts/mock_vertex.py --serve --latency lognormal:120,0.5 --error-rate 0.05 &
+  python3 tests/load_vertex.py --requests 2000 --concurrency 300
+"""
+import argparse
+import asyncio
+import json
+import math
+import pathlib
+import sys
+import time
+from collections import Counter
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from vertex_server import post  # noqa: E402
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def classify(status: int, payload: bytes) -> str:
+    """Return ok, http_<code> or malformed for one response."""
+    if status != 200:
+        return f"http_{status}"
+    try:
+        text = json.loads(payload)["candidates"][0]["content"]["parts"][0]["text"]
+        report = json.loads(text)
+        return "ok" if isinstance(report, dict) and report.get("submissionId") else "malformed"
+    except (ValueError, KeyError, IndexError, TypeError):
+        return "malformed"
+
+
+async def run_one(args, body: bytes, outcomes: Counter) -> tuple:
+    """Send one submission until it succeeds or runs out of attempts; return (attempts, ok, seconds)."""
+    started = time.perf_counter()
+    for attempt in range(1, args.max_attempts + 1):
+        try:
+            outcome = classify(*await post(args.host, args.port, body, args.timeout))
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+        except (ConnectionError, OSError):
+            outcome = "connection_error"
+        outcomes[outcome] += 1
+        if outcome == "ok":
+            return attempt, True, time.perf_counter() - started
+        if attempt < args.max_attempts:
+            await asyncio.sleep(args.backoff * 2 ** (attempt - 1))
+    return args.max_attempts, False, time.perf_counter() - started
+
+
+async def run(args) -> int:
+    submissions = [json.loads(p.read_text(encoding="utf-8")) for p in sorted((ROOT / "tests" / "mocks").glob("*.json"))]
+    bodies = [
+        json.dumps({"contents": [{"role": "user", "parts": [{"text": json.dumps(s)}]}]}).encode("utf-8")
+        for s in submissions
+    ]
+    slots = asyncio.Semaphore(args.concurrency)
+    outcomes = Counter()
+
+    async def limited(index):
+        async with slots:
+            return await run_one(args, bodies[index % len(bodies)], outcomes)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(limited(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    succeeded = [seconds for _, ok, seconds in results if ok]
+    attempts = Counter(attempt for attempt, ok, _ in results if ok)
+    failed = len(results) - len(succeeded)
+    print(f"✅ {len(succeeded)}/{len(results)} requests succeeded in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.1f} req/s at concurrency {args.concurrency})")
+    print(f"📊 Attempt outcomes: {dict(sorted(outcomes.items()))}")
+    print(f"🔁 Attempts per success: {dict(sorted(attempts.items()))}")
+    print(f"⏱️  End-to-end latency: p50 {percentile(succeeded, 50) * 1000:.1f}ms, "
+          f"p95 {percentile(succeeded, 95) * 1000:.1f}ms, p99 {percentile(succeeded, 99) * 1000:.1f}ms")
+    if failed:
+        print(f"❌ {failed} requests failed after {args.max_attempts} attempts", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the mock Vertex stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--requests", type=int, default=1000, help="total submissions to send (default: 1000)")
+    parser.add_argument("--concurrency", type=int, default=100, help="requests in flight (default: 100)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="attempts per submission (default: 3)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-attempt timeout in seconds (default: 10)")
+    parser.add_argument("--backoff", type=float, default=0.05, help="first retry delay in seconds (default: 0.05)")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
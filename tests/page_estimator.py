@@ -1,25 +1,31 @@
 #!/usr/bin/env python3
-import math
+import json
 import pathlib
 import sys
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
-golden_files = sorted((ROOT / "tests" / "golden").glob("*.json"))
+sys.path.insert(0, str(ROOT / "scripts"))
 
-status = 0
+from render_from_json import render_markdown  # noqa: E402
+from report_guards import estimate_pages, page_limit  # noqa: E402
 
-for path in golden_files:
-    text = path.read_text(encoding="utf-8")
-    chars = len(text)
-    estimated_pages = math.ceil(chars / 3000) if chars else 0
 
-    if "mock_H" in path.name:
-        limit = 6
-    else:
-        limit = 4
+def main() -> int:
+    golden_files = sorted((ROOT / "tests" / "golden").glob("*.json"))
 
-    if estimated_pages > limit:
-        print(f"FAIL page_estimator: {path.name} => {estimated_pages} pages (limit {limit})", file=sys.stderr)
-        status = 1
+    status = 0
 
-sys.exit(status)
+    for path in golden_files:
+        report = json.loads(path.read_text(encoding="utf-8"))
+        estimated_pages = estimate_pages(render_markdown(report))
+        limit = page_limit(path.name)
+
+        if estimated_pages > limit:
+            print(f"FAIL page_estimator: {path.name} => {estimated_pages} pages (limit {limit})", file=sys.stderr)
+            status = 1
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
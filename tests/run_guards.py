@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Single-pass guard runner for generated report JSON.
+
+Parses each report once and evaluates every rule enforced by
+confidence_guard.sh, readiness_guard.sh, length_guard.sh and page_estimator.py,
+with the same pass/fail semantics and FAIL messages (the rules themselves are
+in scripts/report_guards.py). Files are checked in parallel and an optional
+machine-readable report is written with --report.
+
+  python3 tests/run_guards.py                       # tests/golden/*.json
+  python3 tests/run_guards.py outputs/ 'more/*.json' --workers 8 --report guards.json
+"""
+import argparse
+import glob
+import json
+import os
+import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from report_guards import (GUARDS, check_confidence, check_length, check_pages,  # noqa: E402
+                           check_readiness)
+
+
+def check_file(path_str: str) -> dict:
+    """Run every guard over one report file, reading and parsing it exactly once."""
+    path = pathlib.Path(path_str)
+    result = {"file": path_str, "ok": True, "failures": {guard: [] for guard in GUARDS}}
+    try:
+        raw = path.read_bytes()
+        text = raw.decode("utf-8")
+        report = json.loads(text)
+        if not isinstance(report, dict):
+            raise ValueError("top-level JSON value is not an object")
+    except (OSError, ValueError) as e:
+        result["ok"] = False
+        result["error"] = f"FAIL run_guards: {path} could not be parsed ({e})"
+        return result
+
+    result["chars"] = len(raw)
+    result["failures"]["confidence_guard"] = check_confidence(path, report)
+    result["failures"]["readiness_guard"] = check_readiness(path, report)
+    result["failures"]["length_guard"] = check_length(path, raw)
+    result["failures"]["page_estimator"] = check_pages(path.name, report)
+    result["ok"] = not any(result["failures"].values())
+    return result
+
+
+def expand_inputs(inputs: list) -> tuple:
+    """Return (files, unmatched): the report files named by inputs, and the inputs naming none."""
+    files = []
+    unmatched = []
+    for item in inputs:
+        path = pathlib.Path(item)
+        if path.is_dir():
+            matches = sorted(path.glob("*.json"))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = sorted(pathlib.Path(p) for p in glob.glob(item, recursive=True))
+        if not matches:
+            unmatched.append(item)
+        files.extend(matches)
+    return [str(f) for f in files], unmatched
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run all report guards in a single pass.")
+    parser.add_argument("inputs", nargs="*", default=[str(ROOT / "tests" / "golden")],
+                        help="report JSON files, directories or globs (default: tests/golden)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes (default: CPU count)")
+    parser.add_argument("--report", metavar="PATH", help="write a JSON summary of every file and rule")
+    args = parser.parse_args()
+
+    files, unmatched = expand_inputs(args.inputs)
+    for item in unmatched:
+        print(f"FAIL run_guards: no report files match {item}", file=sys.stderr)
+    if not files:
+        print("FAIL run_guards: no report files to check", file=sys.stderr)
+        return 1
+    if args.workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(check_file, files, chunksize=max(1, len(files) // (args.workers * 4))))
+    else:
+        results = [check_file(f) for f in files]
+
+    status = 1 if unmatched else 0
+    totals = {guard: 0 for guard in GUARDS}
+    for result in results:
+        if "error" in result:
+            print(result["error"], file=sys.stderr)
+            status = 1
+            continue
+        for guard, failures in result["failures"].items():
+            for failure in failures:
+                print(failure, file=sys.stderr)
+            if failures:
+                totals[guard] += 1
+                status = 1
+
+    if args.report:
+        summary = {
+            "files": len(results),
+            "passed": sum(1 for r in results if r["ok"]),
+            "failed_by_guard": totals,
+            "results": results,
+        }
+        out = pathlib.Path(args.report)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
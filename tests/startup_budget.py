@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Startup-time budget for the one-shot CLIs.
+
+Times fresh interpreter runs of each case against a bare `python -c pass`,
+interleaved so machine noise hits both alike, and fails when a case's median
+overhead above the bare interpreter exceeds its budget. Each budgeted case is
+also run once under -X importtime and fails if it imports a module the fast
+path defers (argparse, the process pool, subprocess, logging, profilers,
+hashing, orjson, pathlib, and the render CLI's cache, PDF, schema and page
+model modules): a check that does not depend on machine speed. The full
+mock_vertex.py and render_from_json.py CLIs are timed for reference only.
+
+  python3 tests/startup_budget.py
+  python3 tests/startup_budget.py --runs 40 --scale 2      # slow or shared machine
+"""
+import argparse
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MOCK_INPUT = ROOT / "tests" / "mocks" / "mock_A_vehicle_high_confidence.json"
+REPORT_INPUT = ROOT / "tests" / "golden" / "mock_A_output.json"
+
+# Modules a one-shot fast_cli.py run must not import
+DEFERRED = ("argparse", "concurrent.futures", "subprocess", "logging", "cProfile", "pstats",
+            "tracemalloc", "hashlib", "tempfile", "threading", "orjson", "pathlib",
+            "render_from_json", "pdf_backend", "render_cache", "stage_profiler", "report_schema",
+            "page_model")
+
+
+def cases(out_dir: str) -> list:
+    """[(name, argv, budget in ms over the bare interpreter or None for reference only)]."""
+    return [
+        ("fast_cli mock", ["scripts/fast_cli.py", "mock", str(MOCK_INPUT)], 40.0),
+        ("fast_cli render", ["scripts/fast_cli.py", "render", str(REPORT_INPUT)], 50.0),
+        ("mock_vertex.py", ["scripts/mock_vertex.py", str(MOCK_INPUT)], None),
+        ("render_from_json.py", ["scripts/render_from_json.py", str(REPORT_INPUT), "startup",
+                                 "--out-dir", out_dir, "--pdf-engine", "none", "--no-cache"], None),
+    ]
+
+
+def run_once(argv: list) -> float:
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, *argv], cwd=ROOT, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited {result.returncode}: "
+                           f"{result.stderr.decode('utf-8', 'replace').strip()}")
+    return elapsed * 1000
+
+
+def imported_modules(argv: list) -> set:
+    result = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check CLI startup time against a budget.")
+    parser.add_argument("--runs", type=int, default=15, help="timed runs per case (default: 15)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every budget, for slow or shared machines (default: 1)")
+    args = parser.parse_args()
+
+    status = 0
+    with tempfile.TemporaryDirectory() as out_dir:
+        checks = cases(out_dir)
+        for name, argv, budget in checks:
+            if budget is None:
+                continue
+            leaked = sorted(module for module in imported_modules(argv) if module in DEFERRED)
+            if leaked:
+                print(f"FAIL startup_budget: {name} imports {', '.join(leaked)}", file=sys.stderr)
+                status = 1
+
+        # Warm the page cache and bytecode before timing
+        run_once(["-c", "pass"])
+        for _, argv, _ in checks:
+            run_once(argv)
+        timings = {name: [] for name, _, _ in checks}
+        bare = []
+        for _ in range(args.runs):
+            bare.append(run_once(["-c", "pass"]))
+            for name, argv, _ in checks:
+                timings[name].append(run_once(argv))
+
+    baseline = statistics.median(bare)
+    print(f"⏱️  bare interpreter: median {baseline:.1f}ms over {args.runs} runs")
+    for name, _, budget in checks:
+        median = statistics.median(timings[name])
+        overhead = median - baseline
+        if budget is None:
+            print(f"ℹ️  {name:<20} median {median:6.1f}ms  (+{overhead:.1f}ms, reference)")
+            continue
+        limit = budget * args.scale
+        ok = overhead <= limit
+        print(f"{'✅' if ok else '❌'} {name:<20} median {median:6.1f}ms  (+{overhead:.1f}ms, budget {limit:.0f}ms)")
+        if not ok:
+            print(f"FAIL startup_budget: {name} +{overhead:.1f}ms over the bare interpreter (budget {limit:.0f}ms)",
+                  file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())